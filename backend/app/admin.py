@@ -2,15 +2,53 @@ from django.contrib import admin
 from .models import (
     User, UserProfile,
     Ingredient, UserPantry,
+    CanonicalIngredient, IngredientSynonym,
     Recipe, RecipeIngredient, RecipeStep,
     RecommendationHistory,
 )
 
 admin.site.register(User)
 admin.site.register(UserProfile)
-admin.site.register(Ingredient)
 admin.site.register(UserPantry)
 admin.site.register(Recipe)
 admin.site.register(RecipeIngredient)
 admin.site.register(RecipeStep)
 admin.site.register(RecommendationHistory)
+
+
+class IngredientSynonymInline(admin.TabularInline):
+    model = IngredientSynonym
+    extra = 1
+
+
+class CanonicalChildInline(admin.TabularInline):
+    model = CanonicalIngredient
+    fk_name = "parent"
+    fields = ["name_ko"]
+    extra = 0
+    verbose_name = "하위 재료"
+    verbose_name_plural = "하위 재료"
+
+
+@admin.register(CanonicalIngredient)
+class CanonicalIngredientAdmin(admin.ModelAdmin):
+    # 동의어/상하위 관계 편집 → signals에서 그래프 버전 증가
+    list_display = ["id", "name_ko", "parent"]
+    search_fields = ["name_ko", "synonym_entries__name"]
+    autocomplete_fields = ["parent"]
+    inlines = [IngredientSynonymInline, CanonicalChildInline]
+
+
+@admin.register(IngredientSynonym)
+class IngredientSynonymAdmin(admin.ModelAdmin):
+    list_display = ["name", "canonical"]
+    search_fields = ["name", "canonical__name_ko"]
+    autocomplete_fields = ["canonical"]
+
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    list_display = ["id", "name_ko", "canonical", "category"]
+    list_filter = ["category"]
+    search_fields = ["name_ko"]
+    autocomplete_fields = ["canonical"]
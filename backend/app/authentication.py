@@ -0,0 +1,129 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import BaseAuthentication
+
+from .models import User, UserProfile
+
+# 요청마다 User/UserProfile get_or_create 하지 않도록 짧게 캐시
+#   ident:v1:sess:<sha256(session_key)> → user_id   (로그인/로그아웃 시 삭제)
+#   ident:v1:demo:<n> / ident:v1:fallback → user_id
+#   ident:v1:user:<id> → User (profile select_related 포함, 프로필 수정 시 삭제)
+IDENTITY_CACHE_PREFIX = "ident:v1"
+
+
+def _ttl():
+    return getattr(settings, "IDENTITY_CACHE_TTL", 60)
+
+
+def _session_cache_key(session_key):
+    digest = hashlib.sha256(session_key.encode("utf-8")).hexdigest()
+    return f"{IDENTITY_CACHE_PREFIX}:sess:{digest}"
+
+
+def _user_cache_key(user_id):
+    return f"{IDENTITY_CACHE_PREFIX}:user:{user_id}"
+
+
+def _load_user(user_id):
+    """User + profile을 쿼리 한 번으로 (프로필이 없으면 그때만 생성)"""
+    user = User.objects.select_related("profile").filter(id=user_id).first()
+    if user is None:
+        return None
+    try:
+        user.profile
+    except UserProfile.DoesNotExist:
+        user.profile = UserProfile.objects.get_or_create(user=user)[0]
+    return user
+
+
+def get_cached_user(user_id):
+    key = _user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = _load_user(user_id)
+        if user is not None:
+            cache.set(key, user, _ttl())
+    return user
+
+
+def _cached_user_id(key, resolve):
+    user_id = cache.get(key)
+    if user_id is None:
+        user = resolve()
+        user_id = user.id
+        cache.set(key, user_id, _ttl())
+    return user_id
+
+
+def resolve_request_user(request):
+    """
+    요청 유저 결정 (get_current_user와 같은 순서):
+    1. 세션에 user_id가 있으면 해당 유저
+    2. demo_user 파라미터/헤더가 있으면 데모 유저
+    3. 없으면 로컬 개발용 test_user_1 fallback
+    """
+    from .utils import get_demo_user, get_or_create_test_user  # 순환 import 방지
+
+    session = getattr(request, "session", None)
+    session_key = getattr(session, "session_key", None)
+
+    # 1) 세션
+    if session_key:
+        skey = _session_cache_key(session_key)
+        user_id = cache.get(skey)
+        if user_id is None:
+            user_id = session.get("user_id") or 0  # 0: 세션은 있지만 로그인 안 됨
+            cache.set(skey, user_id, _ttl())
+        if user_id:
+            user = get_cached_user(user_id)
+            if user is not None:
+                return user
+            cache.delete(skey)  # 세션에 있지만 DB에 없으면 fallback
+
+    # 2) demo_user 파라미터 (개발/디버그용)
+    params = getattr(request, "query_params", None) or getattr(request, "GET", {})
+    demo = params.get("demo_user") or request.headers.get("X-DEMO-USER")
+    if demo:
+        key = f"{IDENTITY_CACHE_PREFIX}:demo:{demo}"
+        resolve = lambda: get_demo_user(demo)  # noqa: E731
+    else:
+        # 3) Fallback: 로컬 개발용 test_user
+        key = f"{IDENTITY_CACHE_PREFIX}:fallback"
+        resolve = get_or_create_test_user
+
+    user = get_cached_user(_cached_user_id(key, resolve))
+    if user is None:
+        # 캐시된 id의 유저가 지워진 경우
+        cache.delete(key)
+        user = get_cached_user(_cached_user_id(key, resolve))
+    return user
+
+
+def invalidate_session_identity(request):
+    """로그인/로그아웃 직전에 호출 (세션 → 유저 매핑 삭제)"""
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        cache.delete(_session_cache_key(session_key))
+
+
+async def ainvalidate_session_identity(request):
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        await cache.adelete(_session_cache_key(session_key))
+
+
+def invalidate_user_identity(user_id):
+    """프로필 등 유저 정보가 바뀌면 호출"""
+    cache.delete(_user_cache_key(user_id))
+
+
+class SessionUserAuthentication(BaseAuthentication):
+    """
+    DRF 인증 클래스: 요청당 한 번 유저+프로필 결정 → request.user
+    (항상 유저를 돌려주므로 익명 요청도 test_user/demo 유저로 처리됨)
+    """
+
+    def authenticate(self, request):
+        return resolve_request_user(request), None
@@ -0,0 +1,120 @@
+# 로컬 가짜 COOKRCP01 서버 (오프라인 테스트/벤치마크용)
+# 실제 API와 같은 URL 형식/응답 구조를 흉내냄:
+#   GET /api/<key>/COOKRCP01/json/<start>/<end>[/RCP_NM=...]
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+_PATH = re.compile(r"^/api/[^/]+/COOKRCP01/json/(\d+)/(\d+)(?:/RCP_NM=([^/]*))?/?$")
+
+_INGREDIENTS = [
+    "돼지고기 100g", "양파 50g(1/4개)", "대파 10g", "간장 10g(2작은술)", "설탕 5g(1작은술)",
+    "당근 30g(1/5개)", "달걀 50g(1개)", "두부 80g(1/4모)", "소금 약간", "다진 마늘 5g(1작은술)",
+    "고추장 15g(1큰술)", "감자 100g(1개)", "애호박 50g(1/3개)", "닭가슴살 100g", "참기름 약간",
+    "청양고추 5g(1개)", "우유 200ml(1컵)", "밀가루 30g(3큰술)", "새우 40g(5마리)", "시금치 30g",
+]
+
+
+def make_row(seq: int) -> dict:
+    """seq로 결정되는 가짜 레시피 row (같은 seq면 항상 같은 값)"""
+    rnd = random.Random(seq)
+    parts = rnd.sample(_INGREDIENTS, rnd.randint(4, 9))
+    title = f"가짜레시피{seq}"
+    row = {
+        "RCP_SEQ": str(seq),
+        "RCP_NM": title,
+        "RCP_PARTS_DTLS": f"{title}\n" + ", ".join(parts[:-1]) + f"\n고명\n{parts[-1]}",
+        "ATT_FILE_NO_MAIN": f"http://fake.local/img/{seq}_main.png",
+        "ATT_FILE_NO_MK": f"http://fake.local/img/{seq}_mk.png",
+        "INFO_NA": str(rnd.randint(100, 1500)),
+        "INFO_CAR": str(rnd.randint(5, 90)),
+    }
+    n_steps = rnd.randint(3, 6)
+    for i in range(1, 21):
+        key = str(i).zfill(2)
+        if i <= n_steps:
+            row[f"MANUAL{key}"] = f"{i}. {title} 조리 단계 {i}"
+            row[f"MANUAL_IMG{key}"] = f"http://fake.local/img/{seq}_{key}.png"
+        else:
+            row[f"MANUAL{key}"] = ""
+            row[f"MANUAL_IMG{key}"] = ""
+    return row
+
+
+class FakeFoodsafetyHandler(BaseHTTPRequestHandler):
+    # 서버 인스턴스에 total/latency_ms/fail_rate 설정
+
+    def do_GET(self):
+        server = self.server
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+
+        m = _PATH.match(self.path)
+        if not m:
+            self._send(404, {"error": "not found"})
+            return
+
+        if server.fail_rate and random.random() < server.fail_rate:
+            self._send(503, {"error": "fake upstream failure"})
+            return
+
+        start, end = int(m.group(1)), int(m.group(2))
+        name_query = unquote(m.group(3) or "")
+
+        rows = [make_row(seq) for seq in range(max(1, start), min(end, server.total) + 1)]
+        if name_query:
+            rows = [r for r in rows if name_query in r["RCP_NM"]]
+
+        if rows:
+            result = {"MSG": "정상처리되었습니다.", "CODE": "INFO-000"}
+        else:
+            result = {"MSG": "해당하는 데이터가 없습니다.", "CODE": "INFO-200"}
+
+        server.request_count += 1
+        self._send(200, {
+            "COOKRCP01": {
+                "total_count": str(server.total),
+                "row": rows,
+                "RESULT": result,
+            }
+        })
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=0, total=1146, latency_ms=0, fail_rate=0.0, verbose=False):
+    """port=0이면 빈 포트 자동 할당"""
+    server = ThreadingHTTPServer((host, port), FakeFoodsafetyHandler)
+    server.daemon_threads = True
+    server.total = total
+    server.latency_ms = latency_ms
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.request_count = 0
+    return server
+
+
+def start_in_thread(**kwargs):
+    """
+    백그라운드 스레드로 가짜 서버 실행.
+    return: (server, base_url)  → 끝나면 server.shutdown()
+    """
+    server = make_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/api"
@@ -0,0 +1,92 @@
+# 로컬 가짜 토스 파트너 API 서버 (로그인 부하 테스트용)
+#   POST /api-partner/v1/apps-in-toss/user/oauth2/generate-token
+#   GET  /api-partner/v1/apps-in-toss/user/oauth2/login-me
+# accessToken/userKey는 authorizationCode에서 결정됨 (같은 코드 → 같은 유저)
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TOKEN_PATH = "/api-partner/v1/apps-in-toss/user/oauth2/generate-token"
+_ME_PATH = "/api-partner/v1/apps-in-toss/user/oauth2/login-me"
+
+
+class FakeTossHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (커넥션 풀 재사용 확인용)
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+
+        if self.path != _TOKEN_PATH:
+            self._send(404, {"error": "not found"})
+            return
+
+        code = body.get("authorizationCode")
+        if not code:
+            self._send(400, {"error": "authorizationCode is required"})
+            return
+
+        self.server.request_count += 1
+        self._send(200, {
+            "accessToken": f"fake-token:{code}",
+            "refreshToken": f"fake-refresh:{code}",
+            "expiresIn": 3600,
+        })
+
+    def do_GET(self):
+        self._delay()
+        if self.path != _ME_PATH:
+            self._send(404, {"error": "not found"})
+            return
+
+        auth = self.headers.get("Authorization", "")
+        prefix = "Bearer fake-token:"
+        if not auth.startswith(prefix):
+            self._send(401, {"error": "invalid token"})
+            return
+
+        self.server.request_count += 1
+        self._send(200, {"userKey": auth[len(prefix):]})
+
+    def _delay(self):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000.0)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=0, latency_ms=0, verbose=False):
+    """port=0이면 빈 포트 자동 할당"""
+    server = ThreadingHTTPServer((host, port), FakeTossHandler)
+    server.daemon_threads = True
+    server.latency_ms = latency_ms
+    server.verbose = verbose
+    server.request_count = 0
+    return server
+
+
+def start_in_thread(**kwargs):
+    """
+    백그라운드 스레드로 가짜 서버 실행.
+    return: (server, base_url)  → settings.TOSS_API_BASE_URL에 base_url 지정
+    """
+    server = make_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
@@ -1,24 +1,28 @@
-import requests
 from django.conf import settings
 
-BASE = "http://openapi.foodsafetykorea.go.kr/api"
+from app.external.http import get_client
 
-def fetch_recipes_json(start=1, end=50, name_query=None):
+
+def fetch_recipes_json(start=1, end=50, name_query=None, base_url=None, api_key=None, retries=None):
     """
     COOKRCP01 레시피 목록 조회
     - dataType: json
     - startIdx/endIdx: 범위
     - RCP_NM: 메뉴명 검색(선택)
+    - base_url/api_key: 로컬 가짜 서버 등으로 바꿀 때만 지정
+    - retries: None이면 공용 클라이언트 설정값
+    연결 오류/5xx가 재시도 후에도 계속되면 UpstreamError
     """
-    key = settings.FOODS_API_KEY
+    key = api_key or settings.FOODS_API_KEY
     if not key:
         raise RuntimeError("FOODS_API_KEY가 비어있음")
 
-    url = f"{BASE}/{key}/COOKRCP01/json/{start}/{end}"
+    base = (base_url or settings.FOODS_API_BASE_URL).rstrip("/")
+    url = f"{base}/{key}/COOKRCP01/json/{start}/{end}"
     if name_query:
         # 공식 문서에 RCP_NM 추가 파라미터 존재 :contentReference[oaicite:4]{index=4}
         url += f"/RCP_NM={name_query}"
 
-    res = requests.get(url, timeout=10)
+    res = get_client("foodsafety").get(url, endpoint="COOKRCP01", retries=retries)
     res.raise_for_status()
     return res.json()
@@ -0,0 +1,291 @@
+# 외부 API 공용 HTTP 클라이언트 (식약처 / 토스)
+# - 클라이언트(업스트림)별 requests.Session 하나 → 호스트별 keep-alive 커넥션 풀 재사용
+# - 동시 요청 수 제한 (BoundedSemaphore)
+# - 멱등 요청(GET 등)만 지터 포함 지수 백오프 재시도
+# - 엔드포인트별 타임아웃
+# - 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 바로 실패 (업스트림 장애 시 스레드 묶임 방지)
+# - 엔드포인트별 지연시간/에러 수 집계 (admin/status에서 확인)
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read)
+
+
+class UpstreamError(Exception):
+    """업스트림 호출 실패 (재시도 후에도 연결 오류/5xx)"""
+
+    def __init__(self, message, status_code=None, endpoint=""):
+        super().__init__(message)
+        self.status_code = status_code
+        self.endpoint = endpoint
+
+
+class CircuitOpenError(UpstreamError):
+    """서킷이 열려 있어서 호출하지 않고 바로 실패"""
+
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패 failure_threshold회) → open
+    open → (reset_timeout초 경과) → half-open: 한 번만 시험 호출 허용
+    half-open → 성공이면 closed, 실패면 다시 open
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # half-open: 시험 호출은 하나만
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        """결과 없이 끝난 시험 호출(취소/예상 못 한 예외) → 다음 요청이 다시 시험할 수 있게"""
+        with self._lock:
+            self._probing = False
+
+
+class LatencyStats:
+    """엔드포인트별 호출 수/에러 수/지연시간(ms) 집계 (최근 window개로 p50/p95)"""
+
+    def __init__(self, window=500):
+        self.window = window
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, elapsed_ms, ok, attempts):
+        with self._lock:
+            d = self._data.get(endpoint)
+            if d is None:
+                d = self._data[endpoint] = {
+                    "calls": 0, "errors": 0, "retries": 0, "max_ms": 0.0,
+                    "recent": deque(maxlen=self.window),
+                }
+            d["calls"] += 1
+            d["retries"] += max(0, attempts - 1)
+            if not ok:
+                d["errors"] += 1
+            d["max_ms"] = max(d["max_ms"], elapsed_ms)
+            d["recent"].append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, d in self._data.items():
+                recent = sorted(d["recent"])
+                n = len(recent)
+                result[endpoint] = {
+                    "calls": d["calls"],
+                    "errors": d["errors"],
+                    "retries": d["retries"],
+                    "p50_ms": round(recent[n // 2], 1) if n else None,
+                    "p95_ms": round(recent[min(n - 1, int(n * 0.95))], 1) if n else None,
+                    "max_ms": round(d["max_ms"], 1),
+                }
+            return result
+
+
+class HttpClient:
+    def __init__(self, name, pool_size=10, max_concurrency=10, retries=2, backoff=0.3,
+                 timeouts=None, default_timeout=DEFAULT_TIMEOUT,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats = LatencyStats()
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+        # urllib3 풀은 호스트별로 만들어짐 (가짜 서버 등 다른 호스트도 각자 풀 사용)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, endpoint="", timeout=None, retries=None, backoff=None, **kwargs):
+        """
+        요청 보내고 Response 반환 (4xx는 그대로 돌려줌 → 호출하는 쪽에서 처리)
+        연결 오류/타임아웃/5xx가 재시도 후에도 계속되면 UpstreamError.
+        retries 기본값: 멱등 메서드면 클라이언트 설정값, 아니면 0
+        """
+        method = method.upper()
+        endpoint = endpoint or method
+        if retries is None:
+            retries = self.retries if method in IDEMPOTENT_METHODS else 0
+        if backoff is None:
+            backoff = self.backoff
+        timeout = timeout or self.timeouts.get(endpoint, self.default_timeout)
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open ({endpoint})", endpoint=endpoint)
+
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                error, resp = None, None
+                try:
+                    with self._slots:
+                        resp = self.session.request(method, url, timeout=timeout, **kwargs)
+                except requests.RequestException as e:
+                    error = e
+
+                if error is None and resp.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    self._record(endpoint, started, True, attempt)
+                    return resp
+
+                if attempt > retries:
+                    break
+                time.sleep(backoff * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        except BaseException:
+            # 업스트림 실패로 세지는 않지만, half-open 시험 호출이었으면 풀어줌 (안 그러면 서킷이 계속 막힘)
+            self.breaker.release_probe()
+            self._record(endpoint, started, False, attempt)
+            raise
+
+        # 재시도 소진
+        self.breaker.record_failure()
+        self._record(endpoint, started, False, attempt)
+        if error is not None:
+            raise UpstreamError(f"{self.name} {endpoint} failed after {attempt} tries: {error}", endpoint=endpoint) from error
+        raise UpstreamError(
+            f"{self.name} {endpoint} failed after {attempt} tries: HTTP {resp.status_code}",
+            status_code=resp.status_code,
+            endpoint=endpoint,
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, endpoint, started, ok, attempts):
+        self.stats.record(endpoint, (time.monotonic() - started) * 1000.0, ok, attempts)
+
+
+class AsyncHttpClient:
+    """
+    async 뷰용 래퍼. 같은 이름의 동기 클라이언트(세션 풀/재시도/서킷/통계 공유)를
+    클라이언트 전용 스레드 풀(max_concurrency 크기)에서 실행 → 이벤트 루프도, 동기 뷰 전용 스레드도 막지 않음.
+    """
+
+    def __init__(self, client: HttpClient, executor: ThreadPoolExecutor):
+        self.client = client
+        self.executor = executor
+        self._request = sync_to_async(client.request, thread_sensitive=False, executor=executor)
+
+    async def request(self, method, url, **kwargs):
+        return await self._request(method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name) -> HttpClient:
+    """
+    이름별 공용 클라이언트 (프로세스당 하나).
+    설정: settings.EXTERNAL_HTTP[name] → HttpClient 인자
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                conf = getattr(settings, "EXTERNAL_HTTP", {}).get(name, {})
+                client = _clients[name] = HttpClient(name, **conf)
+    return client
+
+
+_async_clients = {}
+
+
+def get_async_client(name) -> AsyncHttpClient:
+    client = _async_clients.get(name)
+    if client is None:
+        sync_client = get_client(name)
+        with _clients_lock:
+            client = _async_clients.get(name)
+            if client is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=sync_client.max_concurrency,
+                    thread_name_prefix=f"http-{name}",
+                )
+                client = _async_clients[name] = AsyncHttpClient(sync_client, executor)
+    return client
+
+
+def reset_clients():
+    """설정 변경 후 클라이언트 재생성 (커넥션 풀 정리)"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.session.close()
+        for client in _async_clients.values():
+            client.executor.shutdown(wait=False)
+        _clients.clear()
+        _async_clients.clear()
+
+
+def http_metrics():
+    """클라이언트별 서킷 상태 + 엔드포인트별 지연시간"""
+    return {
+        name: {"circuit": client.breaker.state, "endpoints": client.stats.snapshot()}
+        for name, client in list(_clients.items())
+    }
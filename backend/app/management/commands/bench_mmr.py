@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.services.catalog import get_requirement_index
+from app.services.diversity import MMR_POOL, ingredient_bitsets, jaccard, mmr_rerank
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))], 1) if values else None
+
+
+class Command(BaseCommand):
+    help = "Benchmark MMR diversity re-ranking (ingredient bitset Jaccard) over random candidate pools from the catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pool", type=int, default=MMR_POOL, help="재정렬 후보 수")
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--lambda", dest="lam", type=float, default=0.7)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        index = get_requirement_index()
+        recipe_ids = list(index.requirements)
+        if not recipe_ids:
+            self.stdout.write(self.style.WARNING("레시피 재료 데이터 없음"))
+            return
+
+        rng = random.Random(options["seed"])
+        pool_size = max(1, min(options["pool"], len(recipe_ids)))
+        top = max(1, options["top"])
+        n = max(1, options["iterations"])
+
+        build_us, rerank_us, overlaps = [], [], []
+        for _ in range(n):
+            ids = rng.sample(recipe_ids, pool_size)
+            items = sorted(
+                ({"recipe_id": rid, "score": rng.random()} for rid in ids),
+                key=lambda x: x["score"], reverse=True,
+            )
+
+            t = time.perf_counter()
+            bitsets = ingredient_bitsets(ids, index)
+            build_us.append((time.perf_counter() - t) * 1e6)
+
+            t = time.perf_counter()
+            picked = mmr_rerank(items, bitsets, top, options["lam"])
+            rerank_us.append((time.perf_counter() - t) * 1e6)
+
+            # 재정렬 전/후 상위 top개의 평균 쌍별 유사도
+            overlaps.append((_mean_sim(items[:top], bitsets), _mean_sim([p[0] for p in picked], bitsets)))
+
+        # 쌍 하나 비용 (popcount 2번)
+        a, b = bitsets[ids[0]], bitsets[ids[-1]]
+        t = time.perf_counter()
+        for _ in range(100000):
+            jaccard(a, b)
+        pair_ns = (time.perf_counter() - t) * 1e4
+
+        before = sum(o[0] for o in overlaps) / n
+        after = sum(o[1] for o in overlaps) / n
+        self.stdout.write(self.style.SUCCESS(
+            f"pool={pool_size} top={top} lambda={options['lam']} iterations={n}\n"
+            f"  bitsets : p50={_pct(build_us, 0.5)}us p95={_pct(build_us, 0.95)}us\n"
+            f"  rerank  : p50={_pct(rerank_us, 0.5)}us p95={_pct(rerank_us, 0.95)}us "
+            f"(~{top * pool_size} jaccard, {pair_ns:.0f}ns each)\n"
+            f"  top-{top} mean pairwise similarity: {before:.3f} -> {after:.3f}"
+        ))
+
+
+def _mean_sim(items, bitsets):
+    ids = [x["recipe_id"] for x in items]
+    pairs = [(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]]
+    if not pairs:
+        return 0.0
+    return sum(jaccard(bitsets[a], bitsets[b]) for a, b in pairs) / len(pairs)
@@ -0,0 +1,82 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+ENDPOINTS = ["/api/auth/status/", "/api/profile/", "/api/pantry/"]
+# 중첩 atomic이 만드는 savepoint 쿼리는 요청 쿼리 수에서 뺌 (벤치를 트랜잭션 안에서 돌리므로)
+SAVEPOINT_SQL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def _bench_caches():
+    """
+    벤치 전용 캐시: 프로세스 안 LocMem (운영 캐시(Redis)의 키를 읽거나 지우지 않음).
+    세션/인증 캐시가 모두 default를 쓰므로 default 자리를 이걸로 바꿔 끼움.
+    """
+    return {
+        **settings.CACHES,
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"bench-sessions-{uuid.uuid4().hex}",
+        },
+    }
+
+
+def _pct(values, p):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))], 2) if values else None
+
+
+class Command(BaseCommand):
+    help = "Compare session engines: latency and django_session queries per authenticated request."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="엔진별 요청 수")
+        parser.add_argument(
+            "--modes",
+            default=",".join(settings.SESSION_ENGINES),
+            help="쉼표 구분 (cached_db,signed_cookies,cache,db)",
+        )
+
+    def handle(self, *args, **options):
+        if "testserver" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        n = max(1, options["requests"])
+        for mode in [m.strip() for m in options["modes"].split(",") if m.strip()]:
+            engine = settings.SESSION_ENGINES.get(mode)
+            if engine is None:
+                self.stdout.write(self.style.WARNING(f"unknown mode: {mode}"))
+                continue
+
+            # 엔진마다 빈 전용 캐시 + 롤백되는 트랜잭션 (세션/데모 유저 행이 실제 DB에 남지 않음)
+            with override_settings(SESSION_ENGINE=engine, CACHES=_bench_caches()), transaction.atomic():
+                client = Client()
+                client.post("/api/auth/demo/login/", {"demo_user": "user"}, content_type="application/json")
+
+                latencies = []
+                session_queries = 0
+                total_queries = 0
+                for i in range(n):
+                    url = ENDPOINTS[i % len(ENDPOINTS)]
+                    with CaptureQueriesContext(connection) as ctx:
+                        t = time.perf_counter()
+                        client.get(url)
+                        latencies.append((time.perf_counter() - t) * 1000)
+                    queries = [q["sql"] for q in ctx.captured_queries if not q["sql"].startswith(SAVEPOINT_SQL)]
+                    total_queries += len(queries)
+                    session_queries += sum(1 for sql in queries if "django_session" in sql)
+
+                client.post("/api/auth/logout/")
+                cache.clear()  # 전용 LocMem만 비움
+                transaction.set_rollback(True)
+
+            self.stdout.write(self.style.SUCCESS(
+                f"[{mode}] requests={n} p50={_pct(latencies, 0.5)}ms p95={_pct(latencies, 0.95)}ms "
+                f"queries/req={total_queries / n:.2f} session_queries/req={session_queries / n:.2f}"
+            ))
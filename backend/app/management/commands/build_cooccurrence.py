@@ -0,0 +1,61 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from app.models import Recipe, RecipeAction, UserRecipeStats
+from app.services.neighbors import compute_neighbors, index_path, write_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the item-item co-occurrence neighbor index (people who cooked/saved this also "
+        "cooked/saved ...) from RecipeAction + archived UserRecipeStats, and write the mmap file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=180, help="이 기간의 cook/save 액션만 사용")
+        parser.add_argument("--top", type=int, default=20, help="레시피당 이웃 수")
+        parser.add_argument("--min-support", type=int, default=2, help="최소 공동 유저 수")
+        parser.add_argument("--max-items-per-user", type=int, default=200)
+        parser.add_argument("--output", default=None, help="기본 NEIGHBOR_INDEX_PATH")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        public_ids = set(Recipe.objects.filter(is_public=True).values_list("id", flat=True))
+
+        # 유저별 cook/save 레시피 (오래된 것 → 최근 순)
+        user_items = defaultdict(list)
+        # 아카이브된 예전 액션 (UserRecipeStats) 먼저
+        for user_id, recipe_id in (
+            UserRecipeStats.objects.filter(Q(cooked__gt=0) | Q(saved__gt=0))
+        ).order_by("last_action_at").values_list("user_id", "recipe_id"):
+            if recipe_id in public_ids:
+                user_items[user_id].append(recipe_id)
+
+        since = timezone.now() - timedelta(days=options["days"])
+        for user_id, recipe_id in (
+            RecipeAction.objects.filter(action__in=["cook", "save"], created_at__gte=since)
+            .order_by("created_at")
+            .values_list("user_id", "recipe_id")
+            .iterator(chunk_size=5000)
+        ):
+            if recipe_id in public_ids:
+                user_items[user_id].append(recipe_id)
+
+        neighbors = compute_neighbors(
+            user_items,
+            top_n=max(1, options["top"]),
+            min_support=max(1, options["min_support"]),
+            max_items_per_user=max(2, options["max_items_per_user"]),
+        )
+        path = options["output"] or index_path()
+        n = write_index(neighbors, path, top_n=options["top"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. users={len(user_items)}, recipes={len(neighbors)}, entries={n}, "
+            f"path={path}, elapsed={time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.services.related import TOP_K, build_related
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute ingredient-based related recipes (TF-IDF cosine top-k). "
+        "Incremental by default: only recipes marked related_dirty (new/re-parsed) and the lists they affect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="모든 레시피 다시 계산 (IDF 변화 반영)")
+        parser.add_argument("--top", type=int, default=TOP_K)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        recomputed, touched = build_related(
+            full=options["full"],
+            k=max(1, options["top"]),
+            batch_size=max(1, options["batch_size"]),
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. recomputed={recomputed}, updated_neighbors={touched}, "
+            f"elapsed={time.monotonic() - started:.2f}s"
+        ))
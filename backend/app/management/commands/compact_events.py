@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.retention import EVENT_TABLES, compact_table, count_expired, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive event rows older than the retention horizon to gzip NDJSON and delete them "
+        "in small batches (RecipeAction counts are rolled into UserRecipeStats first; "
+        "RecipeExposure rows only for days the conversion rollup has finished)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="보관 기간(일), 기본 EVENT_RETENTION_DAYS")
+        parser.add_argument("--tables", default=",".join(EVENT_TABLES), help="콤마 구분")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep-ms", type=int, default=50, help="배치 사이 대기 (다른 요청에 락 양보)")
+        parser.add_argument("--archive-dir", default=None, help="기본 EVENT_ARCHIVE_DIR")
+        parser.add_argument("--dry-run", action="store_true", help="Print only, no writes")
+
+    def handle(self, *args, **options):
+        tables = [t.strip() for t in options["tables"].split(",") if t.strip()]
+        unknown = [t for t in tables if t not in EVENT_TABLES]
+        if unknown:
+            raise CommandError(f"unknown tables: {', '.join(unknown)} (choices: {', '.join(EVENT_TABLES)})")
+
+        cutoff = retention_cutoff(options["days"])
+        self.stdout.write(f"cutoff: {cutoff.isoformat()}")
+
+        if options["dry_run"]:
+            for name in tables:
+                self.stdout.write(f"  {name}: {count_expired(name, cutoff)} rows to archive")
+            self.stdout.write(self.style.WARNING("(DRY RUN - no actual changes)"))
+            return
+
+        started = time.monotonic()
+        total = 0
+        for name in tables:
+            moved, path = compact_table(
+                name,
+                cutoff,
+                batch_size=max(1, options["batch_size"]),
+                sleep_ms=options["sleep_ms"],
+                archive_dir=options["archive_dir"],
+                log=self.stdout.write,
+            )
+            total += moved
+            if path:
+                self.stdout.write(f"  {name}: {moved} rows → {path}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. archived={total}, elapsed={time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.services.digest import DEFAULT_DAYS, TOP_N, build_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute expiry digests: pantry items expiring within N days and the top recipes "
+        "that use them, one row per user (shown when the miniapp opens after a notification)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="오늘부터 며칠 안에 끝나는 재료")
+        parser.add_argument("--top", type=int, default=TOP_N)
+        parser.add_argument("--batch-size", type=int, default=500, help="청크당 유저 수")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users, written, deleted = build_digests(
+            days=max(0, options["days"]),
+            top=max(1, options["top"]),
+            batch_size=max(1, options["batch_size"]),
+            workers=max(1, options["workers"]),
+            dry_run=options["dry_run"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. users={users}, digests={written}, stale_deleted={deleted}, "
+            f"elapsed={time.monotonic() - started:.2f}s"
+        ))
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("(DRY RUN - no actual changes)"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from app.external.fake_foodsafety import make_server
+
+
+class Command(BaseCommand):
+    help = "Run a local fake COOKRCP01 API server for offline sync tests/benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", type=str, default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--total", type=int, default=1146, help="가짜 카탈로그 전체 레시피 수")
+        parser.add_argument("--latency-ms", type=int, default=0, help="응답마다 넣을 지연")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+        parser.add_argument("--verbose", action="store_true")
+
+    def handle(self, *args, **options):
+        server = make_server(
+            host=options["host"],
+            port=options["port"],
+            total=options["total"],
+            latency_ms=options["latency_ms"],
+            fail_rate=options["fail_rate"],
+            verbose=options["verbose"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake COOKRCP01 on http://{host}:{port}/api (total={options['total']})"
+        ))
+        self.stdout.write(f"  FOODS_API_BASE_URL=http://{host}:{port}/api FOODS_API_KEY=fake")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
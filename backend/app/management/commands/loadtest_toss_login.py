@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+
+from app.external import fake_toss
+from app.models import User
+from app.utils import get_or_create_user_by_toss_id, toss_generate_token, toss_get_user_info
+
+LOGIN_URL = "/api/auth/toss/login/"
+RECO_URL = "/api/recommendations/recipes/?top=5"
+USER_PREFIX = "loadtest-"
+
+
+def _pct(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p))], 1)
+
+
+def _legacy_login(code):
+    # 예전 동기 뷰와 같은 흐름 (비교용)
+    token = toss_generate_token(code, "DEFAULT")
+    info = toss_get_user_info(token["accessToken"])
+    return get_or_create_user_by_toss_id(str(info["userKey"]))
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test: concurrent Toss logins against a local fake Toss server, "
+        "measuring recommendation latency before/during the burst (in-process ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=50, help="동시 로그인 수")
+        parser.add_argument("--latency-ms", type=int, default=300, help="가짜 토스 API 응답 지연")
+        parser.add_argument("--reco-requests", type=int, default=20, help="기준선 측정용 추천 요청 수")
+        parser.add_argument(
+            "--compare-sync",
+            action="store_true",
+            help="동기 로그인 흐름(동기 뷰 스레드에서 실행)으로도 같은 부하를 걸어 비교",
+        )
+        parser.add_argument("--keep-users", action="store_true", help="테스트 유저 삭제 안 함")
+
+    def handle(self, *args, **options):
+        server, base_url = fake_toss.start_in_thread(latency_ms=options["latency_ms"])
+        settings.TOSS_API_BASE_URL = base_url
+        # django.test 클라이언트 호스트 허용
+        if "testserver" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        self.stdout.write(
+            f"FAKE TOSS: {base_url} (latency={options['latency_ms']}ms), logins={options['logins']}"
+        )
+        try:
+            modes = ["async"] + (["sync"] if options["compare_sync"] else [])
+            for mode in modes:
+                result = asyncio.run(self._run(mode, options))
+                self.stdout.write(self.style.SUCCESS(f"[{mode}] {result}"))
+        finally:
+            server.shutdown()
+            if not options["keep_users"]:
+                deleted, _ = User.objects.filter(toss_user_id__startswith=USER_PREFIX).delete()
+                self.stdout.write(f"CLEANUP: deleted={deleted}")
+
+    async def _run(self, mode, options):
+        reco_client = AsyncClient()
+
+        # 1) 기준선: 부하 없이 추천 API
+        baseline = []
+        for _ in range(options["reco_requests"]):
+            t = time.monotonic()
+            await reco_client.get(RECO_URL)
+            baseline.append((time.monotonic() - t) * 1000)
+
+        # 2) 로그인 폭주 + 그동안 추천 API 계속 호출
+        during = []
+        stop = asyncio.Event()
+
+        async def reco_loop():
+            while not stop.is_set():
+                t = time.monotonic()
+                await reco_client.get(RECO_URL)
+                during.append((time.monotonic() - t) * 1000)
+
+        legacy = sync_to_async(_legacy_login, thread_sensitive=True)
+
+        async def login(i):
+            code = f"{USER_PREFIX}{mode}-{i}"
+            t = time.monotonic()
+            if mode == "async":
+                resp = await AsyncClient().post(
+                    LOGIN_URL,
+                    {"authorizationCode": code, "referrer": "DEFAULT"},
+                    content_type="application/json",
+                )
+                ok = resp.status_code == 200
+            else:
+                try:
+                    await legacy(code)
+                    ok = True
+                except Exception:
+                    ok = False
+            return ok, (time.monotonic() - t) * 1000
+
+        started = time.monotonic()
+        reco_task = asyncio.create_task(reco_loop())
+        results = await asyncio.gather(*(login(i) for i in range(options["logins"])))
+        wall = time.monotonic() - started
+        stop.set()
+        await reco_task
+
+        login_ms = [ms for _, ms in results]
+        return {
+            "logins_ok": sum(1 for ok, _ in results if ok),
+            "logins_wall_sec": round(wall, 2),
+            "login_p50_ms": _pct(login_ms, 0.5),
+            "login_p95_ms": _pct(login_ms, 0.95),
+            "reco_baseline_p50_ms": _pct(baseline, 0.5),
+            "reco_baseline_p95_ms": _pct(baseline, 0.95),
+            "reco_during_p50_ms": _pct(during, 0.5),
+            "reco_during_p95_ms": _pct(during, 0.95),
+            "reco_during_requests": len(during),
+        }
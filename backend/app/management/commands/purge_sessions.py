@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from django_session in small batches (short write locks on SQLite)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--sleep-ms", type=int, default=50, help="배치 사이 대기 (다른 요청에 락 양보)")
+        parser.add_argument("--dry-run", action="store_true", help="Print only, no writes")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        cutoff = timezone.now()
+
+        if settings.SESSION_ENGINE.endswith(("signed_cookies", ".cache")):
+            self.stdout.write(f"SESSION_ENGINE={settings.SESSION_ENGINE}: DB 세션 테이블을 쓰지 않음 (정리할 것 없음)")
+            return
+
+        expired = Session.objects.filter(expire_date__lt=cutoff)
+        if options["dry_run"]:
+            self.stdout.write(f"expired sessions: {expired.count()}")
+            self.stdout.write(self.style.WARNING("(DRY RUN - no actual changes)"))
+            return
+
+        deleted = 0
+        started = time.monotonic()
+        while True:
+            keys = list(expired.values_list("session_key", flat=True)[:batch_size])
+            if not keys:
+                break
+            with transaction.atomic():
+                n, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += n
+            if len(keys) < batch_size:
+                break
+            if options["sleep_ms"]:
+                time.sleep(options["sleep_ms"] / 1000.0)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. deleted={deleted}, elapsed={time.monotonic() - started:.2f}s"
+        ))
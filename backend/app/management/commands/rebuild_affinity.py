@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import RecipeAction, UserIngredientAffinity, UserRecipeAffinity
+from app.services.affinity import HALF_LIFE_DAYS, apply_actions
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild time-decayed user affinity (recipe + canonical ingredient) from RecipeAction rows. "
+        "Needed once after deploy, or after changing weights/half-life."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=HALF_LIFE_DAYS * 8,
+            help="이 기간 액션만 반영 (그 이전은 감쇠돼서 거의 0)",
+        )
+        parser.add_argument("--user-id", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        actions = RecipeAction.objects.filter(created_at__gte=since)
+        if options["user_id"]:
+            actions = actions.filter(user_id=options["user_id"])
+
+        batch_size = max(1, options["batch_size"])
+        total = 0
+        with transaction.atomic():
+            targets = {"user_id": options["user_id"]} if options["user_id"] else {}
+            UserRecipeAffinity.objects.filter(**targets).delete()
+            UserIngredientAffinity.objects.filter(**targets).delete()
+
+            last_id = 0
+            while True:
+                batch = list(
+                    actions.filter(id__gt=last_id)
+                    .order_by("id")
+                    .only("id", "user_id", "recipe_id", "action", "created_at")[:batch_size]
+                )
+                if not batch:
+                    break
+                apply_actions(batch)
+                total += len(batch)
+                last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. actions={total}, recipe_rows={UserRecipeAffinity.objects.count()}, "
+            f"ingredient_rows={UserIngredientAffinity.objects.count()}"
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.services.dietary import recompute_canonical_flags, recompute_recipe_flags
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute allergen/diet bitmasks for canonical ingredients and recipes "
+        "(after changing rules in app/services/dietary.py or the ingredient graph)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        canonicals = recompute_canonical_flags()
+        recipes = recompute_recipe_flags(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. canonical_changed={canonicals}, recipe_changed={recipes}"
+        ))
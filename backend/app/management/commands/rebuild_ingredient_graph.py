@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Ingredient
+from app.services.ingredient_graph import (
+    bump_ingredient_graph_version,
+    canonical_id_for,
+    get_ingredient_graph,
+)
+
+
+class Command(BaseCommand):
+    help = "Link Ingredient rows to canonical ingredients and bump the graph version."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--relink",
+            action="store_true",
+            help="이미 연결된 재료도 사전 기준으로 다시 연결",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        graph = get_ingredient_graph()
+
+        qs = Ingredient.objects.all()
+        if not options["relink"]:
+            qs = qs.filter(canonical__isnull=True)
+
+        changed = []
+        for ing in qs.only("id", "name_ko", "canonical_id"):
+            cid = canonical_id_for(ing.name_ko)
+            if cid != ing.canonical_id:
+                ing.canonical_id = cid
+                changed.append(ing)
+
+        Ingredient.objects.bulk_update(changed, ["canonical"], batch_size=500)
+        version = bump_ingredient_graph_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. linked={len(changed)}, canonical_nodes={len(graph.parents)}, graph_version={version}"
+        ))
@@ -0,0 +1,142 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from app.models import CanonicalIngredient, Ingredient, Recipe, RecipeIngredient
+from app.services.catalog import bump_catalog_version
+from app.services.dietary import recompute_recipe_flags
+from app.services.ingredient_graph import get_or_create_ingredient
+from app.services.ingredient_parser import parse_parts_dtls
+from app.signals import graph_bulk_edit
+
+
+class Command(BaseCommand):
+    help = "Re-parse raw_ingredients (RCP_PARTS_DTLS) of existing recipes into clean RecipeIngredient rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="어디에서도 쓰지 않는 Ingredient/CanonicalIngredient 삭제",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print only, no writes"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        dry_run = options["dry_run"]
+
+        vocab_before = Ingredient.objects.count()
+
+        recipe_ids = list(
+            Recipe.objects.exclude(raw_ingredients="")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        ing_cache = {}  # name -> Ingredient (이번 실행 동안 재사용)
+        changed_recipes = 0
+        parsed_rows = 0
+
+        for i in range(0, len(recipe_ids), batch_size):
+            chunk = recipe_ids[i:i + batch_size]
+            changed_ids = []
+            with transaction.atomic():
+                for recipe in Recipe.objects.filter(id__in=chunk).only("id", "title", "raw_ingredients"):
+                    parsed = parse_parts_dtls(recipe.raw_ingredients, title=recipe.title)
+                    parsed_rows += len(parsed)
+                    if dry_run:
+                        continue
+                    if self._replace_ingredients(recipe, parsed, ing_cache):
+                        changed_recipes += 1
+                        changed_ids.append(recipe.id)
+                # 재료가 바뀐 레시피는 관련 레시피 다시 계산 대상 (build_related)
+                if changed_ids:
+                    Recipe.objects.filter(id__in=changed_ids).update(related_dirty=True)
+                    recompute_recipe_flags(changed_ids)
+
+            self.stdout.write(f"  {min(i + batch_size, len(recipe_ids))}/{len(recipe_ids)} recipes")
+
+        pruned = (0, 0)
+        if options["prune"] and not dry_run:
+            pruned = self._prune()
+        if changed_recipes and not dry_run:
+            bump_catalog_version()  # 장보기 분석의 레시피 재료 스냅샷 재로드
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. recipes={len(recipe_ids)}, changed={changed_recipes}, parsed_rows={parsed_rows}, "
+            f"vocab={vocab_before}->{Ingredient.objects.count()}, "
+            f"pruned_ingredients={pruned[0]}, pruned_canonicals={pruned[1]}"
+        ))
+        if dry_run:
+            self.stdout.write(self.style.WARNING("(DRY RUN - no actual changes)"))
+
+    def _replace_ingredients(self, recipe, parsed, ing_cache):
+        """파싱 결과로 RecipeIngredient 교체. 바뀐 게 있으면 True"""
+        desired = {}
+        for p in parsed:
+            ing = ing_cache.get(p.name)
+            if ing is None:
+                ing = ing_cache[p.name] = get_or_create_ingredient(p.name)
+            # 다른 표기가 같은 Ingredient로 모이면 첫 번째 값 유지
+            desired.setdefault(ing.id, p)
+
+        current = {
+            ri.ingredient_id: ri
+            for ri in RecipeIngredient.objects.filter(recipe=recipe)
+        }
+
+        stale = [iid for iid in current if iid not in desired]
+        to_create = []
+        to_update = []
+        for iid, p in desired.items():
+            ri = current.get(iid)
+            if ri is None:
+                to_create.append(RecipeIngredient(
+                    recipe=recipe,
+                    ingredient_id=iid,
+                    amount_text=p.amount_text,
+                    is_optional=p.is_optional,
+                ))
+            elif ri.amount_text != p.amount_text or ri.is_optional != p.is_optional:
+                ri.amount_text = p.amount_text
+                ri.is_optional = p.is_optional
+                to_update.append(ri)
+
+        if stale:
+            RecipeIngredient.objects.filter(recipe=recipe, ingredient_id__in=stale).delete()
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ["amount_text", "is_optional"])
+
+        return bool(stale or to_create or to_update)
+
+    @transaction.atomic
+    def _prune(self):
+        # 레시피/냉장고 어디에서도 안 쓰는 재료
+        ing_deleted, _ = (
+            Ingredient.objects
+            .annotate(n_recipes=Count("ingredient_recipes"), n_pantries=Count("in_pantries"))
+            .filter(n_recipes=0, n_pantries=0)
+            .delete()
+        )
+        # 연결된 재료/동의어/하위 노드가 없고 상위도 없는 단독 표준 재료
+        orphan_ids = list(
+            CanonicalIngredient.objects
+            .filter(parent__isnull=True)
+            .annotate(
+                n_ing=Count("ingredients", distinct=True),
+                n_syn=Count("synonym_entries", distinct=True),
+                n_child=Count("children", distinct=True),
+            )
+            .filter(Q(n_ing=0) & Q(n_syn=0) & Q(n_child=0))
+            .values_list("id", flat=True)
+        )
+        with graph_bulk_edit():
+            canon_deleted, _ = CanonicalIngredient.objects.filter(id__in=orphan_ids).delete()
+        return ing_deleted, canon_deleted
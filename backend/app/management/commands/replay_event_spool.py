@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app.services.actions import action_buffer
+from app.services.impressions import impression_buffer
+
+
+class Command(BaseCommand):
+    help = "Replay write-behind spool files left by dead processes (recipe actions, recommendation impressions)."
+
+    def handle(self, *args, **options):
+        for buf in [action_buffer, impression_buffer]:
+            replayed = buf.replay_orphans()
+            self.stdout.write(self.style.SUCCESS(f"{buf.name}: replayed={replayed} ({buf.spool_dir})"))
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.services.conversion import ATTRIBUTION_DAYS, rollup_day, rollup_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll up daily recommendation conversion (per user + global). "
+        "Incremental; schedule it (e.g. cron every hour)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attribution-days", type=int, default=ATTRIBUTION_DAYS)
+        parser.add_argument("--day", help="특정 날짜만 다시 집계 (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        attribution_days = max(0, options["attribution_days"])
+
+        if options["day"]:
+            try:
+                day = datetime.strptime(options["day"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--day must be YYYY-MM-DD")
+            users, rec, conv = rollup_day(day)
+            self.stdout.write(self.style.SUCCESS(f"{day}: users={users}, recommended={rec}, converted={conv}"))
+            return
+
+        days = rollup_pending(attribution_days=attribution_days, log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS(f"Done. days={days}"))
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import AppSetting
+from app.services.scoring import (
+    DEFAULT_WEIGHTS,
+    SPLIT_KEY,
+    WEIGHT_KEY_PREFIX,
+    ScoringWeights,
+    bump_scoring_version,
+    get_scoring_config,
+    parse_split,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show or tune recommendation scoring profiles without redeploying "
+        "(weights and A/B split are stored in AppSetting, all processes reload within 30s)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", default="default")
+        parser.add_argument("--set", nargs="+", default=[], metavar="NAME=VALUE", help="가중치 덮어쓰기")
+        parser.add_argument("--unset", nargs="+", default=[], metavar="NAME", help="덮어쓰기 삭제 (settings/기본값으로)")
+        parser.add_argument(
+            "--split", help='프로필별 유저 비율(%%), 예: "default:90,b:10" (합 100 이하, 나머지는 default)'
+        )
+
+    def handle(self, *args, **options):
+        pid = options["profile"].strip()
+        if not pid or ":" in pid:
+            raise CommandError(f"invalid profile id: {pid!r}")
+
+        changed = False
+        for item in options["set"]:
+            name, _, value = item.partition("=")
+            if name not in ScoringWeights._fields:
+                raise CommandError(f"unknown weight: {name} (choices: {', '.join(ScoringWeights._fields)})")
+            try:
+                float(value)
+            except ValueError:
+                raise CommandError(f"not a number: {item}")
+            AppSetting.objects.update_or_create(key=f"{WEIGHT_KEY_PREFIX}{pid}:{name}", defaults={"value": value})
+            changed = True
+        for name in options["unset"]:
+            AppSetting.objects.filter(key=f"{WEIGHT_KEY_PREFIX}{pid}:{name}").delete()
+            changed = True
+        if options["split"] is not None:
+            split = parse_split(options["split"])
+            if not split:
+                raise CommandError(f"invalid split: {options['split']!r}")
+            if sum(split.values()) > 100:
+                raise CommandError(f"split total over 100%: {options['split']!r}")
+            AppSetting.objects.update_or_create(
+                key=SPLIT_KEY, defaults={"value": ",".join(f"{p}:{s}" for p, s in split.items())}
+            )
+            changed = True
+
+        if changed:
+            version = bump_scoring_version()
+            self.stdout.write(self.style.SUCCESS(f"scoring config version -> {version}"))
+
+        config = get_scoring_config()
+        lower = 0
+        for upper, profile in config.buckets:
+            self.stdout.write(f"bucket {lower:g}-{upper:g}: {profile.id}")
+            lower = upper
+        for profile in config.profiles.values():
+            diff = {
+                name: value for name, value in profile.w._asdict().items()
+                if value != getattr(DEFAULT_WEIGHTS, name)
+            }
+            self.stdout.write(f"[{profile.id}] {diff or '(defaults)'}")
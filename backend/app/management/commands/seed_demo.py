@@ -2,7 +2,10 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from datetime import date, timedelta
 
-from app.models import Ingredient, Recipe, RecipeIngredient, UserPantry
+from app.models import Recipe, RecipeIngredient, UserPantry
+from app.services.catalog import bump_catalog_version
+from app.services.dietary import recompute_recipe_flags
+from app.services.ingredient_graph import get_or_create_ingredient
 from app.utils import get_or_create_test_user
 
 
@@ -14,11 +17,11 @@ class Command(BaseCommand):
         user = get_or_create_test_user()
 
         # Ingredients
-        egg, _ = Ingredient.objects.get_or_create(name_ko="계란")
-        scallion, _ = Ingredient.objects.get_or_create(name_ko="대파")
-        salt, _ = Ingredient.objects.get_or_create(name_ko="소금")
-        soy, _ = Ingredient.objects.get_or_create(name_ko="간장")
-        garlic, _ = Ingredient.objects.get_or_create(name_ko="마늘")
+        egg = get_or_create_ingredient("계란")
+        scallion = get_or_create_ingredient("대파")
+        salt = get_or_create_ingredient("소금")
+        soy = get_or_create_ingredient("간장")
+        garlic = get_or_create_ingredient("마늘")
 
         # Recipes
         r1, _ = Recipe.objects.get_or_create(
@@ -49,6 +52,8 @@ class Command(BaseCommand):
         RecipeIngredient.objects.get_or_create(recipe=r3, ingredient=egg, defaults={"is_optional": False, "amount_text": "2개"})
         RecipeIngredient.objects.get_or_create(recipe=r3, ingredient=salt, defaults={"is_optional": False, "amount_text": "약간"})
         RecipeIngredient.objects.get_or_create(recipe=r3, ingredient=scallion, defaults={"is_optional": True, "amount_text": "조금"})
+        recompute_recipe_flags([r1.id, r2.id, r3.id])
+        bump_catalog_version()
 
         # Pantry (유저 냉장고): 계란은 임박(보너스 확인용), 소금 보유
         UserPantry.objects.get_or_create(
@@ -11,6 +11,12 @@ class Command(BaseCommand):
         parser.add_argument("--limit", type=int, default=30)
         parser.add_argument("--query", type=str, default="")
         parser.add_argument("--start", type=int, default=None)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="트랜잭션 하나에 넣을 행 수 (기본: settings.FOODSAFETY_SEED_BATCH_SIZE)"
+        )
         parser.add_argument(
             "--force-update",
             action="store_true",
@@ -44,10 +50,13 @@ class Command(BaseCommand):
             name_query=None,
         )
 
-        # 다음 실행 때 start를 밀어두기
+        # 다음 실행 때 start를 밀어두기 (전체 개수는 응답의 total_count 기준)
         next_start = end + 1
-        TOTAL = 1146  # MVP 하드코딩
-        if next_start > TOTAL:
+        try:
+            total = int(payload.get("COOKRCP01", {}).get("total_count") or 0)
+        except (TypeError, ValueError):
+            total = 0
+        if not total or next_start > total:
             next_start = 1
 
         setting.value = str(next_start)
@@ -96,5 +105,6 @@ class Command(BaseCommand):
         else:
             self.stdout.write("No rows to process")
 
-        result = seed_from_foodsafety_rows(rows, limit=limit)
+        result = seed_from_foodsafety_rows(rows, limit=limit, batch_size=options["batch_size"])
         self.stdout.write(self.style.SUCCESS(f"OK seed: {result}"))
+        self.stdout.write(f"THROUGHPUT: {result['rows_per_sec']} rows/sec ({result['elapsed_sec']}s)")
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.external import fake_foodsafety
+from app.services.foodsafety_sync import SyncError, sync_catalog
+
+
+class Command(BaseCommand):
+    help = "Sync the full COOKRCP01 catalog: concurrent paged fetch + bulk ingest, resumable."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--workers", type=int, default=4, help="동시 요청 수")
+        parser.add_argument("--retries", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="저장된 진행 위치 무시하고 처음부터"
+        )
+        parser.add_argument("--base-url", type=str, default=None, help="API 베이스 URL 변경")
+        parser.add_argument(
+            "--fake",
+            action="store_true",
+            help="프로세스 안에 가짜 COOKRCP01 서버를 띄워서 오프라인으로 실행 (벤치마크용)"
+        )
+        parser.add_argument("--fake-total", type=int, default=1146)
+        parser.add_argument("--fake-latency-ms", type=int, default=50)
+        parser.add_argument("--fake-fail-rate", type=float, default=0.0)
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"]
+        api_key = None
+        server = None
+
+        if options["fake"]:
+            server, base_url = fake_foodsafety.start_in_thread(
+                total=options["fake_total"],
+                latency_ms=options["fake_latency_ms"],
+                fail_rate=options["fake_fail_rate"],
+            )
+            api_key = "fake"
+            self.stdout.write(f"FAKE: {base_url}")
+
+        try:
+            result = sync_catalog(
+                page_size=options["page_size"],
+                workers=options["workers"],
+                resume=not options["restart"],
+                retries=options["retries"],
+                batch_size=options["batch_size"],
+                base_url=base_url,
+                api_key=api_key,
+                log=self.stdout.write,
+            )
+        except SyncError as e:
+            raise CommandError(str(e))
+        finally:
+            if server is not None:
+                server.shutdown()
+
+        style = self.style.SUCCESS if result["completed"] else self.style.WARNING
+        self.stdout.write(style(f"SYNC: {result}"))
+        self.stdout.write(f"THROUGHPUT: {result['rows_per_sec']} rows/sec ({result['elapsed_sec']}s)")
+        if not result["completed"]:
+            self.stdout.write(self.style.WARNING(
+                f"중단됨. 다시 실행하면 start={result['resume_from']}부터 재개"
+            ))
@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-19 06:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# 기존 utils.SYNONYM_MAP을 DB 사전으로 옮김
+# 표준 재료 → 동의어
+SYNONYMS = {
+    "계란": ["달걀", "전란", "계란흰자", "계란노른자", "달걀흰자", "달걀노른자", "흰자", "노른자"],
+    "파": ["대파", "쪽파", "실파"],
+    "설탕": ["슈가", "백설탕", "황설탕"],
+    "간장": ["진간장", "국간장", "양조간장"],
+    "고추": ["청양고추", "홍고추", "풋고추"],
+    "마늘": ["다진마늘", "마늘쫑"],
+    "양파": ["적양파"],
+    "돼지": ["돼지고기"],
+    "소": ["소고기", "쇠고기"],
+    "닭": ["닭고기"],
+}
+
+# 하위 재료 → 상위 재료 (하위 재료의 동의어)
+CHILDREN = {
+    "삼겹살": ("돼지", ["돼지삼겹"]),
+    "돼지목살": ("돼지", []),
+    "돼지앞다리": ("돼지", []),
+    "닭가슴살": ("닭", []),
+    "닭다리": ("닭", []),
+}
+
+
+def seed_graph(apps, schema_editor):
+    CanonicalIngredient = apps.get_model("app", "CanonicalIngredient")
+    IngredientSynonym = apps.get_model("app", "IngredientSynonym")
+
+    for name, synonyms in SYNONYMS.items():
+        canonical, _ = CanonicalIngredient.objects.get_or_create(name_ko=name)
+        for syn in synonyms:
+            IngredientSynonym.objects.get_or_create(name=syn, defaults={"canonical": canonical})
+
+    for name, (parent_name, synonyms) in CHILDREN.items():
+        parent = CanonicalIngredient.objects.get(name_ko=parent_name)
+        child, _ = CanonicalIngredient.objects.get_or_create(name_ko=name, defaults={"parent": parent})
+        for syn in synonyms:
+            IngredientSynonym.objects.get_or_create(name=syn, defaults={"canonical": child})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_recipe_thumbnail_recipestep_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CanonicalIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name_ko', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IngredientSynonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='canonicalingredient',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='app.canonicalingredient'),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingredients', to='app.canonicalingredient'),
+        ),
+        migrations.AddField(
+            model_name='ingredientsynonym',
+            name='canonical',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='synonym_entries', to='app.canonicalingredient'),
+        ),
+        migrations.RunPython(seed_graph, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_canonical_ingredient_graph'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='external_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+    ]
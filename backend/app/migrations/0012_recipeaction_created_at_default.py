@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 16:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_recipe_external_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipeaction',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
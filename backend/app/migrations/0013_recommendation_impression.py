@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 16:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_recipeaction_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationImpression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('served_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('impression_id', models.UUIDField(db_index=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recommendationimpression',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impressions', to='app.recipe'),
+        ),
+        migrations.AddField(
+            model_name='recommendationimpression',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impressions', to='app.user'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendationimpression',
+            index=models.Index(fields=['user', '-served_at'], name='app_recomme_user_id_08ad05_idx'),
+        ),
+    ]
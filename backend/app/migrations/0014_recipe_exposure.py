@@ -0,0 +1,80 @@
+# Generated by Django 6.0 on 2026-10-19 17:05
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_exposures(apps, schema_editor):
+    """기존 RecommendationHistory(JSON 리스트) + RecommendationImpression → 날짜별 노출 수"""
+    RecommendationHistory = apps.get_model("app", "RecommendationHistory")
+    RecommendationImpression = apps.get_model("app", "RecommendationImpression")
+    RecipeExposure = apps.get_model("app", "RecipeExposure")
+    Recipe = apps.get_model("app", "Recipe")
+
+    counts = Counter()
+    for user_id, created_at, recipe_ids in (
+        RecommendationHistory.objects.values_list("user_id", "created_at", "result_recipe_ids").iterator()
+    ):
+        day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+        for rid in set(recipe_ids or []):
+            if isinstance(rid, int):
+                counts[(user_id, rid, day)] += 1
+
+    for user_id, recipe_id, served_at in (
+        RecommendationImpression.objects.values_list("user_id", "recipe_id", "served_at").iterator()
+    ):
+        day = timezone.localdate(served_at) if timezone.is_aware(served_at) else served_at.date()
+        counts[(user_id, recipe_id, day)] += 1
+
+    if not counts:
+        return
+
+    valid_recipes = set(Recipe.objects.values_list("id", flat=True))
+    RecipeExposure.objects.bulk_create(
+        [
+            RecipeExposure(user_id=u, recipe_id=r, day=d, count=n)
+            for (u, r, d), n in counts.items()
+            if r in valid_recipes
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_recommendation_impression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeExposure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recipeexposure',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exposures', to='app.recipe'),
+        ),
+        migrations.AddField(
+            model_name='recipeexposure',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exposures', to='app.user'),
+        ),
+        migrations.AddIndex(
+            model_name='recipeexposure',
+            index=models.Index(fields=['user', 'day'], name='app_recipee_user_id_3dabc9_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeexposure',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe', 'day'), name='unique_recipe_exposure_day'),
+        ),
+        migrations.RunPython(backfill_exposures, migrations.RunPython.noop),
+    ]
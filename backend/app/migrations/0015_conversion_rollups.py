@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 17:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_recipe_exposure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversionDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('recommended', models.PositiveIntegerField(default=0)),
+                ('converted', models.PositiveIntegerField(default=0)),
+                ('conversion_rate', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserConversionDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('recommended', models.PositiveIntegerField(default=0)),
+                ('converted', models.PositiveIntegerField(default=0)),
+                ('conversion_rate', models.FloatField(default=0.0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userconversiondaily',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversion_daily', to='app.user'),
+        ),
+        migrations.AddConstraint(
+            model_name='userconversiondaily',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_user_conversion_day'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_converted(apps, schema_editor):
+    """
+    impression_id가 없던 기존 액션 → 예전 기준(노출일부터 7일 안의 cook/save)으로 한 번만 채움.
+    이후로는 impression_id로 귀속된 액션만 증가.
+    """
+    RecipeAction = apps.get_model("app", "RecipeAction")
+    RecipeExposure = apps.get_model("app", "RecipeExposure")
+
+    actions = {}
+    for user_id, recipe_id, created_at in (
+        RecipeAction.objects.filter(action__in=["cook", "save"])
+        .values_list("user_id", "recipe_id", "created_at")
+        .iterator()
+    ):
+        day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+        actions.setdefault((user_id, recipe_id), []).append(day)
+    if not actions:
+        return
+
+    to_update = []
+    for exp in RecipeExposure.objects.only("id", "user_id", "recipe_id", "day").iterator():
+        days = actions.get((exp.user_id, exp.recipe_id))
+        if days and any(exp.day <= d <= exp.day + timedelta(days=7) for d in days):
+            exp.converted = 1
+            to_update.append(exp)
+    RecipeExposure.objects.bulk_update(to_update, ["converted"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_conversion_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipeaction',
+            name='impression_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipeexposure',
+            name='converted',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_converted, migrations.RunPython.noop),
+    ]
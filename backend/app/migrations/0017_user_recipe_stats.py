@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 19:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_action_impression_attribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRecipeStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cooked', models.PositiveIntegerField(default=0)),
+                ('saved', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+                ('last_action_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userrecipestats',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='app.recipe'),
+        ),
+        migrations.AddField(
+            model_name='userrecipestats',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_stats', to='app.user'),
+        ),
+        migrations.AddConstraint(
+            model_name='userrecipestats',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_user_recipe_stats'),
+        ),
+    ]
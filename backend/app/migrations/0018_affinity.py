@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-19 20:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_user_recipe_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserIngredientAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserRecipeAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('engaged', models.FloatField(default=0.0)),
+                ('skipped', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='useringredientaffinity',
+            name='canonical',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_affinity', to='app.canonicalingredient'),
+        ),
+        migrations.AddField(
+            model_name='useringredientaffinity',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingredient_affinity', to='app.user'),
+        ),
+        migrations.AddField(
+            model_name='userrecipeaffinity',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_affinity', to='app.recipe'),
+        ),
+        migrations.AddField(
+            model_name='userrecipeaffinity',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_affinity', to='app.user'),
+        ),
+        migrations.AddConstraint(
+            model_name='useringredientaffinity',
+            constraint=models.UniqueConstraint(fields=('user', 'canonical'), name='unique_user_ingredient_affinity'),
+        ),
+        migrations.AddConstraint(
+            model_name='userrecipeaffinity',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='unique_user_recipe_affinity'),
+        ),
+    ]
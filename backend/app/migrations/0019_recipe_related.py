@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_affinity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeRelated',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related', serialize=False, to='app.recipe')),
+                ('neighbor_ids', models.JSONField(blank=True, default=list)),
+                ('scores', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='related_dirty',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 6.0 on 2026-10-19 22:45
+
+import re
+
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 규칙 사본 (app.services.dietary가 나중에 바뀌어도 결과가 같도록)
+# 규칙이 바뀐 뒤의 재계산은 rebuild_diet_flags 명령어로
+# (비트, 동물성 여부, [(키워드, exact), ...])
+_ALLERGEN_RULES = [
+    (1, True, [("계란", False), ("달걀", False), ("메추리알", False), ("흰자", False), ("노른자", False), ("마요네즈", False)]),  # egg
+    (2, True, [("우유", False), ("치즈", False), ("버터", False), ("생크림", False), ("요거트", False), ("요구르트", False), ("연유", False), ("분유", False)]),  # milk
+    (4, False, [("메밀", False)]),  # buckwheat
+    (8, False, [("땅콩", False)]),  # peanut
+    (16, False, [("대두", False), ("두부", False), ("두유", False), ("콩", True), ("간장", False), ("된장", False), ("청국장", False), ("고추장", False), ("쌈장", False)]),  # soy
+    (32, False, [("밀가루", False), ("밀", True), ("부침가루", False), ("튀김가루", False), ("빵가루", False), ("국수", False), ("소면", False), ("우동", False), ("라면", False), ("파스타", False), ("스파게티", False), ("만두피", False), ("빵", True), ("식빵", False)]),  # wheat
+    (64, True, [("고등어", False)]),  # mackerel
+    (128, True, [("게", True), ("꽃게", False), ("대게", False), ("게살", False), ("크랩", False)]),  # crab
+    (256, True, [("새우", False)]),  # shrimp
+    (512, True, [("돼지", False), ("삼겹", False), ("목살", False), ("베이컨", False), ("햄", True), ("소시지", False), ("소세지", False)]),  # pork
+    (1024, False, [("복숭아", False)]),  # peach
+    (2048, False, [("토마토", False), ("케첩", False), ("케찹", False)]),  # tomato
+    (4096, False, [("호두", False)]),  # walnut
+    (8192, True, [("닭", False)]),  # chicken
+    (16384, True, [("소고기", False), ("쇠고기", False), ("소", True), ("한우", False), ("우둔", False), ("차돌", False)]),  # beef
+    (32768, True, [("오징어", False)]),  # squid
+    (65536, True, [("조개", False), ("바지락", False), ("홍합", False), ("굴", True), ("전복", False), ("가리비", False), ("꼬막", False), ("굴소스", False)]),  # shellfish
+    (131072, False, [("잣", True)]),  # pine_nut
+]
+_DIET_RULES = [
+    (16777216, [("고기", False), ("멸치", False), ("액젓", False), ("젓갈", False), ("새우젓", False), ("꿀", True), ("참치", False), ("연어", False), ("생선", False), ("어묵", False), ("맛살", False), ("오리", False), ("양고기", False), ("육수", False), ("사골", False)]),  # ANIMAL
+    (33554432, [("간장", False), ("된장", False), ("고추장", False), ("쌈장", False), ("액젓", False), ("젓갈", False), ("새우젓", False), ("굴소스", False), ("김치", False), ("장아찌", False), ("베이컨", False), ("햄", True), ("소시지", False), ("스팸", False)]),  # HIGH_SODIUM
+    (67108864, [("밥", True), ("쌀", False), ("찹쌀", False), ("국수", False), ("소면", False), ("우동", False), ("라면", False), ("파스타", False), ("스파게티", False), ("떡", False), ("빵", True), ("식빵", False), ("감자", False), ("고구마", False), ("밀가루", False), ("당면", False), ("설탕", False), ("물엿", False)]),  # HIGH_CARB
+]
+_ANIMAL = 16777216
+
+
+def _normalize(s):
+    if not s:
+        return ""
+    text = s.strip().lower()
+    text = re.sub(r'\([^)]*\)', '', text)
+    text = re.sub(r'\[[^\]]*\]', '', text)
+    text = re.sub(r'\d+', '', text)
+    return re.sub(r'[^가-힣a-zA-Z]', '', text)
+
+
+def _matches(norm, rules):
+    return any((norm == kw) if exact else (kw in norm) for kw, exact in rules)
+
+
+def ingredient_flags(name):
+    norm = _normalize(name)
+    if not norm:
+        return 0
+    flags = 0
+    for bit, animal, rules in _ALLERGEN_RULES:
+        if _matches(norm, rules):
+            flags |= bit | (_ANIMAL if animal else 0)
+    for bit, rules in _DIET_RULES:
+        if _matches(norm, rules):
+            flags |= bit
+    return flags
+
+
+def backfill_diet_flags(apps, schema_editor):
+    """기존 표준 재료/레시피 비트 채우기 (이후로는 적재 때 계산)"""
+    CanonicalIngredient = apps.get_model("app", "CanonicalIngredient")
+    Recipe = apps.get_model("app", "Recipe")
+    RecipeIngredient = apps.get_model("app", "RecipeIngredient")
+
+    flags = {}
+    parents = {}
+    to_update = []
+    for c in CanonicalIngredient.objects.only("id", "name_ko", "parent_id"):
+        c.diet_flags = ingredient_flags(c.name_ko)
+        flags[c.id] = c.diet_flags
+        parents[c.id] = c.parent_id
+        if c.diet_flags:
+            to_update.append(c)
+    CanonicalIngredient.objects.bulk_update(to_update, ["diet_flags"], batch_size=500)
+
+    def with_ancestors(cid):
+        total, seen = 0, set()
+        while cid is not None and cid not in seen:
+            seen.add(cid)
+            total |= flags.get(cid, 0)
+            cid = parents.get(cid)
+        return total
+
+    recipe_flags = {}
+    for recipe_id, cid, name in RecipeIngredient.objects.values_list(
+        "recipe_id", "ingredient__canonical_id", "ingredient__name_ko"
+    ).iterator():
+        f = with_ancestors(cid) if cid is not None else ingredient_flags(name)
+        recipe_flags[recipe_id] = recipe_flags.get(recipe_id, 0) | f
+
+    to_update = []
+    for r in Recipe.objects.filter(id__in=[rid for rid, f in recipe_flags.items() if f]).only("id"):
+        r.diet_flags = recipe_flags[r.id]
+        to_update.append(r)
+    Recipe.objects.bulk_update(to_update, ["diet_flags"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_recipe_related'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='canonicalingredient',
+            name='diet_flags',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='diet_flags',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_diet_flags, migrations.RunPython.noop),
+    ]
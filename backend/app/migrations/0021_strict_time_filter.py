@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-19 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_diet_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='strict_time_filter',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='time_limit_factor',
+            field=models.FloatField(default=1.5),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['cook_time_min'], name='app_recipe_cook_ti_8b1f01_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 23:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_strict_time_filter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiryDigest',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expiry_digest', serialize=False, to='app.user')),
+                ('day', models.DateField()),
+                ('items', models.JSONField(blank=True, default=list)),
+                ('recipes', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userpantry',
+            index=models.Index(fields=['expires_at'], name='app_userpan_expires_430def_idx'),
+        ),
+    ]
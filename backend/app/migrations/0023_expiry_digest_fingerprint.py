@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-20 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_expiry_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expirydigest',
+            name='pantry_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
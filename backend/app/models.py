@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class User(models.Model):
@@ -10,6 +11,15 @@ class User(models.Model):
     def __str__(self):
         return self.nickname or f"user:{self.id}"
 
+    # DRF request.user로 쓰일 때 필요한 속성 (app.authentication)
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
 
 class UserProfile(models.Model):
     class DietType(models.TextChoices):
@@ -29,6 +39,9 @@ class UserProfile(models.Model):
     allergies = models.JSONField(default=list, blank=True)   # ["peanut", ...]
     spice_level = models.IntegerField(default=0)             # 0~3
     max_cook_time_min = models.IntegerField(default=20)
+    # 시간 엄격 모드: max_cook_time_min × time_limit_factor 넘는 레시피는 점수 계산 전에 제외
+    strict_time_filter = models.BooleanField(default=False)
+    time_limit_factor = models.FloatField(default=1.5)
     skill_level = models.CharField(max_length=20, choices=SkillLevel.choices, default=SkillLevel.BEGINNER)
     servings_default = models.IntegerField(default=1)
 
@@ -36,6 +49,34 @@ class UserProfile(models.Model):
         return f"profile:{self.user_id}"
 
 
+class CanonicalIngredient(models.Model):
+    """
+    표준 재료 노드.
+    - 여러 Ingredient(원문 표기)가 하나의 표준 재료를 가리킴
+    - parent로 상하위 관계 표현 (예: 삼겹살 → 돼지)
+    """
+    name_ko = models.CharField(max_length=100, unique=True)  # 정규화된 이름
+    parent = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="children"
+    )
+    # 알레르기/식단 비트 (app/services/dietary.py 규칙, 생성 때 계산)
+    diet_flags = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.name_ko
+
+
+class IngredientSynonym(models.Model):
+    # 동의어 → 표준 재료 (예: "달걀" → 계란)
+    name = models.CharField(max_length=100, unique=True)
+    canonical = models.ForeignKey(
+        CanonicalIngredient, on_delete=models.CASCADE, related_name="synonym_entries"
+    )
+
+    def __str__(self):
+        return f"{self.name}->{self.canonical_id}"
+
+
 class Ingredient(models.Model):
     class Category(models.TextChoices):
         MEAT = "MEAT", "MEAT"
@@ -48,6 +89,9 @@ class Ingredient(models.Model):
     name_en = models.CharField(max_length=100, blank=True, null=True)
     synonyms = models.JSONField(default=list, blank=True)  # ["파", "쪽파"]
     category = models.CharField(max_length=20, choices=Category.choices, default=Category.ETC)
+    canonical = models.ForeignKey(
+        CanonicalIngredient, on_delete=models.SET_NULL, null=True, blank=True, related_name="ingredients"
+    )
 
     def __str__(self):
         return self.name_ko
@@ -62,11 +106,31 @@ class UserPantry(models.Model):
 
     class Meta:
         unique_together = [("user", "ingredient")]  # 같은 재료 중복 등록 방지
+        indexes = [
+            models.Index(fields=["expires_at"]),  # 유통기한 임박 재료 일괄 조회 (expiry_digest)
+        ]
 
     def __str__(self):
         return f"{self.user_id}:{self.ingredient.name_ko}"
 
 
+class ExpiryDigest(models.Model):
+    """
+    유통기한 임박 재료 + 그 재료를 쓰는 추천 레시피 (expiry_digest 명령어가 미리 계산).
+    유저당 한 행: 알림 보고 앱을 열 때 추천 계산 없이 바로 보여줌
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="expiry_digest")
+    day = models.DateField()  # 계산 기준일
+    # 계산할 때의 냉장고 상태 해시 (utils.pantry_fingerprint) → 다르면 저장된 행 대신 즉시 계산
+    pantry_fingerprint = models.CharField(max_length=32, blank=True, default="")
+    items = models.JSONField(default=list, blank=True)    # [{name, expires_at, days_left}] 임박 순
+    recipes = models.JSONField(default=list, blank=True)  # [{recipe_id, title, uses, score}] 점수 순
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"digest:{self.user_id}@{self.day}({len(self.recipes)})"
+
+
 class Recipe(models.Model):
     class Difficulty(models.TextChoices):
         EASY = "EASY", "EASY"
@@ -82,6 +146,7 @@ class Recipe(models.Model):
     # 외부 API 자산화용
     external_source = models.CharField(max_length=30, blank=True, default="")  # ex) "foodsafety"
     external_id = models.CharField(max_length=100, blank=True, default="", db_index=True)
+    external_hash = models.CharField(max_length=40, blank=True, default="")  # 정규화된 원본 row 해시 (변경 감지)
 
     # 기본 정보
     title = models.CharField(max_length=200)
@@ -109,10 +174,16 @@ class Recipe(models.Model):
     tags = models.JSONField(default=list, blank=True)  # ["혼밥","간단"]
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # 재료가 바뀌어서 관련 레시피(RecipeRelated)를 다시 계산해야 함 (build_related 명령어가 처리)
+    related_dirty = models.BooleanField(default=True, db_index=True)
+    # 재료(+상위 재료) 알레르기/식단 비트 OR (적재 때 계산, 추천 하드 필터)
+    diet_flags = models.IntegerField(default=0)
 
     class Meta:
         indexes = [
             models.Index(fields=["external_source", "external_id"]),
+            # 조리 시간 범위 필터 (추천 시간 엄격 모드)
+            models.Index(fields=["cook_time_min"]),
         ]
         constraints = [
             # external_source + external_id 조합이 비어있지 않을 때만 유니크 제약
@@ -126,6 +197,20 @@ class Recipe(models.Model):
     def __str__(self):
         return self.title
 
+class RecipeRelated(models.Model):
+    """
+    재료 벡터(TF-IDF, canonical 재료) 코사인 유사도 상위 k개 관련 레시피 (build_related 명령어가 채움).
+    레시피당 한 행: 조회는 PK 한 번
+    """
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name="related")
+    neighbor_ids = models.JSONField(default=list, blank=True)  # 유사도 내림차순
+    scores = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"related:{self.recipe_id}({len(self.neighbor_ids)})"
+
+
 class RecipeIngredient(models.Model):
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="recipe_ingredients")
     ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name="ingredient_recipes")
@@ -164,6 +249,84 @@ class RecommendationHistory(models.Model):
     def __str__(self):
         return f"rec:{self.user_id}:{self.created_at}"
 
+class RecommendationImpression(models.Model):
+    """
+    추천 노출 로그: 추천 응답 한 번(impression_id)에 나간 레시피마다 한 행.
+    쿨타임/노출 횟수/전환 계산용 (RecommendationHistory의 JSON 리스트 대신)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="impressions")
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="impressions")
+    position = models.PositiveSmallIntegerField(default=0)  # 응답 내 순서 (0부터)
+    served_at = models.DateTimeField(default=timezone.now)
+    impression_id = models.UUIDField(db_index=True)
+
+    class Meta:
+        indexes = [
+            # 유저별 최근 N개 노출
+            models.Index(fields=["user", "-served_at"]),
+        ]
+
+    def __str__(self):
+        return f"imp:{self.user_id}:{self.recipe_id}:{self.position}"
+
+
+class RecipeExposure(models.Model):
+    """
+    유저 × 레시피 × 날짜별 추천 노출 횟수 (impression 적재 때 같이 증가).
+    노출 횟수/전환율을 impression 행을 훑지 않고 인덱스 집계로 계산.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="exposures")
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="exposures")
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    # 이 날 노출된 impression 중 cook/save로 이어진 수 (impression_id 귀속, 액션 적재 때 증가)
+    converted = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "recipe", "day"], name="unique_recipe_exposure_day"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "day"]),
+        ]
+
+    def __str__(self):
+        return f"exp:{self.user_id}:{self.recipe_id}:{self.day}={self.count}"
+
+
+class UserConversionDaily(models.Model):
+    """
+    유저별 일간 전환 집계 (rollup_conversions 명령어가 채움)
+    recommended: 그날 노출된 레시피 수, converted: 그중 귀속 기간 안에 cook/save 된 수
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="conversion_daily")
+    day = models.DateField()
+    recommended = models.PositiveIntegerField(default=0)
+    converted = models.PositiveIntegerField(default=0)
+    conversion_rate = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "day"], name="unique_user_conversion_day"),
+        ]
+
+    def __str__(self):
+        return f"conv:{self.user_id}:{self.day}={self.converted}/{self.recommended}"
+
+
+class ConversionDaily(models.Model):
+    """전체 유저 일간 전환 집계 (관리자 대시보드용)"""
+    day = models.DateField(unique=True)
+    users = models.PositiveIntegerField(default=0)
+    recommended = models.PositiveIntegerField(default=0)
+    converted = models.PositiveIntegerField(default=0)
+    conversion_rate = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"conv:{self.day}={self.converted}/{self.recommended}"
+
+
 class RecipeAction(models.Model):
     ACTION_CHOICES = [
         ("save", "save"),
@@ -174,7 +337,10 @@ class RecipeAction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipe_actions")
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="actions")
     action = models.CharField(max_length=10, choices=ACTION_CHOICES)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # 버퍼에서 나중에 적재돼도 요청 시각이 남도록 auto_now_add 대신 default
+    created_at = models.DateTimeField(default=timezone.now)
+    # 어느 추천 응답에서 나온 액션인지 (RecommendationImpression.impression_id), 검증된 것만 저장
+    impression_id = models.UUIDField(null=True, blank=True, db_index=True)
 
     class Meta:
         indexes = [
@@ -184,6 +350,63 @@ class RecipeAction(models.Model):
     def __str__(self):
         return f"{self.user_id}:{self.recipe_id}:{self.action}"
 
+class UserRecipeStats(models.Model):
+    """
+    보관 기간이 지나 아카이브된 RecipeAction의 누적 집계 (compact_events 명령어가 채움).
+    평생 횟수 = 이 행 + 아직 남아 있는 RecipeAction 행
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipe_stats")
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="user_stats")
+    cooked = models.PositiveIntegerField(default=0)
+    saved = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    last_action_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "recipe"], name="unique_user_recipe_stats"),
+        ]
+
+    def __str__(self):
+        return f"stats:{self.user_id}:{self.recipe_id} c{self.cooked}/s{self.saved}/k{self.skipped}"
+
+
+class UserRecipeAffinity(models.Model):
+    """
+    유저 × 레시피 시간 감쇠 점수 (액션 적재 때 행 하나만 갱신, app/services/affinity.py).
+    저장값은 updated_at 시점 기준 → 읽을 때 경과 시간만큼 감쇠
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="recipe_affinity")
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="user_affinity")
+    engaged = models.FloatField(default=0.0)  # cook/save
+    skipped = models.FloatField(default=0.0)  # skip
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "recipe"], name="unique_user_recipe_affinity"),
+        ]
+
+    def __str__(self):
+        return f"aff:{self.user_id}:{self.recipe_id} +{self.engaged:.2f}/-{self.skipped:.2f}"
+
+
+class UserIngredientAffinity(models.Model):
+    """유저 × canonical 재료 시간 감쇠 선호도 (cook/save는 +, skip은 -)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="ingredient_affinity")
+    canonical = models.ForeignKey(CanonicalIngredient, on_delete=models.CASCADE, related_name="user_affinity")
+    score = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "canonical"], name="unique_user_ingredient_affinity"),
+        ]
+
+    def __str__(self):
+        return f"iaff:{self.user_id}:{self.canonical_id}={self.score:.2f}"
+
+
 class UserSavedRecipe(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import UserProfile, UserPantry, Recipe, RecommendationHistory, RecipeStep
+from .services.dietary import ALLERGENS, allergen_key
 
 class UserPantrySerializer(serializers.ModelSerializer):
     ingredient_name = serializers.CharField(
@@ -27,9 +28,32 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "allergies",
             "spice_level",
             "max_cook_time_min",
+            "strict_time_filter",
+            "time_limit_factor",
             "skill_level",
             "servings_default",
         ]
+        extra_kwargs = {
+            "time_limit_factor": {"min_value": 1.0, "max_value": 5.0},
+        }
+
+    def validate_allergies(self, value):
+        """키(예: "peanut") 또는 한글 표시명(예: "땅콩") 목록 → 키 목록 (모르는 값은 400)"""
+        if not isinstance(value, list):
+            raise serializers.ValidationError("알레르기는 목록이어야 합니다.")
+        keys = []
+        unknown = []
+        for item in value:
+            key = allergen_key(item)
+            if key is None:
+                unknown.append(str(item))
+            elif key not in keys:
+                keys.append(key)
+        if unknown:
+            raise serializers.ValidationError(
+                f"알 수 없는 알레르기: {', '.join(unknown)} (가능: {', '.join(ALLERGENS)})"
+            )
+        return keys
 
 
 class RecipeRecommendationSerializer(serializers.Serializer):
@@ -49,6 +73,7 @@ class RecipeRecommendationSerializer(serializers.Serializer):
 class RecipeActionCreateSerializer(serializers.Serializer):
     recipe_id = serializers.IntegerField()
     action = serializers.ChoiceField(choices=["save", "cook", "skip"])
+    impression_id = serializers.UUIDField(required=False, allow_null=True)
 
 
 class RecommendationHistorySerializer(serializers.ModelSerializer):
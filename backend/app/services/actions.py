@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from app.models import Recipe, RecipeAction, User
+from app.services.affinity import apply_actions
+from app.services.impressions import _add_exposures, lookup_impressions
+from app.services.write_behind import WriteBehindBuffer
+
+# 한 번에 받을 수 있는 액션 수 (배치 API)
+MAX_BATCH_ACTIONS = 100
+# 전환으로 보는 액션
+CONVERSION_ACTIONS = ("cook", "save")
+# impression이 아직 다른 프로세스 버퍼에 있을 수 있어서, 액션 시각부터 이만큼은 적재를 미루고 다시 확인
+ATTRIBUTION_WAIT = timedelta(seconds=max(30.0, 5 * settings.EVENT_FLUSH_INTERVAL_SEC))
+
+
+def _attribute(objs, wait=None):
+    """
+    impression_id 검증 + 새 전환 집계.
+    - impression이 아직 안 보이면 (다른 프로세스 버퍼에 있을 수 있음) 액션 시각부터 wait 동안은 미룸
+    - wait가 지나도 없거나, 다른 유저/레시피 것이면 impression_id를 지우고 적재 (귀속 안 함)
+    - 같은 impression × 레시피의 첫 cook/save만 전환으로 셈
+    return: ({(user_id, recipe_id, 노출일): n} → RecipeExposure.converted 증가분, 미룬 액션 목록)
+    """
+    attributed = [o for o in objs if o.impression_id]
+    if not attributed:
+        return Counter(), []
+
+    impressions = lookup_impressions(o.impression_id for o in attributed)
+    deferred = []
+    if wait is not None:
+        cutoff = timezone.now() - wait
+        deferred = [o for o in attributed if o.impression_id not in impressions and o.created_at > cutoff]
+        attributed = [o for o in attributed if o.impression_id in impressions or o.created_at <= cutoff]
+    already = set(
+        RecipeAction.objects.filter(
+            impression_id__in={o.impression_id for o in attributed},
+            action__in=CONVERSION_ACTIONS,
+        ).values_list("impression_id", "recipe_id")
+    )
+    already = {(str(i), r) for i, r in already}
+
+    conversions = Counter()
+    for o in attributed:
+        served = impressions.get(o.impression_id, {}).get(o.recipe_id)
+        if served is None or served[0] != o.user_id:
+            o.impression_id = None
+            continue
+        key = (o.impression_id, o.recipe_id)
+        if o.action in CONVERSION_ACTIONS and key not in already:
+            already.add(key)
+            conversions[(o.user_id, o.recipe_id, timezone.localdate(served[1]))] += 1
+    return conversions, deferred
+
+
+def _flush_actions(records):
+    """
+    버퍼에 쌓인 액션을 bulk_create 한 번으로 적재.
+    record: {"user_id", "recipe_id", "action", "created_at"(ISO), "impression_id"(없을 수 있음)}
+    (버퍼에 있는 동안 레시피/유저가 지워졌을 수 있어서 적재 직전에 한 번 더 거름)
+    """
+    from app.utils import invalidate_recommendation_cache  # 순환 import 방지
+
+    recipe_ids = set(
+        Recipe.objects.filter(id__in={r["recipe_id"] for r in records}).values_list("id", flat=True)
+    )
+    user_ids = set(
+        User.objects.filter(id__in={r["user_id"] for r in records}).values_list("id", flat=True)
+    )
+
+    records = [r for r in records if r["recipe_id"] in recipe_ids and r["user_id"] in user_ids]
+    objs = [
+        RecipeAction(
+            user_id=r["user_id"],
+            recipe_id=r["recipe_id"],
+            action=r["action"],
+            created_at=parse_datetime(r["created_at"]) or timezone.now(),
+            impression_id=r.get("impression_id") or None,
+        )
+        for r in records
+    ]
+    if not objs:
+        return 0
+
+    with transaction.atomic():
+        # 버퍼를 끈 경우(바로 적재)는 미룰 곳이 없으므로 기다리지 않음
+        conversions, deferred = _attribute(objs, ATTRIBUTION_WAIT if action_buffer.enabled else None)
+        later = {id(o) for o in deferred}  # 저장 전 모델은 해시가 안 돼서 id로 구분
+        ready = [o for o in objs if id(o) not in later]
+        RecipeAction.objects.bulk_create(ready, batch_size=500)
+        _add_exposures(conversions, field="converted")
+        apply_actions(ready)
+
+    if deferred:
+        # 커밋된 뒤에만 다시 넣음 (롤백되면 .flushing 파일 replay와 겹치지 않게) → 다음 flush에서 재확인
+        action_buffer.requeue(r for o, r in zip(objs, records) if id(o) in later)
+
+    # cook/save/skip 반영이 추천에 바로 보이도록 (유저당 한 번)
+    for user_id in {o.user_id for o in ready}:
+        invalidate_recommendation_cache(user_id)
+    return len(ready)
+
+
+action_buffer = WriteBehindBuffer(
+    "recipe_actions",
+    _flush_actions,
+    flush_size=settings.EVENT_FLUSH_SIZE,
+    flush_interval=settings.EVENT_FLUSH_INTERVAL_SEC,
+    enabled=settings.EVENT_BUFFER_ENABLED,
+)
+
+
+def record_actions(user_id, items):
+    """
+    액션 기록 (버퍼에 넣고 바로 리턴, 적재는 flush 때).
+    items: [(recipe_id, action) 또는 (recipe_id, action, impression_id), ...]
+    — recipe_id는 호출하는 쪽에서 검증, impression_id는 적재 때 검증
+    """
+    now = timezone.now().isoformat()
+    records = []
+    for recipe_id, action, *rest in items:
+        impression_id = rest[0] if rest else None
+        records.append({
+            "user_id": user_id,
+            "recipe_id": recipe_id,
+            "action": action,
+            "created_at": now,
+            "impression_id": str(impression_id) if impression_id else None,
+        })
+    action_buffer.add(records)
@@ -0,0 +1,169 @@
+from collections import defaultdict
+from math import exp, log
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from app.models import RecipeIngredient, UserIngredientAffinity, UserRecipeAffinity
+from app.services.ingredient_graph import get_ingredient_graph
+
+# 시간 감쇠 선호도
+# - 값 v는 updated_at 시점 기준으로 저장, t초 뒤에는 v * exp(-λt)
+# - 액션이 들어오면 해당 행만: v ← v * exp(-λΔt) + w  (액션당 O(1))
+# - 반감기 7일 → 어제 cook한 레시피 ≈ 0.9, 1주 전 ≈ 0.5, 한 달 전 ≈ 0.05
+
+HALF_LIFE_DAYS = 7
+_DECAY_PER_SEC = log(2) / (HALF_LIFE_DAYS * 86400)
+
+# action → (UserRecipeAffinity 필드, 가중치)
+RECIPE_WEIGHTS = {
+    "cook": ("engaged", 1.0),
+    "save": ("engaged", 1.0),
+    "skip": ("skipped", 1.0),
+}
+# action → 레시피 필수 재료(canonical)마다 더할 값
+INGREDIENT_WEIGHTS = {
+    "cook": 1.0,
+    "save": 0.5,
+    "skip": -0.5,
+}
+# 이보다 작게 감쇠된 값은 읽을 때 버림
+MIN_AFFINITY = 0.01
+
+
+def decayed(value, since, now):
+    dt = (now - since).total_seconds()
+    if dt <= 0:
+        return value
+    return value * exp(-_DECAY_PER_SEC * dt)
+
+
+def _fold(rows, events, fields, key_of):
+    """
+    rows: 이미 있는 affinity 행들, events: {key: [(시각, 필드, 가중치), ...]}
+    기준 시각 = max(행 updated_at, 이벤트 시각) 으로 맞춰서 더함
+    → 이벤트가 늦게/순서 없이 적재돼도 같은 결과
+    """
+    for row in rows:
+        evs = events.get(key_of(row))
+        if not evs:
+            continue
+        ref = max([row.updated_at] + [t for t, _, _ in evs])
+        for f in fields:
+            setattr(row, f, decayed(getattr(row, f), row.updated_at, ref))
+        for t, f, w in evs:
+            setattr(row, f, getattr(row, f) + decayed(w, t, ref))
+        row.updated_at = ref
+
+
+def _recipe_canonicals(recipe_ids):
+    """레시피 → 필수 재료 canonical id 집합 (미연결 재료는 사전으로 해석)"""
+    graph = get_ingredient_graph()
+    result = defaultdict(set)
+    for recipe_id, cid, name in RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids, is_optional=False
+    ).values_list("recipe_id", "ingredient__canonical_id", "ingredient__name_ko"):
+        cid = cid if cid is not None else graph.resolve(name)
+        if cid is not None:
+            result[recipe_id].add(cid)
+    return result
+
+
+def apply_actions(actions):
+    """
+    RecipeAction들(적재 직전 객체) → UserRecipeAffinity / UserIngredientAffinity 갱신.
+    액션 적재와 같은 트랜잭션 안에서 호출.
+    """
+    recipe_events = defaultdict(list)
+    for a in actions:
+        field, w = RECIPE_WEIGHTS.get(a.action, (None, 0.0))
+        if field:
+            recipe_events[(a.user_id, a.recipe_id)].append((a.created_at, field, w))
+    if not recipe_events:
+        return
+
+    canonicals = _recipe_canonicals({rid for _, rid in recipe_events})
+    ingredient_events = defaultdict(list)
+    for a in actions:
+        w = INGREDIENT_WEIGHTS.get(a.action)
+        if w:
+            for cid in canonicals.get(a.recipe_id, ()):
+                ingredient_events[(a.user_id, cid)].append((a.created_at, "score", w))
+
+    _upsert(
+        UserRecipeAffinity, "recipe_id", recipe_events, ["engaged", "skipped"],
+    )
+    if ingredient_events:
+        _upsert(
+            UserIngredientAffinity, "canonical_id", ingredient_events, ["score"],
+        )
+
+
+def _pairs_filter(target, keys):
+    """(user_id, target) 쌍 정확히 그것만 (유저별로 묶어서 OR)"""
+    by_user = defaultdict(set)
+    for u, t in keys:
+        by_user[u].add(t)
+    q = Q()
+    for u, targets in by_user.items():
+        q |= Q(user_id=u, **{f"{target}__in": targets})
+    return q
+
+
+def _upsert(model, target, events, fields):
+    """
+    없는 행은 0으로 먼저 만들고(ignore_conflicts) 행 잠금 후 읽어서 감쇠+가산 → bulk_update.
+    감쇠가 행마다 updated_at에 따라 달라서 F()로는 못 씀 → select_for_update로
+    다른 프로세스의 flush와 같은 행을 동시에 고치지 않게 (잠금 순서 고정: 교착 방지)
+    """
+    now = timezone.now()
+    model.objects.bulk_create(
+        [model(user_id=u, **{target: t}, updated_at=now) for u, t in events],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    keys = sorted(events)
+    rows = []
+    with transaction.atomic():
+        for i in range(0, len(keys), 500):
+            rows.extend(
+                model.objects.select_for_update()
+                .filter(_pairs_filter(target, keys[i:i + 500]))
+                .order_by("user_id", target)
+            )
+        # 새로 만든 행은 updated_at=now라 이벤트 시각보다 늦음 → 값이 0이면 기준 시각을 이벤트로 당김
+        for row in rows:
+            if all(getattr(row, f) == 0 for f in fields):
+                evs = events.get((row.user_id, getattr(row, target)))
+                if evs:
+                    row.updated_at = min(t for t, _, _ in evs)
+        _fold(rows, events, fields, key_of=lambda row: (row.user_id, getattr(row, target)))
+        model.objects.bulk_update(rows, [*fields, "updated_at"], batch_size=500)
+
+
+def recipe_affinity_map(user_id, now=None):
+    """{recipe_id: (engaged, skipped)} 현재 시각 기준 감쇠값 (쿼리 1번)"""
+    now = now or timezone.now()
+    result = {}
+    for recipe_id, engaged, skipped, updated_at in UserRecipeAffinity.objects.filter(
+        user_id=user_id
+    ).values_list("recipe_id", "engaged", "skipped", "updated_at"):
+        engaged = decayed(engaged, updated_at, now)
+        skipped = decayed(skipped, updated_at, now)
+        if engaged >= MIN_AFFINITY or skipped >= MIN_AFFINITY:
+            result[recipe_id] = (engaged, skipped)
+    return result
+
+
+def ingredient_affinity_map(user_id, now=None):
+    """{canonical_id: score} 현재 시각 기준 감쇠값 (쿼리 1번)"""
+    now = now or timezone.now()
+    result = {}
+    for cid, score, updated_at in UserIngredientAffinity.objects.filter(
+        user_id=user_id
+    ).values_list("canonical_id", "score", "updated_at"):
+        score = decayed(score, updated_at, now)
+        if abs(score) >= MIN_AFFINITY:
+            result[cid] = score
+    return result
@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from app.models import CanonicalIngredient, Recipe, RecipeIngredient
+from app.services.ingredient_graph import get_ingredient_graph
+from app.services.versioning import VersionedSnapshot, bump_version
+
+CATALOG_VERSION_KEY = "recipe_catalog_version"
+
+
+def _load_catalog_ids():
+    return frozenset(Recipe.objects.values_list("id", flat=True))
+
+
+_catalog_snapshot = VersionedSnapshot(CATALOG_VERSION_KEY, _load_catalog_ids)
+
+
+def get_catalog_ids() -> frozenset:
+    """프로세스당 한 번 로드된 레시피 id 집합 (레시피 추가/삭제 시 버전 올림)"""
+    return _catalog_snapshot.get()
+
+
+def bump_catalog_version() -> int:
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+def existing_recipe_ids(ids):
+    """
+    요청으로 들어온 레시피 id 중 실제 존재하는 것만.
+    대부분 메모리 집합에서 끝나고, 스냅샷에 없는 id만 DB로 한 번 더 확인
+    (다른 프로세스에서 방금 추가된 레시피일 수 있음).
+    """
+    ids = set(ids)
+    catalog = get_catalog_ids()
+    found = ids & catalog
+    unknown = ids - found
+    if unknown:
+        fresh = set(Recipe.objects.filter(id__in=unknown).values_list("id", flat=True))
+        if fresh:
+            _catalog_snapshot.invalidate()
+            found |= fresh
+    return found
+
+
+# ---------- 레시피 필수 재료 역색인 (장보기 분석 / 식단 플래너) ----------
+# 재료 키 = canonical id (양수), 사전에 없는 재료는 -ingredient_id (원문 재료 그대로 매칭)
+
+class RequirementIndex:
+    def __init__(self, requirements, names):
+        self.requirements = requirements  # recipe_id -> (재료 키, ...)  중복 포함
+        self.names = names                # 재료 키 -> 표시 이름
+        self.postings = defaultdict(list)  # 재료 키 -> [recipe_id, ...]
+        for rid, keys in requirements.items():
+            for key in keys:
+                self.postings[key].append(rid)
+
+
+def _load_index():
+    graph = get_ingredient_graph()
+    requirements = defaultdict(list)
+    names = dict(CanonicalIngredient.objects.values_list("id", "name_ko"))
+    for recipe_id, ingredient_id, cid, name in RecipeIngredient.objects.filter(
+        is_optional=False
+    ).values_list(
+        "recipe_id", "ingredient_id", "ingredient__canonical_id", "ingredient__name_ko"
+    ).iterator(chunk_size=5000):
+        cid = cid if cid is not None else graph.resolve(name)
+        if cid is None:
+            key = -ingredient_id
+            names[key] = name
+        else:
+            key = cid
+        requirements[recipe_id].append(key)
+    return RequirementIndex({rid: tuple(keys) for rid, keys in requirements.items()}, names)
+
+
+# 레시피 재료가 바뀌면 bump_catalog_version()으로 id 집합과 같이 재로드
+_index_snapshot = VersionedSnapshot(CATALOG_VERSION_KEY, _load_index)
+
+
+def get_requirement_index() -> RequirementIndex:
+    return _index_snapshot.get()
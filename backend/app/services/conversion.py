@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from app.models import AppSetting, ConversionDaily, RecipeExposure, UserConversionDaily
+
+# 노출 후 며칠 동안 늦게 들어온 전환을 다시 반영할지 (증분 집계 때 다시 계산하는 기간)
+ATTRIBUTION_DAYS = 7
+# 마지막으로 집계를 끝낸 날짜 (YYYY-MM-DD)
+ROLLUP_THROUGH_KEY = "conversion_rollup_through"
+
+DASHBOARD_WINDOWS = (7, 30, 90)
+
+
+def rollup_day(day):
+    """
+    하루치 전환 집계 (유저별 + 전체). 다시 돌려도 같은 결과 (해당 날짜 행을 교체).
+    converted: day에 노출된 (유저, 레시피) 중 impression_id로 cook/save가 귀속된 것
+    (RecipeExposure.converted는 액션 적재 때 올라가므로 여기선 day 한 날짜만 읽음)
+    """
+    per_user = list(
+        RecipeExposure.objects.filter(day=day)
+        .values("user_id")
+        .annotate(
+            recommended=Count("id"),
+            converted=Count("id", filter=Q(converted__gt=0)),
+        )
+        .values_list("user_id", "recommended", "converted")
+    )
+
+    rows = [
+        UserConversionDaily(
+            user_id=user_id,
+            day=day,
+            recommended=rec,
+            converted=conv,
+            conversion_rate=round(conv / rec, 4) if rec else 0.0,
+        )
+        for user_id, rec, conv in per_user
+    ]
+    total_rec = sum(r.recommended for r in rows)
+    total_conv = sum(r.converted for r in rows)
+
+    with transaction.atomic():
+        UserConversionDaily.objects.filter(day=day).delete()
+        UserConversionDaily.objects.bulk_create(rows, batch_size=500)
+        ConversionDaily.objects.update_or_create(
+            day=day,
+            defaults={
+                "users": len(rows),
+                "recommended": total_rec,
+                "converted": total_conv,
+                "conversion_rate": round(total_conv / total_rec, 4) if total_rec else 0.0,
+            },
+        )
+    return len(rows), total_rec, total_conv
+
+
+def get_rollup_through():
+    value = AppSetting.objects.filter(key=ROLLUP_THROUGH_KEY).values_list("value", flat=True).first()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def rollup_pending(until=None, attribution_days=ATTRIBUTION_DAYS, log=print):
+    """
+    증분 집계: 마지막 집계일 - attribution_days 부터 until(기본: 오늘)까지.
+    최근 노출일은 나중에 전환이 더 귀속될 수 있어서 매번 다시 계산.
+    처음이면 가장 오래된 노출일부터.
+    """
+    until = until or timezone.localdate()
+    through = get_rollup_through()
+    if through is None:
+        first = RecipeExposure.objects.order_by("day").values_list("day", flat=True).first()
+        if first is None:
+            log("no exposures yet")
+            return 0
+        start = first
+    else:
+        start = min(through, until) - timedelta(days=attribution_days)
+
+    days = 0
+    day = start
+    while day <= until:
+        users, rec, conv = rollup_day(day)
+        log(f"  {day}: users={users}, recommended={rec}, converted={conv}")
+        day += timedelta(days=1)
+        days += 1
+
+    AppSetting.objects.update_or_create(key=ROLLUP_THROUGH_KEY, defaults={"value": until.isoformat()})
+    return days
+
+
+def windowed_rates(windows=DASHBOARD_WINDOWS, user=None, today=None):
+    """
+    최근 N일 전환율 (일간 집계 테이블에서 합산 → 창 크기만큼의 행만 읽음)
+    user가 있으면 유저별 집계, 없으면 전체
+    """
+    today = today or timezone.localdate()
+    qs = UserConversionDaily.objects.filter(user=user) if user is not None else ConversionDaily.objects.all()
+
+    result = {}
+    for n in windows:
+        agg = qs.filter(day__gt=today - timedelta(days=n), day__lte=today).aggregate(
+            recommended=Sum("recommended"), converted=Sum("converted")
+        )
+        rec = agg["recommended"] or 0
+        conv = agg["converted"] or 0
+        result[str(n)] = {
+            "recommended": rec,
+            "converted": conv,
+            "conversion_rate": round(conv / rec, 3) if rec else 0.0,
+        }
+    return result
@@ -0,0 +1,162 @@
+from django.db import transaction
+
+from app.models import CanonicalIngredient, Recipe, RecipeIngredient
+from app.services.ingredient_graph import get_ingredient_graph, normalize_ingredient
+
+# 알레르기/식단 비트마스크
+# - 재료(canonical) 이름 규칙으로 비트를 정하고 CanonicalIngredient.diet_flags에 저장 (생성 때 한 번)
+# - 레시피는 재료(+상위 재료) 비트를 OR 해서 Recipe.diet_flags에 저장 (적재/재파싱 때)
+# - 추천은 (레시피 비트 & 유저 제외 비트) == 0 인 레시피만 점수 계산
+#
+# 규칙: (키워드, exact) — exact=True면 정규화 이름이 정확히 같을 때만 (한 글자 재료 오탐 방지)
+
+# ----- 알레르기 (UserProfile.allergies 값 = 키) -----
+ALLERGENS = {
+    "egg":       (1 << 0, [("계란", False), ("달걀", False), ("메추리알", False), ("흰자", False), ("노른자", False), ("마요네즈", False)]),
+    "milk":      (1 << 1, [("우유", False), ("치즈", False), ("버터", False), ("생크림", False), ("요거트", False), ("요구르트", False), ("연유", False), ("분유", False)]),
+    "buckwheat": (1 << 2, [("메밀", False)]),
+    "peanut":    (1 << 3, [("땅콩", False)]),
+    "soy":       (1 << 4, [("대두", False), ("두부", False), ("두유", False), ("콩", True), ("간장", False), ("된장", False), ("청국장", False), ("고추장", False), ("쌈장", False)]),
+    "wheat":     (1 << 5, [("밀가루", False), ("밀", True), ("부침가루", False), ("튀김가루", False), ("빵가루", False), ("국수", False), ("소면", False), ("우동", False), ("라면", False), ("파스타", False), ("스파게티", False), ("만두피", False), ("빵", True), ("식빵", False)]),
+    "mackerel":  (1 << 6, [("고등어", False)]),
+    "crab":      (1 << 7, [("게", True), ("꽃게", False), ("대게", False), ("게살", False), ("크랩", False)]),
+    "shrimp":    (1 << 8, [("새우", False)]),
+    "pork":      (1 << 9, [("돼지", False), ("삼겹", False), ("목살", False), ("베이컨", False), ("햄", True), ("소시지", False), ("소세지", False)]),
+    "peach":     (1 << 10, [("복숭아", False)]),
+    "tomato":    (1 << 11, [("토마토", False), ("케첩", False), ("케찹", False)]),
+    "walnut":    (1 << 12, [("호두", False)]),
+    "chicken":   (1 << 13, [("닭", False)]),
+    "beef":      (1 << 14, [("소고기", False), ("쇠고기", False), ("소", True), ("한우", False), ("우둔", False), ("차돌", False)]),
+    "squid":     (1 << 15, [("오징어", False)]),
+    "shellfish": (1 << 16, [("조개", False), ("바지락", False), ("홍합", False), ("굴", True), ("전복", False), ("가리비", False), ("꼬막", False), ("굴소스", False)]),
+    "pine_nut":  (1 << 17, [("잣", True)]),
+}
+
+# 프로필 입력용 한글 표시명 → 키 (식약처 알레르기 유발 표시 항목 기준)
+ALLERGEN_LABELS = {
+    "계란": "egg", "달걀": "egg", "난류": "egg", "우유": "milk", "메밀": "buckwheat", "땅콩": "peanut",
+    "대두": "soy", "콩": "soy", "밀": "wheat", "고등어": "mackerel", "게": "crab", "새우": "shrimp",
+    "돼지고기": "pork", "복숭아": "peach", "토마토": "tomato", "호두": "walnut", "닭고기": "chicken",
+    "쇠고기": "beef", "소고기": "beef", "오징어": "squid", "조개류": "shellfish", "조개": "shellfish", "잣": "pine_nut",
+}
+
+
+def allergen_key(value):
+    """프로필 알레르기 값(키 또는 한글 표시명) → ALLERGENS 키, 모르는 값이면 None"""
+    text = str(value).strip()
+    key = text.lower()
+    if key in ALLERGENS:
+        return key
+    return ALLERGEN_LABELS.get(text)
+
+# ----- 식단 -----
+ANIMAL = 1 << 24        # 동물성 (비건 제외 대상)
+HIGH_SODIUM = 1 << 25   # 짠 양념/절임류
+HIGH_CARB = 1 << 26     # 밥/면/떡/빵 등 탄수화물 주재료
+
+_ANIMAL_ALLERGENS = ("egg", "milk", "mackerel", "crab", "shrimp", "pork", "chicken", "beef", "squid", "shellfish")
+DIET_RULES = {
+    ANIMAL: [("고기", False), ("멸치", False), ("액젓", False), ("젓갈", False), ("새우젓", False), ("꿀", True),
+             ("참치", False), ("연어", False), ("생선", False), ("어묵", False), ("맛살", False), ("오리", False),
+             ("양고기", False), ("육수", False), ("사골", False)],
+    HIGH_SODIUM: [("간장", False), ("된장", False), ("고추장", False), ("쌈장", False), ("액젓", False),
+                  ("젓갈", False), ("새우젓", False), ("굴소스", False), ("김치", False), ("장아찌", False),
+                  ("베이컨", False), ("햄", True), ("소시지", False), ("스팸", False)],
+    HIGH_CARB: [("밥", True), ("쌀", False), ("찹쌀", False), ("국수", False), ("소면", False), ("우동", False),
+                ("라면", False), ("파스타", False), ("스파게티", False), ("떡", False), ("빵", True), ("식빵", False),
+                ("감자", False), ("고구마", False), ("밀가루", False), ("당면", False), ("설탕", False), ("물엿", False)],
+}
+
+# UserProfile.diet_type → 제외할 비트 (HIGH_PROTEIN은 선호라서 하드 필터 없음)
+DIET_EXCLUDE = {
+    "VEGAN": ANIMAL,
+    "LOW_SODIUM": HIGH_SODIUM,
+    "LOW_CARB": HIGH_CARB,
+}
+
+
+def _matches(norm, rules):
+    return any((norm == kw) if exact else (kw in norm) for kw, exact in rules)
+
+
+def ingredient_flags(name):
+    """재료 이름 하나 → 비트마스크 (이름 규칙만, 상위 재료는 recipe_flags에서 합침)"""
+    norm = normalize_ingredient(name)
+    if not norm:
+        return 0
+    flags = 0
+    for key, (bit, rules) in ALLERGENS.items():
+        if _matches(norm, rules):
+            flags |= bit
+            if key in _ANIMAL_ALLERGENS:
+                flags |= ANIMAL
+    for bit, rules in DIET_RULES.items():
+        if _matches(norm, rules):
+            flags |= bit
+    return flags
+
+
+def exclusion_mask(profile):
+    """유저 프로필 → 추천에서 제외할 비트 (알레르기 + 식단)"""
+    if profile is None:
+        return 0
+    mask = 0
+    for value in profile.allergies or []:
+        key = allergen_key(value)
+        if key:
+            mask |= ALLERGENS[key][0]
+    return mask | DIET_EXCLUDE.get(profile.diet_type, 0)
+
+
+def recompute_canonical_flags():
+    """모든 표준 재료의 diet_flags를 현재 규칙으로 다시 계산. return: 바뀐 수"""
+    changed = []
+    for c in CanonicalIngredient.objects.only("id", "name_ko", "diet_flags"):
+        flags = ingredient_flags(c.name_ko)
+        if flags != c.diet_flags:
+            c.diet_flags = flags
+            changed.append(c)
+    CanonicalIngredient.objects.bulk_update(changed, ["diet_flags"], batch_size=500)
+    return len(changed)
+
+
+def recompute_recipe_flags(recipe_ids=None, batch_size=500):
+    """
+    레시피 diet_flags = 재료(필수+선택) canonical 비트 OR (상위 재료 비트 포함).
+    recipe_ids=None이면 전체. return: 바뀐 레시피 수
+    """
+    graph = get_ingredient_graph()
+    canon_flags = dict(CanonicalIngredient.objects.exclude(diet_flags=0).values_list("id", "diet_flags"))
+
+    def flags_of(cid, name):
+        if cid is None:
+            return ingredient_flags(name)
+        flags = 0
+        for aid in graph.ancestors.get(cid, (cid,)):
+            flags |= canon_flags.get(aid, 0)
+        return flags
+
+    if recipe_ids is None:
+        recipe_ids = list(Recipe.objects.order_by("id").values_list("id", flat=True))
+    recipe_ids = list(recipe_ids)
+
+    changed = 0
+    for i in range(0, len(recipe_ids), batch_size):
+        chunk = recipe_ids[i:i + batch_size]
+        flags = dict.fromkeys(chunk, 0)
+        for recipe_id, cid, name in RecipeIngredient.objects.filter(recipe_id__in=chunk).values_list(
+            "recipe_id", "ingredient__canonical_id", "ingredient__name_ko"
+        ):
+            cid = cid if cid is not None else graph.resolve(name)
+            flags[recipe_id] |= flags_of(cid, name)
+
+        to_update = [
+            r for r in Recipe.objects.filter(id__in=chunk).only("id", "diet_flags")
+            if r.diet_flags != flags[r.id]
+        ]
+        for r in to_update:
+            r.diet_flags = flags[r.id]
+        with transaction.atomic():
+            Recipe.objects.bulk_update(to_update, ["diet_flags"], batch_size=500)
+        changed += len(to_update)
+    return changed
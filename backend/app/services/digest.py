@@ -0,0 +1,213 @@
+import heapq
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from app.models import ExpiryDigest, Recipe, UserPantry, UserProfile
+from app.services.catalog import get_requirement_index
+from app.services.dietary import exclusion_mask
+from app.services.ingredient_graph import get_ingredient_graph
+from app.services.scoring import scoring_profile_for
+
+# 유통기한 임박 다이제스트 (expiry_digest 명령어)
+# - 기한이 N일 안에 끝나는 냉장고 재료 (expires_at 인덱스 범위 조회) → 유저별로 묶음
+# - 유저마다: 임박 재료를 쓰는 레시피 (필수 재료 역색인) 중 보유율 + 유통기한 보너스 상위 k개
+# - 카탈로그(역색인, 레시피 정보)는 한 번만 로드해서 스레드끼리 읽기 전용으로 공유
+# - 점수 계산은 파이썬이라 GIL 때문에 스레드는 주로 청크별 DB 조회를 겹치는 용도
+
+DEFAULT_DAYS = 3
+TOP_N = 5
+MIN_COVERAGE = 0.5
+
+_PANTRY_FIELDS = ("user_id", "ingredient_id", "ingredient__name_ko", "ingredient__canonical_id", "expires_at")
+
+
+class DigestCatalog:
+    """
+    다이제스트 계산용 카탈로그.
+    preload=True면 공개 레시피 정보를 한 번에 로드 (일괄 계산), 아니면 필요한 레시피만 조회 (단일 유저)
+    """
+
+    def __init__(self, preload=True):
+        self.graph = get_ingredient_graph()
+        self.index = get_requirement_index()
+        self._recipes = None
+        if preload:
+            self._recipes = self._load(Recipe.objects.all())
+
+    @staticmethod
+    def _load(qs):
+        # recipe_id -> (title, diet_flags, cook_time_min)
+        return {
+            rid: (title, flags, cook_time)
+            for rid, title, flags, cook_time in qs.filter(is_public=True).values_list(
+                "id", "title", "diet_flags", "cook_time_min"
+            ).iterator(chunk_size=5000)
+        }
+
+    def recipes(self, recipe_ids):
+        if self._recipes is not None:
+            return self._recipes
+        return self._load(Recipe.objects.filter(id__in=list(recipe_ids)))
+
+
+def _time_cutoff(profile):
+    """프로필 시간 엄격 모드면 조리 시간 상한 (추천과 같은 기준)"""
+    if profile is None or not profile.strict_time_filter or not profile.max_cook_time_min:
+        return None
+    return int(profile.max_cook_time_min * (profile.time_limit_factor or 1.5))
+
+
+def compute_digest(catalog, user_id, pantry_rows, profile, today, days=DEFAULT_DAYS, top=TOP_N):
+    """
+    pantry_rows: [(ingredient_id, name, canonical_id, expires_at), ...] 유저 냉장고 전체
+    return: (items, recipes) 임박 재료가 없으면 None
+    """
+    from app.utils import expiry_bucket
+
+    graph, index = catalog.graph, catalog.index
+    w = scoring_profile_for(user_id).w
+    until = today + timedelta(days=days)
+
+    have_keys = set()
+    expiring_keys = defaultdict(int)  # 재료 키 → 임박 재료 비트
+    items = []
+    bonus = []
+    for ingredient_id, name, cid, exp_date in pantry_rows:
+        if cid is None:
+            cid = graph.resolve(name)
+        keys = {-ingredient_id}
+        if cid is not None:
+            keys |= graph.cover_of(cid)
+        have_keys |= keys
+        if exp_date is None or not today <= exp_date <= until:
+            continue
+        bit = len(items)
+        days_left = (exp_date - today).days
+        items.append({"name": name, "expires_at": exp_date.isoformat(), "days_left": days_left})
+        bonus.append(expiry_bucket(days_left, w)[0])
+        for key in keys:
+            expiring_keys[key] |= 1 << bit
+    if not items:
+        return None
+
+    masks = defaultdict(int)
+    for key, bits in expiring_keys.items():
+        for rid in index.postings.get(key, ()):
+            masks[rid] |= bits
+
+    exclude = exclusion_mask(profile)
+    cutoff = _time_cutoff(profile)
+    recipes = catalog.recipes(masks)
+
+    ranked = []
+    for rid, mask in masks.items():
+        info = recipes.get(rid)
+        if info is None or info[1] & exclude:
+            continue
+        if cutoff is not None and info[2] is not None and info[2] > cutoff:
+            continue
+        keys = index.requirements[rid]
+        coverage = sum(1 for k in keys if k in have_keys) / len(keys)
+        if coverage < MIN_COVERAGE:
+            continue
+        bonus_expiry = min(sum(b for bit, b in enumerate(bonus) if mask >> bit & 1), w.expiry_cap)
+        score = w.coverage * coverage - w.missing * (1.0 - coverage) + bonus_expiry
+        ranked.append((score, -rid, mask))
+
+    recipes_out = [
+        {
+            "recipe_id": -neg_rid,
+            "title": recipes[-neg_rid][0],
+            "cook_time_min": recipes[-neg_rid][2],
+            "uses": [items[bit]["name"] for bit in range(len(items)) if mask >> bit & 1],
+            "score": round(score, 4),
+        }
+        for score, neg_rid, mask in heapq.nlargest(top, ranked)
+    ]
+    items.sort(key=lambda x: (x["days_left"], x["name"]))
+    return items, recipes_out
+
+
+def user_digest(user, days=DEFAULT_DAYS, top=TOP_N, today=None):
+    """단일 유저 즉시 계산 (저장된 다이제스트가 없을 때)"""
+    today = today or date.today()
+    rows = UserPantry.objects.filter(user=user).values_list(*_PANTRY_FIELDS[1:])
+    return compute_digest(
+        DigestCatalog(preload=False), user.id, list(rows), getattr(user, "profile", None), today, days, top
+    )
+
+
+def _fingerprints(user_ids):
+    """{user_id: 냉장고 해시} (utils.pantry_fingerprint와 같은 값, 청크당 쿼리 1번)"""
+    from app.utils import PANTRY_FINGERPRINT_FIELDS, fingerprint_rows
+
+    rows = defaultdict(list)
+    for row in UserPantry.objects.filter(user_id__in=user_ids).values(
+        "user_id", *PANTRY_FINGERPRINT_FIELDS
+    ).order_by("user_id", "ingredient_id"):
+        rows[row.pop("user_id")].append(row)
+    return {user_id: fingerprint_rows(rows[user_id]) for user_id in user_ids}
+
+
+def build_digests(days=DEFAULT_DAYS, top=TOP_N, batch_size=500, workers=4, dry_run=False, log=print, today=None):
+    """
+    임박 재료가 있는 모든 유저의 다이제스트 계산 → ExpiryDigest upsert.
+    이번 실행에서 쓰지 않은 행은 삭제 (예전 날짜 + 같은 날 다시 돌렸을 때 임박 재료가 없어진 유저).
+    return: (유저 수, 저장 수, 삭제 수)
+    """
+    today = today or date.today()
+    started = timezone.now()
+    user_ids = sorted(set(
+        UserPantry.objects.filter(
+            expires_at__gte=today, expires_at__lte=today + timedelta(days=days)
+        ).values_list("user_id", flat=True)
+    ))
+    if not user_ids:
+        deleted = 0 if dry_run else ExpiryDigest.objects.filter(updated_at__lt=started).delete()[0]
+        return 0, 0, deleted
+
+    catalog = DigestCatalog(preload=True)
+    chunks = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+
+    def run_chunk(chunk):
+        try:
+            rows = defaultdict(list)
+            for user_id, *row in UserPantry.objects.filter(user_id__in=chunk).values_list(*_PANTRY_FIELDS):
+                rows[user_id].append(row)
+            profiles = {p.user_id: p for p in UserProfile.objects.filter(user_id__in=chunk)}
+            fingerprints = _fingerprints(chunk)
+            digests = []
+            for user_id in chunk:
+                result = compute_digest(catalog, user_id, rows[user_id], profiles.get(user_id), today, days, top)
+                if result is not None:
+                    digests.append(ExpiryDigest(
+                        user_id=user_id, day=today, items=result[0], recipes=result[1],
+                        pantry_fingerprint=fingerprints[user_id],
+                    ))
+            return digests
+        finally:
+            connections.close_all()  # 워커 스레드의 DB 연결 정리
+
+    written = 0
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for digests in pool.map(run_chunk, chunks):
+            done += 1
+            if not dry_run and digests:
+                with transaction.atomic():
+                    ExpiryDigest.objects.bulk_create(
+                        digests,
+                        update_conflicts=True,
+                        unique_fields=["user"],
+                        update_fields=["day", "pantry_fingerprint", "items", "recipes", "updated_at"],
+                        batch_size=500,
+                    )
+            written += len(digests)
+            log(f"  digest: chunk {done}/{len(chunks)} users={sum(len(c) for c in chunks[:done])}")
+
+    deleted = 0 if dry_run else ExpiryDigest.objects.filter(updated_at__lt=started).delete()[0]
+    return len(user_ids), written, deleted
@@ -0,0 +1,56 @@
+from app.services.catalog import get_requirement_index
+
+# MMR(maximal marginal relevance) 다양성 재정렬
+# - 점수 상위 MMR_POOL개 후보만 대상
+# - 레시피 유사도 = 필수 재료 키 비트셋의 Jaccard (후보 풀 안에서만 재료 키 → 비트 번호를 새로 매김 → 작은 정수)
+# - 고를 때마다 mmr = λ × 점수 − (1 − λ) × (이미 고른 레시피와의 최대 유사도)
+#   최대 유사도는 새로 고른 레시피와의 값만 갱신 → O(top × 풀 크기) 번의 popcount
+# - λ = 1이면 기존 점수 순서 그대로
+
+MMR_POOL = 200
+
+
+def ingredient_bitsets(recipe_ids, index=None):
+    """{recipe_id: 비트셋} (재료 키 비트 번호는 이 호출 안에서만 의미 있음)"""
+    index = index or get_requirement_index()
+    positions = {}
+    result = {}
+    for rid in recipe_ids:
+        bits = 0
+        for key in index.requirements.get(rid, ()):
+            pos = positions.get(key)
+            if pos is None:
+                pos = positions[key] = len(positions)
+            bits |= 1 << pos
+        result[rid] = bits
+    return result
+
+
+def jaccard(a, b):
+    union = (a | b).bit_count()
+    return (a & b).bit_count() / union if union else 0.0
+
+
+def mmr_rerank(items, bitsets, k, lam):
+    """
+    items: 점수 내림차순 [{"recipe_id", "score", ...}, ...]
+    return: [(item, 다양성 조정값, 최대 유사도), ...] k개
+      조정값 = mmr − λ × 점수 = −(1 − λ) × 최대 유사도
+    """
+    remaining = list(items)
+    max_sim = [0.0] * len(remaining)
+    picked = []
+    while remaining and len(picked) < k:
+        best_i = max(
+            range(len(remaining)),
+            key=lambda i: (lam * remaining[i]["score"] - (1.0 - lam) * max_sim[i], -i),
+        )
+        item = remaining.pop(best_i)
+        sim = max_sim.pop(best_i)
+        picked.append((item, -(1.0 - lam) * sim, sim))
+        bits = bitsets.get(item["recipe_id"], 0)
+        for i, other in enumerate(remaining):
+            s = jaccard(bits, bitsets.get(other["recipe_id"], 0))
+            if s > max_sim[i]:
+                max_sim[i] = s
+    return picked
@@ -1,16 +1,15 @@
-import requests
 from django.conf import settings
 
-BASE_URL = "https://openapi.foodsafetykorea.go.kr/api"
-
+from app.external.http import get_client
 
 def get_foodsafety_recipes(start=1, end=20, name_query=None):
     key = getattr(settings, "FOODS_API_KEY", "") or ""
     if not key:
         raise RuntimeError("FOODS_API_KEY is empty")
 
-    url = f"{BASE_URL}/{key}/COOKRCP01/json/{start}/{end}"
-    resp = requests.get(url, timeout=10)
+    base = settings.FOODS_API_BASE_URL.rstrip("/")
+    url = f"{base}/{key}/COOKRCP01/json/{start}/{end}"
+    resp = get_client("foodsafety").get(url, endpoint="COOKRCP01")
     resp.raise_for_status()
     data = resp.json()
 
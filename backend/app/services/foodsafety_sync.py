@@ -0,0 +1,150 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+
+from app.external.foodsafety import fetch_recipes_json
+from app.external.http import UpstreamError
+from app.models import AppSetting
+from app.services.seed_foodsafety import seed_from_foodsafety_rows
+
+# 재개 위치: 여기 이전 페이지는 모두 적재 완료
+SYNC_NEXT_START_KEY = "foodsafety_sync_next_start"
+SYNC_TOTAL_KEY = "foodsafety_sync_total"
+
+
+class SyncError(Exception):
+    pass
+
+
+def fetch_page(start, end, retries=3, base_url=None, api_key=None):
+    """
+    COOKRCP01 한 페이지 조회 (재시도/백오프/서킷 브레이커는 공용 HTTP 클라이언트에서)
+    return: (rows, total_count)
+    """
+    if not (api_key or settings.FOODS_API_KEY):
+        # fetch_recipes_json은 RuntimeError를 던지므로 여기서 먼저 SyncError로 (명령어가 CommandError로 바꿔 보여줌)
+        raise SyncError("FOODS_API_KEY가 비어있음")
+    try:
+        payload = fetch_recipes_json(start=start, end=end, base_url=base_url, api_key=api_key, retries=retries)
+    except (UpstreamError, requests.RequestException, ValueError) as e:
+        raise SyncError(f"page {start}-{end} failed: {e}") from e
+
+    body = payload.get("COOKRCP01") or {}
+    code = (body.get("RESULT") or {}).get("CODE", "")
+    if code.startswith("ERROR"):
+        raise SyncError(f"COOKRCP01 {start}-{end}: {body.get('RESULT')}")
+    return body.get("row", []) or [], int(body.get("total_count") or 0)
+
+
+def _get_setting(key, default):
+    value = AppSetting.objects.filter(key=key).values_list("value", flat=True).first()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _set_setting(key, value):
+    AppSetting.objects.update_or_create(key=key, defaults={"value": str(value)})
+
+
+def sync_catalog(page_size=100, workers=4, resume=True, retries=3,
+                 batch_size=None, base_url=None, api_key=None, log=print):
+    """
+    COOKRCP01 전체 카탈로그 동기화.
+    1. 첫 페이지로 total_count 확인
+    2. 나머지 페이지를 스레드풀(workers개)로 동시에 받아옴
+    3. 도착하는 순서대로 bulk 적재 (DB 쓰기는 호출 스레드 하나에서만)
+    4. 연속으로 끝난 페이지까지 AppSetting에 기록 → 중간에 끊기면 거기서 재개
+    """
+    started = time.monotonic()
+
+    next_start = _get_setting(SYNC_NEXT_START_KEY, 1) if resume else 1
+    totals = {"created": 0, "updated": 0, "skipped": 0, "unchanged": 0}
+    stats = {"pages": 0, "rows": 0}
+
+    def ingest(rows):
+        result = seed_from_foodsafety_rows(rows, limit=len(rows), batch_size=batch_size)
+        for k in totals:
+            totals[k] += result[k]
+        stats["pages"] += 1
+        stats["rows"] += len(rows)
+
+    # 1) 첫 페이지 (total_count 확인 겸 적재)
+    first_end = next_start + page_size - 1
+    rows, total = fetch_page(next_start, first_end, retries, base_url, api_key)
+    _set_setting(SYNC_TOTAL_KEY, total)
+
+    if next_start > total:
+        # 이전 동기화가 끝난 상태에서 resume → 처음부터
+        next_start = 1
+        first_end = page_size
+        rows, total = fetch_page(next_start, first_end, retries, base_url, api_key)
+
+    ingest(rows)
+    done = {next_start}
+    log(f"SYNC: total={total}, start={next_start}, page_size={page_size}, workers={workers}")
+
+    # 2) 나머지 페이지 동시 조회
+    starts = list(range(next_start + page_size, total + 1, page_size))
+    error = None
+
+    def advance_watermark():
+        nonlocal next_start
+        moved = False
+        while next_start in done:
+            done.discard(next_start)
+            next_start += page_size
+            moved = True
+        if moved:
+            _set_setting(SYNC_NEXT_START_KEY, next_start)
+
+    advance_watermark()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {}
+        queue = iter(starts)
+
+        def submit_next():
+            s = next(queue, None)
+            if s is not None:
+                fut = pool.submit(fetch_page, s, min(s + page_size - 1, total), retries, base_url, api_key)
+                pending[fut] = s
+
+        # 메모리에 쌓이는 응답 수 제한: 동시에 workers*2 페이지까지만
+        for _ in range(max(1, workers) * 2):
+            submit_next()
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                s = pending.pop(fut)
+                try:
+                    page_rows, _ = fut.result()
+                except SyncError as e:
+                    error = error or e
+                    continue
+                ingest(page_rows)
+                done.add(s)
+                advance_watermark()
+                if error is None:
+                    submit_next()
+                log(f"  page {s}-{min(s + page_size - 1, total)}: rows={len(page_rows)}")
+
+    elapsed = time.monotonic() - started
+    completed = error is None and next_start > total
+    if completed:
+        _set_setting(SYNC_NEXT_START_KEY, 1)
+
+    return {
+        **totals,
+        **stats,
+        "total_count": total,
+        "completed": completed,
+        "resume_from": 1 if completed else next_start,
+        "error": str(error) if error else None,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(stats["rows"] / elapsed, 1) if elapsed > 0 else None,
+    }
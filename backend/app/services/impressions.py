@@ -0,0 +1,153 @@
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from app.models import Recipe, RecipeExposure, RecommendationImpression, User
+from app.services.write_behind import WriteBehindBuffer
+
+# 쿨타임: 최근 몇 번의 추천 응답에 나온 레시피를 다시 안 보이게 할지
+RECENT_SERVES = 10
+
+
+def _flush_impressions(records):
+    """
+    record(추천 응답 한 번): {"user_id", "impression_id", "recipe_ids": [...], "served_at"(ISO)}
+    → 레시피마다 RecommendationImpression 한 행
+    """
+    recipe_ids = set(
+        Recipe.objects.filter(
+            id__in={rid for r in records for rid in r["recipe_ids"]}
+        ).values_list("id", flat=True)
+    )
+    user_ids = set(
+        User.objects.filter(id__in={r["user_id"] for r in records}).values_list("id", flat=True)
+    )
+
+    objs = []
+    for r in records:
+        if r["user_id"] not in user_ids:
+            continue
+        served_at = parse_datetime(r["served_at"]) or timezone.now()
+        for position, rid in enumerate(r["recipe_ids"]):
+            if rid in recipe_ids:
+                objs.append(RecommendationImpression(
+                    user_id=r["user_id"],
+                    recipe_id=rid,
+                    position=position,
+                    served_at=served_at,
+                    impression_id=r["impression_id"],
+                ))
+    if not objs:
+        return 0
+
+    with transaction.atomic():
+        RecommendationImpression.objects.bulk_create(objs, batch_size=500)
+        _add_exposures(Counter(
+            (o.user_id, o.recipe_id, timezone.localdate(o.served_at)) for o in objs
+        ))
+    return len(objs)
+
+
+def _add_exposures(counts, field="count"):
+    """
+    RecipeExposure 증가: {(user_id, recipe_id, day): n}  (field: "count" 또는 "converted")
+    없는 행은 0으로 먼저 만들고(ignore_conflicts) F() + n 으로 올림
+    → 여러 프로세스가 동시에 flush해도 카운트가 덮어써지지 않음
+    """
+    if not counts:
+        return
+    RecipeExposure.objects.bulk_create(
+        [RecipeExposure(user_id=u, recipe_id=r, day=d, count=0) for u, r, d in counts],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    rows = RecipeExposure.objects.filter(
+        user_id__in={u for u, _, _ in counts},
+        recipe_id__in={r for _, r, _ in counts},
+        day__in={d for _, _, d in counts},
+    ).only("id", "user_id", "recipe_id", "day")
+
+    to_update = []
+    for row in rows:
+        n = counts.get((row.user_id, row.recipe_id, row.day))
+        if n:
+            setattr(row, field, F(field) + n)
+            to_update.append(row)
+    RecipeExposure.objects.bulk_update(to_update, [field], batch_size=500)
+
+
+impression_buffer = WriteBehindBuffer(
+    "recommendation_impressions",
+    _flush_impressions,
+    flush_size=settings.EVENT_FLUSH_SIZE,
+    flush_interval=settings.EVENT_FLUSH_INTERVAL_SEC,
+    enabled=settings.EVENT_BUFFER_ENABLED,
+)
+
+
+def record_impression(user_id, recipe_ids):
+    """추천 응답 한 번 기록 (버퍼). return: impression_id (문자열)"""
+    impression_id = str(uuid.uuid4())
+    recipe_ids = [rid for rid in recipe_ids if rid is not None]
+    if recipe_ids:
+        impression_buffer.add([{
+            "user_id": user_id,
+            "impression_id": impression_id,
+            "recipe_ids": recipe_ids,
+            "served_at": timezone.now().isoformat(),
+        }])
+    return impression_id
+
+
+def lookup_impressions(impression_ids):
+    """
+    impression_id → {recipe_id: (user_id, served_at)}
+    impression_id 인덱스 한 번 조회 (아직 이 프로세스 버퍼에 있으면 먼저 적재)
+    """
+    impression_ids = {str(i) for i in impression_ids if i}
+    if not impression_ids:
+        return {}
+    with impression_buffer._lock:
+        pending = {r["impression_id"] for r in impression_buffer._records}
+    if pending & impression_ids:
+        impression_buffer.flush()
+
+    result = {}
+    for impression_id, recipe_id, user_id, served_at in RecommendationImpression.objects.filter(
+        impression_id__in=impression_ids
+    ).values_list("impression_id", "recipe_id", "user_id", "served_at"):
+        result.setdefault(str(impression_id), {})[recipe_id] = (user_id, served_at)
+    return result
+
+
+def recent_impression_recipe_ids(user_id, serves=RECENT_SERVES):
+    """최근 serves번의 추천 응답에 나온 레시피 id 집합 (유저+served_at 인덱스)"""
+    rows = (
+        RecommendationImpression.objects.filter(user_id=user_id)
+        .order_by("-served_at")
+        .values_list("impression_id", "recipe_id")[: serves * 20]
+    )
+    seen_serves = set()
+    result = set()
+    for impression_id, recipe_id in rows:
+        if impression_id not in seen_serves:
+            if len(seen_serves) >= serves:
+                break
+            seen_serves.add(impression_id)
+        result.add(recipe_id)
+    return result
+
+
+def exposure_counts_since(user_id, since_day):
+    """since_day(포함) 이후 레시피별 노출 횟수 {recipe_id: n} (RecipeExposure 집계 한 번)"""
+    return dict(
+        RecipeExposure.objects.filter(user_id=user_id, day__gte=since_day)
+        .values("recipe_id")
+        .annotate(n=Sum("count"))
+        .values_list("recipe_id", "n")
+    )
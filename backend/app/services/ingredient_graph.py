@@ -0,0 +1,274 @@
+import re
+
+from django.db import IntegrityError, transaction
+
+from app.models import CanonicalIngredient, IngredientSynonym, Ingredient
+from app.services.versioning import VersionedSnapshot, bump_version
+
+GRAPH_VERSION_KEY = "ingredient_graph_version"
+
+
+def normalize_ingredient(s: str) -> str:
+    """
+    재료명 정규화:
+    1. 앞뒤 공백 제거 + 소문자
+    2. 괄호 내용 제거: "당근(1/2개)" → "당근"
+    3. 숫자 제거
+    4. 특수문자 제거 (한글/영문만 남기기)
+    5. 공백 제거
+    (동의어 적용은 IngredientGraph.resolve에서)
+    """
+    if not s:
+        return ""
+
+    text = s.strip().lower()
+
+    # 괄호 내용 제거: (xxx), [xxx]
+    text = re.sub(r'\([^)]*\)', '', text)
+    text = re.sub(r'\[[^\]]*\]', '', text)
+
+    # 숫자 제거
+    text = re.sub(r'\d+', '', text)
+
+    # 한글, 영문만 남기기 (특수문자, 공백 제거)
+    text = re.sub(r'[^가-힣a-zA-Z]', '', text)
+
+    return text
+
+
+# 손질 표현 접두어: "다진돼지고기" → "돼지고기"로 한 번 더 찾아봄
+PREP_PREFIXES = ("다진", "채썬", "잘게썬", "깍둑썬", "삶은", "데친", "볶은", "구운", "말린", "냉동", "손질한")
+
+
+def _lookup_keys(norm):
+    yield norm
+    for prefix in PREP_PREFIXES:
+        if norm.startswith(prefix) and len(norm) > len(prefix):
+            yield norm[len(prefix):]
+
+
+class IngredientGraph:
+    """
+    표준 재료 그래프 스냅샷 (읽기 전용).
+    - by_name: 정규화 이름(표준명 + 동의어) → canonical id
+    - cover: canonical id → 매칭되는 canonical id 집합 (자신 + 상위 + 하위)
+
+    냉장고에 "삼겹살"이 있으면 상위 "돼지"가 필요한 레시피를 채우고,
+    "돼지"가 있으면 하위 "삼겹살"이 필요한 레시피도 채움.
+    형제 노드(삼겹살 ↔ 목살)끼리는 매칭하지 않음.
+    """
+
+    def __init__(self, names, parents):
+        self.by_name = names
+        self.parents = parents
+
+        children = {}
+        for cid, pid in parents.items():
+            if pid is not None:
+                children.setdefault(pid, []).append(cid)
+
+        self.ancestors = {cid: self._walk_up(cid) for cid in parents}
+        self.descendants = {cid: self._walk_down(cid, children) for cid in parents}
+        self.cover = {
+            cid: self.ancestors[cid] | self.descendants[cid] for cid in parents
+        }
+
+    def _walk_up(self, cid):
+        seen = {cid}
+        pid = self.parents.get(cid)
+        while pid is not None and pid not in seen:  # 순환 방지
+            seen.add(pid)
+            pid = self.parents.get(pid)
+        return frozenset(seen)
+
+    @staticmethod
+    def _walk_down(cid, children):
+        seen = {cid}
+        stack = [cid]
+        while stack:
+            for child in children.get(stack.pop(), []):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return frozenset(seen)
+
+    def resolve(self, raw_name):
+        """원문 재료명 → canonical id (모르는 재료면 None)"""
+        for key in _lookup_keys(normalize_ingredient(raw_name)):
+            cid = self.by_name.get(key)
+            if cid is not None:
+                return cid
+        return None
+
+    def cover_of(self, cid):
+        return self.cover.get(cid, frozenset((cid,)))
+
+
+def _load_graph():
+    parents = dict(CanonicalIngredient.objects.values_list("id", "parent_id"))
+
+    names = {}
+    for cid, name in CanonicalIngredient.objects.values_list("id", "name_ko"):
+        norm = normalize_ingredient(name)
+        if norm:
+            names[norm] = cid
+    # 동의어가 표준명보다 우선 (관리자가 명시적으로 지정한 값)
+    for name, cid in IngredientSynonym.objects.values_list("name", "canonical_id"):
+        norm = normalize_ingredient(name)
+        if norm:
+            names[norm] = cid
+
+    return IngredientGraph(names, parents)
+
+
+_graph_snapshot = VersionedSnapshot(GRAPH_VERSION_KEY, _load_graph)
+
+
+def get_ingredient_graph() -> IngredientGraph:
+    """프로세스당 한 번 로드된 재료 그래프 (버전 바뀌면 재로드)"""
+    return _graph_snapshot.get()
+
+
+def bump_ingredient_graph_version() -> int:
+    return bump_version(GRAPH_VERSION_KEY)
+
+
+def _publish_new_nodes(graph, nodes):
+    """
+    새로 만든 표준 재료 {정규화 이름: id}를 스냅샷에 추가.
+    호출한 쪽 트랜잭션이 커밋된 뒤에만 (롤백되면 없는 id가 프로세스에 남지 않게)
+    """
+    def publish():
+        for norm, cid in nodes.items():
+            graph.by_name[norm] = cid
+            graph.parents.setdefault(cid, None)
+
+    transaction.on_commit(publish)
+
+
+def canonical_id_for(raw_name):
+    """
+    원문 재료명 → canonical id.
+    사전에 없는 재료면 정규화 이름으로 새 표준 재료를 만든다.
+    (새 노드는 관계가 없으므로 그래프 버전을 올리지 않고, 커밋 후 스냅샷에만 추가)
+    """
+    norm = normalize_ingredient(raw_name)
+    if not norm:
+        return None
+
+    graph = get_ingredient_graph()
+    cid = graph.resolve(norm)
+    if cid is not None:
+        return cid
+
+    from app.services.dietary import ingredient_flags  # 순환 import 방지
+
+    try:
+        with transaction.atomic():
+            canonical, _ = CanonicalIngredient.objects.get_or_create(
+                name_ko=norm, defaults={"diet_flags": ingredient_flags(norm)}
+            )
+    except IntegrityError:
+        canonical = CanonicalIngredient.objects.get(name_ko=norm)
+
+    _publish_new_nodes(graph, {norm: canonical.id})
+    return canonical.id
+
+
+def get_or_create_ingredient(name):
+    """
+    재료명으로 Ingredient 조회/생성 + canonical 연결.
+    냉장고 등록/사용자 레시피/외부 적재가 모두 이 함수를 거쳐서
+    같은 표준 재료로 매칭되도록 함.
+    """
+    name = (name or "").strip()
+    ingredient, _ = Ingredient.objects.get_or_create(name_ko=name)
+    if ingredient.canonical_id is None:
+        cid = canonical_id_for(name)
+        if cid is not None:
+            ingredient.canonical_id = cid
+            ingredient.save(update_fields=["canonical"])
+    return ingredient
+
+
+def _chunks(items, size=500):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def canonical_ids_for(raw_names):
+    """
+    canonical_id_for의 대량 버전: {원문 재료명: canonical id}
+    사전에 없는 이름들은 bulk_create 한 번으로 표준 재료 생성.
+    """
+    graph = get_ingredient_graph()
+    result = {}
+    unknown = {}  # norm -> [raw_name, ...]
+
+    for raw in raw_names:
+        norm = normalize_ingredient(raw)
+        if not norm:
+            continue
+        cid = graph.resolve(norm)
+        if cid is not None:
+            result[raw] = cid
+        else:
+            unknown.setdefault(norm, []).append(raw)
+
+    if unknown:
+        from app.services.dietary import ingredient_flags  # 순환 import 방지
+
+        CanonicalIngredient.objects.bulk_create(
+            [CanonicalIngredient(name_ko=norm, diet_flags=ingredient_flags(norm)) for norm in unknown],
+            ignore_conflicts=True,
+        )
+        created = {}
+        for chunk in _chunks(unknown):
+            for cid, norm in CanonicalIngredient.objects.filter(name_ko__in=chunk).values_list("id", "name_ko"):
+                created[norm] = cid
+                for raw in unknown[norm]:
+                    result[raw] = cid
+        _publish_new_nodes(graph, created)
+
+    return result
+
+
+def ensure_ingredients(names):
+    """
+    get_or_create_ingredient의 대량 버전: {재료명: ingredient id}
+    조회/생성/canonical 연결을 이름 수와 무관한 몇 번의 쿼리로 처리 (적재용).
+    """
+    names = {(n or "").strip() for n in names}
+    names.discard("")
+    if not names:
+        return {}
+
+    found = {}
+    unlinked = []
+    for chunk in _chunks(names):
+        for iid, name, cid in Ingredient.objects.filter(name_ko__in=chunk).values_list("id", "name_ko", "canonical_id"):
+            found[name] = iid
+            if cid is None:
+                unlinked.append(name)
+
+    missing = names - found.keys()
+    cids = canonical_ids_for(list(missing) + unlinked)
+
+    if missing:
+        Ingredient.objects.bulk_create(
+            [Ingredient(name_ko=n, canonical_id=cids.get(n)) for n in missing],
+            ignore_conflicts=True,
+        )
+        for chunk in _chunks(missing):
+            found.update(
+                Ingredient.objects.filter(name_ko__in=chunk).values_list("name_ko", "id")
+            )
+
+    if unlinked:
+        relink = [
+            Ingredient(id=found[n], canonical_id=cids[n]) for n in unlinked if n in cids
+        ]
+        Ingredient.objects.bulk_update(relink, ["canonical"], batch_size=500)
+
+    return found
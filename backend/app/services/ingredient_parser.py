@@ -0,0 +1,171 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from app.services.ingredient_graph import normalize_ingredient
+
+# RecipeIngredient 필드 길이
+NAME_MAX_LEN = 100
+AMOUNT_MAX_LEN = 50
+
+# 섹션 헤더로 쓰이는 단어 ("●주재료 :", "고명", "[양념장]" 등)
+SECTION_WORDS = {
+    "재료", "주재료", "부재료", "필수재료", "선택재료", "기본재료",
+    "양념", "양념장", "소스", "드레싱", "육수", "반죽", "고명", "장식", "토핑", "가니쉬",
+}
+# 이 섹션 아래 재료는 선택 재료로 취급
+OPTIONAL_SECTIONS = {"선택재료", "고명", "장식", "토핑", "가니쉬"}
+
+_BULLETS = "●○•·◆◇■□▶▷-*ㆍ"
+_SERVING_TAG = re.compile(r"^[\[(]\s*\d+\s*인분\s*[\])]\s*")
+_OPTIONAL_MARK = re.compile(r"\(\s*선택\s*\)|\[\s*선택\s*\]|기호에\s*따라|선택\s*사항")
+# 분량이 시작되는 위치: 숫자/분수/괄호 또는 "약간" 같은 분량 단어
+_AMOUNT_START = re.compile(
+    r"[\d½⅓⅔¼¾(]"
+    r"|\s(?:약간|적당량|적당히|조금|소량|한\s?줌|한\s?꼬집|한\s?컵|반\s?개|반\s?컵)"
+)
+# 줄 앞 섹션 표시: "[양념] 간장 1큰술" / "재료 방울토마토 5개"
+_SECTION_PREFIX = re.compile(r"^[\[<(]\s*([^\]>)]*?)\s*[\]>)]\s*|^(\S+)\s+")
+
+
+class ParsedIngredient(NamedTuple):
+    name: str
+    amount_text: str
+    is_optional: bool
+
+
+def _split_items(line: str):
+    """쉼표 기준 분리 (괄호 안 쉼표는 무시: "달걀 30g(1/2개, 중)")"""
+    items, buf, depth = [], [], 0
+    for ch in line:
+        if ch in "([":
+            depth += 1
+        elif ch in ")]" and depth > 0:
+            depth -= 1
+        if ch in ",，" and depth == 0:
+            items.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    items.append("".join(buf))
+    return [i.strip() for i in items if i.strip()]
+
+
+def _section_name(text: str) -> str:
+    return re.sub(r"[\s\[\]()<>]", "", text)
+
+
+def _starts_with_amount(text: str) -> bool:
+    return bool(_AMOUNT_START.match(text) or _AMOUNT_START.match(" " + text))
+
+
+def _split_section(line: str):
+    """
+    섹션 헤더 분리 → (섹션 이름, 나머지 재료 부분), 섹션이 아니면 (None, line)
+    "고명" / "주재료 : 닭가슴살 100g" / "[양념] 간장 1큰술" / "재료 방울토마토 5개"
+    """
+    if _section_name(line) in SECTION_WORDS:
+        return _section_name(line), ""
+
+    head, sep, rest = line.partition(":")
+    if not sep:
+        head, sep, rest = line.partition("：")
+    if sep and "(" not in head and _section_name(head) in SECTION_WORDS:
+        return _section_name(head), rest.strip()
+
+    m = _SECTION_PREFIX.match(line)
+    if m:
+        section = _section_name(m.group(1) or m.group(2))
+        rest = line[m.end():].strip()
+        # "육수 500ml"처럼 섹션 단어가 곧 재료인 경우는 제외 (바로 뒤가 분량)
+        if section in SECTION_WORDS and rest and not _starts_with_amount(rest):
+            return section, rest
+    return None, line
+
+
+@lru_cache(maxsize=8192)
+def parse_ingredient_item(item: str, optional_section: bool = False):
+    """
+    재료 한 개 파싱: "당근 30g(1/2개)" → ("당근", "30g(1/2개)", False)
+    재료명이 없으면 None.
+    """
+    text = item.strip().strip(_BULLETS).strip()
+    is_optional = optional_section
+
+    if _OPTIONAL_MARK.search(text):
+        is_optional = True
+        text = _OPTIONAL_MARK.sub("", text).strip()
+
+    # 첫 글자부터 분량이면 재료명이 없음 → 1번째 글자부터 찾기 ("2%우유 200ml")
+    m = _AMOUNT_START.search(text, 1)
+    if m:
+        name, amount = text[:m.start()], text[m.start():]
+    else:
+        name, amount = text, ""
+
+    name = name.strip().rstrip(":：-").strip()
+    amount = amount.strip()
+    # "조랭이떡(40g)" 처럼 분량 전체가 괄호면 괄호 제거
+    if amount.startswith("(") and amount.endswith(")") and amount.count("(") == 1:
+        amount = amount[1:-1].strip()
+
+    if not name or not normalize_ingredient(name):
+        return None
+    # 분량 없이 섹션 단어만 있으면 헤더 ("육수 500ml", "소스 약간"은 재료)
+    if not amount and _section_name(name) in SECTION_WORDS:
+        return None
+
+    return ParsedIngredient(name[:NAME_MAX_LEN], amount[:AMOUNT_MAX_LEN], is_optional)
+
+
+@lru_cache(maxsize=4096)
+def _parse_line(line: str, optional_section: bool):
+    """줄 단위 메모이즈 (같은 재료 줄이 여러 레시피에 반복됨)"""
+    parsed = []
+    for item in _split_items(line):
+        p = parse_ingredient_item(item, optional_section)
+        if p is not None:
+            parsed.append(p)
+    return tuple(parsed)
+
+
+def parse_parts_dtls(text: str, title: str = ""):
+    """
+    식약처 RCP_PARTS_DTLS 파싱.
+    - 첫 줄에 반복되는 레시피 제목 제거
+    - "●주재료 : ...", "양념장 : ...", "고명" 같은 섹션 헤더 인식
+    - 재료명/분량/선택 여부 분리, 같은 재료는 한 번만
+    return: [ParsedIngredient, ...]
+    """
+    if not text:
+        return []
+
+    title_norm = normalize_ingredient(title)
+    optional_section = False
+    result = []
+    seen = set()
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip().lstrip(_BULLETS).strip()
+        line = _SERVING_TAG.sub("", line)
+        if not line:
+            continue
+
+        # "주재료 : 닭가슴살 100g" → 섹션 + 재료, "고명" → 섹션 헤더만 있는 줄
+        section, line = _split_section(line)
+        if section is not None:
+            optional_section = section in OPTIONAL_SECTIONS
+            if not line:
+                continue
+        elif title_norm and normalize_ingredient(line) == title_norm:
+            # 제목 줄
+            continue
+
+        for p in _parse_line(line, optional_section):
+            key = p.name
+            if key in seen:
+                continue
+            seen.add(key)
+            result.append(p)
+
+    return result
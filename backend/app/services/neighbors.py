@@ -0,0 +1,173 @@
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from math import sqrt
+from pathlib import Path
+
+from django.conf import settings
+
+# "이 레시피를 만든 사람들이 같이 만든 레시피" 이웃 인덱스 (build_cooccurrence 명령어로 생성)
+#
+# 파일 구조 (네이티브 바이트 순서, 4바이트 정렬):
+#   header  : magic(4s) | max_recipe_id(u32) | n_entries(u32) | top_n(u32)
+#   offsets : u32 × (max_recipe_id + 2)   ← 레시피 id로 바로 인덱싱, [offsets[id], offsets[id+1])
+#   ids     : u32 × n_entries              ← 이웃 레시피 id (유사도 내림차순)
+#   scores  : f32 × n_entries              ← 코사인 유사도
+# 조회는 mmap 위의 memoryview 슬라이스만 → DB 쿼리 없음, O(이웃 수)
+
+MAGIC = b"HKN1" if sys.byteorder == "little" else b"HKN1"[::-1]
+_HEADER = 16
+# 파일이 바뀌었는지(mtime) 확인하는 주기 (초)
+RELOAD_CHECK_INTERVAL_SEC = 30
+
+
+def index_path():
+    return Path(settings.NEIGHBOR_INDEX_PATH)
+
+
+# ---------- 생성 ----------
+
+def compute_neighbors(user_items, top_n=20, min_support=2, max_items_per_user=200):
+    """
+    user_items: {user_id: [recipe_id, ...]}  (cook/save 한 레시피, 오래된 것 → 최근 순)
+    return: {recipe_id: [(neighbor_id, score), ...]}  score = 공동 유저 수 / sqrt(n_i * n_j)
+    유저당 최근 max_items_per_user개만 써서 O(k²) 폭주 방지
+
+    NumPy/SciPy 희소 행렬곱(Xᵀ·X) 대신 dict 누적: 백엔드 의존성에 numpy/scipy가 없고,
+    오프라인 명령어(build_cooccurrence)에서만 돌며 비용은 유저별 항목 쌍 수(≤ k²/2)에 비례해서
+    지금 규모(레시피 ~1천, 유저당 k ≤ 200)에서는 행렬곱으로 바꿔도 얻는 게 적음.
+    조회 경로는 이미 배열/mmap이라 이 함수만 바꾸면 됨 (결과 형식은 같게 유지할 것)
+    """
+    item_users = Counter()
+    co = defaultdict(Counter)
+    for items in user_items.values():
+        items = sorted(list(dict.fromkeys(reversed(items)))[:max_items_per_user])
+        item_users.update(items)
+        for i, a in enumerate(items):
+            row = co[a]
+            for b in items[i + 1:]:
+                row[b] += 1
+
+    sims = defaultdict(list)
+    for a, row in co.items():
+        for b, n in row.items():
+            if n < min_support:
+                continue
+            s = n / sqrt(item_users[a] * item_users[b])
+            sims[a].append((b, s))
+            sims[b].append((a, s))
+
+    return {
+        rid: sorted(pairs, key=lambda p: (-p[1], p[0]))[:top_n]
+        for rid, pairs in sims.items()
+    }
+
+
+def write_index(neighbors, path=None, top_n=0):
+    """neighbors → 이웃 인덱스 파일 (임시 파일에 쓰고 os.replace로 교체)"""
+    path = Path(path or index_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    max_id = max(neighbors, default=0)
+    offsets = array("I", [0]) * (max_id + 2)
+    ids = array("I")
+    scores = array("f")
+    for rid in range(max_id + 1):
+        offsets[rid] = len(ids)
+        for nid, s in neighbors.get(rid, ()):
+            ids.append(nid)
+            scores.append(s)
+    offsets[max_id + 1] = len(ids)
+
+    header = array("I", [max_id, len(ids), top_n])
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        header.tofile(f)
+        offsets.tofile(f)
+        ids.tofile(f)
+        scores.tofile(f)
+    os.replace(tmp, path)
+    return len(ids)
+
+
+# ---------- 조회 ----------
+
+class NeighborIndex:
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        if bytes(mv[:4]) != MAGIC:
+            raise ValueError(f"{self.path}: not a neighbor index")
+        self.max_id, n, self.top_n = mv[4:_HEADER].cast("I")
+
+        pos = _HEADER
+        self._offsets = mv[pos:pos + 4 * (self.max_id + 2)].cast("I")
+        pos += 4 * (self.max_id + 2)
+        self._ids = mv[pos:pos + 4 * n].cast("I")
+        pos += 4 * n
+        self._scores = mv[pos:pos + 4 * n].cast("f")
+        self.n_entries = n
+
+    def neighbors(self, recipe_id, limit=None):
+        """[(neighbor_id, score), ...] 유사도 내림차순"""
+        if recipe_id is None or not 0 <= recipe_id <= self.max_id:
+            return []
+        start, end = self._offsets[recipe_id], self._offsets[recipe_id + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self._ids[start:end], self._scores[start:end]))
+
+
+class _EmptyIndex:
+    max_id = 0
+    n_entries = 0
+    top_n = 0
+
+    def neighbors(self, recipe_id, limit=None):
+        return []
+
+
+_EMPTY = _EmptyIndex()
+_lock = threading.Lock()
+_state = {"index": None, "mtime": None, "checked_at": 0.0}
+
+
+def get_neighbor_index():
+    """
+    프로세스당 한 번 mmap으로 열어서 재사용.
+    RELOAD_CHECK_INTERVAL_SEC마다 파일 mtime만 확인해서 새로 만든 인덱스로 교체
+    (파일 없으면 빈 인덱스 → 추천은 이웃 신호 없이 동작)
+    """
+    now = time.monotonic()
+    if _state["index"] is not None and now - _state["checked_at"] < RELOAD_CHECK_INTERVAL_SEC:
+        return _state["index"]
+
+    with _lock:
+        _state["checked_at"] = now
+        try:
+            mtime = os.stat(index_path()).st_mtime_ns
+        except OSError:
+            _state["index"], _state["mtime"] = _EMPTY, None
+            return _EMPTY
+        if _state["index"] is None or mtime != _state["mtime"]:
+            try:
+                _state["index"] = NeighborIndex(index_path())
+            except (OSError, ValueError) as e:
+                print(f"[neighbors] load failed: {e}")
+                _state["index"] = _EMPTY
+            _state["mtime"] = mtime
+        return _state["index"]
+
+
+def reset_neighbor_index():
+    """다음 get_neighbor_index() 때 파일을 다시 확인 (명령어/테스트용)"""
+    with _lock:
+        _state["index"] = None
+        _state["checked_at"] = 0.0
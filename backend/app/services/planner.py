@@ -0,0 +1,259 @@
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import F, Q
+
+from app.models import Recipe, UserPantry
+from app.services.catalog import get_requirement_index
+
+# 유통기한 기반 주간 식단 플래너
+#
+# - 냉장고 재료 하나 = 비트 하나. 레시피 비트셋 = 그 레시피가 쓰는 냉장고 재료 (필수 재료 역색인으로 계산)
+# - 목표: Σ 기한 안에 처음 쓰는 재료의 유통기한 보너스 (추천과 같은 expiry_bucket)
+#         + Σ 레시피 기본 점수 (coverage / 부족 / 시간 적합도 / 최근 cook·skip 감점)
+#   같은 재료를 두 번째로 쓰면 보너스 없음, 같은 레시피는 한 번만
+# - 탐색: 날짜 순으로 탐욕 선택 → 교체/순서 바꾸기 국소 탐색, deadline 지나면 그때까지의 최선 반환
+
+DEFAULT_DAYS = 7
+MAX_DAYS = 14
+MAX_MEALS_PER_DAY = 3
+# 이 비율 이상 재료가 있는 레시피만 후보
+MIN_COVERAGE = 0.5
+# 플래너 점수 상위 몇 개까지만 탐색 후보로
+CANDIDATE_LIMIT = 400
+# 교체 후보 (국소 탐색 한 칸당)
+SWAP_POOL = 60
+DEADLINE_MS = 150
+
+
+class _Pantry:
+    """냉장고 재료 비트 정보 (요청마다)"""
+
+    def __init__(self, user, graph, today, w):
+        from app.utils import expiry_bucket
+
+        self.names = []
+        self.bonus = []       # 비트별 기한 안에 쓰면 받는 보너스
+        self.days_left = []   # 비트별 남은 일수 (None = 기한 없음)
+        self.expired = 0      # 이미 지난 재료 비트
+        self.keys = defaultdict(int)  # 재료 키 → 채우는 냉장고 비트들
+
+        rows = UserPantry.objects.filter(user=user).values_list(
+            "ingredient_id", "ingredient__name_ko", "ingredient__canonical_id", "expires_at"
+        )
+        for bit, (ingredient_id, name, cid, exp_date) in enumerate(rows):
+            if cid is None:
+                cid = graph.resolve(name)
+            days_left = (exp_date - today).days if exp_date else None
+            bonus, penalty = expiry_bucket(days_left, w) if days_left is not None else (0.0, 0.0)
+            self.names.append(name)
+            self.bonus.append(bonus)
+            self.days_left.append(days_left)
+            if penalty:
+                self.expired |= 1 << bit
+            self.keys[-ingredient_id] |= 1 << bit
+            if cid is not None:
+                for covered in graph.cover_of(cid):
+                    self.keys[covered] |= 1 << bit
+
+        # 보너스 값별 비트 묶음 → popcount로 합 계산
+        by_bonus = defaultdict(int)
+        for bit, b in enumerate(self.bonus):
+            if b:
+                by_bonus[b] |= 1 << bit
+        self.bonus_masks = list(by_bonus.items())
+        self.expiring = 0  # 보너스가 있는 (임박) 재료 비트
+        for m in by_bonus.values():
+            self.expiring |= m
+
+    def alive_mask(self, day):
+        """day(0=오늘)에 아직 기한이 안 지난 재료 비트"""
+        mask = 0
+        for bit, d in enumerate(self.days_left):
+            if d is None or d >= day:
+                mask |= 1 << bit
+        return mask
+
+    def gain(self, mask):
+        return sum(b * (mask & m).bit_count() for b, m in self.bonus_masks)
+
+    def names_of(self, mask):
+        return [self.names[bit] for bit in range(len(self.names)) if mask >> bit & 1]
+
+
+def _candidates(ctx, pantry, index):
+    """
+    return: {recipe_id: (pantry 비트셋, 기본 점수)}
+    역색인으로 레시피별 보유 수/비트셋을 한 번에 계산하고, 필터는 DB에서 한 번
+    """
+    from app.utils import time_fit_score
+
+    w = ctx.scoring.w
+    have = defaultdict(int)
+    masks = defaultdict(int)
+    for key, bits in pantry.keys.items():
+        for rid in index.postings.get(key, ()):
+            masks[rid] |= bits
+    have_keys = set(pantry.keys)
+    for rid in masks:
+        have[rid] = sum(1 for k in index.requirements[rid] if k in have_keys)
+
+    rough = []
+    for rid, mask in masks.items():
+        required = len(index.requirements[rid])
+        coverage = have[rid] / required
+        if coverage < MIN_COVERAGE:
+            continue
+        rough.append(((w.coverage + w.missing) * coverage + pantry.gain(mask & ~pantry.expired), rid, coverage))
+    rough.sort(reverse=True)
+    rough = rough[:CANDIDATE_LIMIT]
+    if not rough:
+        return {}, {}
+
+    qs = Recipe.objects.filter(id__in=[rid for _, rid, _ in rough])
+    if ctx.exclude_mask:
+        qs = qs.alias(blocked=F("diet_flags").bitand(ctx.exclude_mask)).filter(blocked=0)
+    if ctx.time_cutoff is not None:
+        qs = qs.filter(Q(cook_time_min__lte=ctx.time_cutoff) | Q(cook_time_min__isnull=True))
+    info = {rid: (title, cook_time) for rid, title, cook_time in qs.values_list("id", "title", "cook_time_min")}
+
+    result = {}
+    for _, rid, coverage in rough:
+        if rid not in info:
+            continue
+        mask = masks[rid]
+        engaged, skipped = ctx.recipe_affinity.get(rid, (0.0, 0.0))
+        base = (
+            w.coverage * coverage
+            - w.missing * (1.0 - coverage)
+            + w.time_fit * time_fit_score(info[rid][1], ctx.max_time)
+            - min(w.expired * (mask & pantry.expired).bit_count(), w.expired_cap)
+            - w.recent_cooked_saved * min(engaged, 1.0)
+            - w.recent_skipped * min(skipped, 1.0)
+        )
+        result[rid] = (mask & ~pantry.expired, base)
+    return result, info
+
+
+def _evaluate(plan, cands, alive, pantry, meals):
+    """plan(칸 순서 = 날짜 순) 전체 점수"""
+    used = 0
+    total = 0.0
+    for slot, rid in enumerate(plan):
+        mask, base = cands[rid]
+        m = mask & alive[slot // meals]
+        total += base + pantry.gain(m & ~used)
+        used |= m
+    return total
+
+
+def _greedy(cands, alive, pantry, slots, meals):
+    plan = []
+    used = 0
+    chosen = set()
+    for slot in range(slots):
+        a = alive[slot // meals]
+        best, best_val = None, None
+        for rid, (mask, base) in cands.items():
+            if rid in chosen:
+                continue
+            val = base + pantry.gain(mask & a & ~used)
+            if best_val is None or val > best_val:
+                best, best_val = rid, val
+        if best is None:
+            break
+        plan.append(best)
+        chosen.add(best)
+        used |= cands[best][0] & a
+    return plan
+
+
+def _local_search(plan, cands, alive, pantry, meals, deadline):
+    """
+    개선이 없을 때까지: (1) 한 칸을 후보 레시피로 교체 (2) 두 칸 순서 바꾸기
+    return: (plan, 점수, 반복 수, 시간 초과 여부)
+    """
+    best = _evaluate(plan, cands, alive, pantry, meals)
+    pool = sorted(cands, key=lambda rid: cands[rid][1] + pantry.gain(cands[rid][0]), reverse=True)[:SWAP_POOL]
+    rounds = 0
+    improved = True
+    while improved:
+        improved = False
+        rounds += 1
+        for i in range(len(plan)):
+            for rid in pool:
+                if rid in plan:
+                    continue
+                if time.monotonic() > deadline:
+                    return plan, best, rounds, True
+                trial = plan[:i] + [rid] + plan[i + 1:]
+                val = _evaluate(trial, cands, alive, pantry, meals)
+                if val > best + 1e-9:
+                    plan, best, improved = trial, val, True
+        for i in range(len(plan)):
+            for j in range(i + 1, len(plan)):
+                if i // meals == j // meals:
+                    continue
+                if time.monotonic() > deadline:
+                    return plan, best, rounds, True
+                trial = plan[:]
+                trial[i], trial[j] = trial[j], trial[i]
+                val = _evaluate(trial, cands, alive, pantry, meals)
+                if val > best + 1e-9:
+                    plan, best, improved = trial, val, True
+    return plan, best, rounds, False
+
+
+def plan_meals(user, days=DEFAULT_DAYS, meals_per_day=1, deadline_ms=DEADLINE_MS):
+    """
+    days일 × meals_per_day끼 식단.
+    시간 예산은 항상 엄격 모드 (max_cook_time_min × time_limit_factor 초과 레시피 제외)
+    """
+    from app.utils import ScoringContext
+
+    started = time.monotonic()
+    deadline = started + deadline_ms / 1000.0
+    today = date.today()
+
+    ctx = ScoringContext(user, strict_time=True)
+    pantry = _Pantry(user, ctx.graph, today, ctx.scoring.w)
+    cands, info = _candidates(ctx, pantry, get_requirement_index())
+
+    slots = days * meals_per_day
+    alive = [pantry.alive_mask(d) for d in range(days)]
+    plan = _greedy(cands, alive, pantry, slots, meals_per_day)
+    plan, objective, rounds, timed_out = _local_search(plan, cands, alive, pantry, meals_per_day, deadline)
+
+    items = []
+    used = 0
+    for slot, rid in enumerate(plan):
+        day = slot // meals_per_day
+        m = cands[rid][0] & alive[day]
+        items.append({
+            "day": day,
+            "date": (today + timedelta(days=day)).isoformat(),
+            "recipe_id": rid,
+            "title": info[rid][0],
+            "cook_time_min": info[rid][1],
+            "uses_expiring": pantry.names_of(m & ~used & pantry.expiring),
+            "uses": pantry.names_of(m),
+        })
+        used |= m
+
+    expiring = pantry.expiring
+    return {
+        "days": days,
+        "meals_per_day": meals_per_day,
+        "plan": items,
+        "expiring_used": pantry.names_of(expiring & used),
+        "expiring_unused": pantry.names_of(expiring & ~used),
+        "objective": round(objective, 4),
+        "search": {
+            "candidates": len(cands),
+            "rounds": rounds,
+            "timed_out": timed_out,
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        },
+    }
+
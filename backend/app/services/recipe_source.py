@@ -2,7 +2,7 @@ from datetime import timedelta
 from django.utils import timezone
 from app.models import ExternalRecipeCache
 from app.external.foodsafety import fetch_recipes_json
-import requests
+from app.external.http import get_client
 from django.conf import settings
 
 CACHE_TTL_MIN = 60  # 1시간 캐시 (MVP 적당)
@@ -28,8 +28,6 @@ def get_foodsafety_recipes(start=1, end=50, name_query=None):
     )
     return payload
 
-BASE_URL = "https://openapi.foodsafetykorea.go.kr/api"
-
 def get_foodsafety_recipes(start=1, end=20, name_query=None):
     """
     식약처 레시피 API(COOKRCP01) 호출
@@ -38,8 +36,9 @@ def get_foodsafety_recipes(start=1, end=20, name_query=None):
     if not key:
         raise RuntimeError("FOODS_API_KEY is empty")
 
-    url = f"{BASE_URL}/{key}/COOKRCP01/json/{start}/{end}"
-    resp = requests.get(url, timeout=10)
+    base = settings.FOODS_API_BASE_URL.rstrip("/")
+    url = f"{base}/{key}/COOKRCP01/json/{start}/{end}"
+    resp = get_client("foodsafety").get(url, endpoint="COOKRCP01")
     resp.raise_for_status()
     data = resp.json()
 
@@ -8,13 +8,16 @@ from ..models import Recipe
 class RecommendationService:
 
     @staticmethod
-    def get_recommendations(user, top=5):
+    def get_recommendations(user, top=5, max_time=None, strict_time=None, diversity=None):
         """
         서비스 레벨 추천 함수
         - 내부 추천 우선
         - 비어있으면 외부 API seed 후 재추천
+        - max_time/strict_time: 요청 단위 시간 필터 (None이면 프로필 설정)
+        - diversity: MMR λ (None이면 설정값)
         """
-        results = recommend_recipes_for_user(user, top=top)
+        options = {"max_time": max_time, "strict_time": strict_time, "diversity": diversity}
+        results = recommend_recipes_for_user(user, top=top, **options)
 
         if results:
             return results, 200
@@ -23,7 +26,7 @@ class RecommendationService:
         seeded = RecommendationService.seed_external()
 
         if seeded:
-            results = recommend_recipes_for_user(user, top=top)
+            results = recommend_recipes_for_user(user, top=top, **options)
             return results, 201
 
         return [], 503
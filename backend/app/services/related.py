@@ -0,0 +1,169 @@
+from collections import defaultdict
+from math import log, sqrt
+
+from django.db import transaction
+
+from app.models import Recipe, RecipeIngredient, RecipeRelated
+from app.services.ingredient_graph import get_ingredient_graph
+
+# 관련 레시피 ("이 레시피와 재료가 비슷한 레시피")
+# - 레시피 벡터: canonical 재료별 TF-IDF (필수 1.0, 선택 0.5) → L2 정규화
+# - 유사도: 역색인(재료 → 레시피)으로 겹치는 재료가 있는 레시피만 내적
+# - 결과는 RecipeRelated에 레시피당 상위 k개 (공개 레시피만 후보)
+# - 증분: related_dirty 레시피만 다시 계산 + 그 레시피가 다른 레시피의 상위 k에 들어가거나
+#   빠지는 경우만 그 레시피 목록을 고침 (IDF 변화는 --full 재계산 때 반영)
+
+TOP_K = 12
+OPTIONAL_WEIGHT = 0.5
+
+
+def load_vectors():
+    """
+    return: (vectors, postings)
+      vectors : {recipe_id: {canonical_id: weight}}  (L2 정규화)
+      postings: {canonical_id: [(recipe_id, weight), ...]}
+    """
+    graph = get_ingredient_graph()
+    tf = defaultdict(dict)
+    for recipe_id, cid, name, optional in RecipeIngredient.objects.values_list(
+        "recipe_id", "ingredient__canonical_id", "ingredient__name_ko", "is_optional"
+    ).iterator(chunk_size=5000):
+        cid = cid if cid is not None else graph.resolve(name)
+        if cid is None:
+            continue
+        w = OPTIONAL_WEIGHT if optional else 1.0
+        if w > tf[recipe_id].get(cid, 0.0):
+            tf[recipe_id][cid] = w
+
+    n = len(tf)
+    df = defaultdict(int)
+    for terms in tf.values():
+        for cid in terms:
+            df[cid] += 1
+    idf = {cid: log((1 + n) / (1 + d)) + 1.0 for cid, d in df.items()}
+
+    vectors = {}
+    postings = defaultdict(list)
+    for recipe_id, terms in tf.items():
+        vec = {cid: w * idf[cid] for cid, w in terms.items()}
+        norm = sqrt(sum(v * v for v in vec.values()))
+        if not norm:
+            continue
+        vec = {cid: v / norm for cid, v in vec.items()}
+        vectors[recipe_id] = vec
+        for cid, v in vec.items():
+            postings[cid].append((recipe_id, v))
+    return vectors, postings
+
+
+def similarities(recipe_id, vectors, postings):
+    """{다른 recipe_id: 코사인 유사도} (겹치는 재료가 있는 레시피만)"""
+    acc = defaultdict(float)
+    for cid, w in vectors.get(recipe_id, {}).items():
+        for other, v in postings[cid]:
+            if other != recipe_id:
+                acc[other] += w * v
+    return acc
+
+
+def _top_k(scores, candidates, k):
+    pairs = [(rid, s) for rid, s in scores.items() if rid in candidates and s > 0]
+    pairs.sort(key=lambda p: (-p[1], p[0]))
+    return pairs[:k]
+
+
+def _save(lists):
+    """{recipe_id: [(neighbor_id, score), ...]} → RecipeRelated upsert"""
+    RecipeRelated.objects.bulk_create(
+        [
+            RecipeRelated(
+                recipe_id=rid,
+                neighbor_ids=[nid for nid, _ in pairs],
+                scores=[round(s, 4) for _, s in pairs],
+            )
+            for rid, pairs in lists.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["recipe"],
+        update_fields=["neighbor_ids", "scores", "updated_at"],
+        batch_size=500,
+    )
+
+
+def build_related(full=False, k=TOP_K, batch_size=500, log=print):
+    """
+    full: 모든 레시피 다시 계산, 아니면 related_dirty 레시피 + 영향받는 레시피만.
+    return: (다시 계산한 레시피 수, 고친 다른 레시피 수)
+    """
+    vectors, postings = load_vectors()
+    public = set(Recipe.objects.filter(is_public=True).values_list("id", flat=True))
+
+    if full:
+        targets = sorted(Recipe.objects.values_list("id", flat=True))
+        existing = {}
+    else:
+        targets = sorted(Recipe.objects.filter(related_dirty=True).values_list("id", flat=True))
+        if not targets:
+            return 0, 0
+        existing = {
+            rid: list(zip(ids, scores))
+            for rid, ids, scores in RecipeRelated.objects.values_list("recipe_id", "neighbor_ids", "scores")
+        }
+
+    dirty = set(targets)
+    touched = {}      # 다른 레시피 → 새 목록
+    seen = set()      # (다른 레시피, 바뀐 레시피) 새 유사도로 반영한 쌍
+    recompute = set()  # 목록 안의 바뀐 레시피 점수가 내려가서 처음부터 다시 계산할 레시피
+
+    for start in range(0, len(targets), batch_size):
+        batch = targets[start:start + batch_size]
+        lists = {}
+        for rid in batch:
+            sims = similarities(rid, vectors, postings)
+            lists[rid] = _top_k(sims, public - {rid}, k)
+            if full or rid not in public:
+                continue
+            # rid가 다른 레시피 목록에 새로 들어가거나 점수가 바뀌는 경우
+            for other, s in sims.items():
+                if other in dirty:
+                    continue
+                seen.add((other, rid))
+                cur = touched.get(other, existing.get(other, []))
+                old = next((sc for nid, sc in cur if nid == rid), None)
+                if old is not None and s < old - 1e-4:
+                    recompute.add(other)  # 목록 밖 후보가 더 높을 수 있음
+                elif old is not None or len(cur) < k or s > cur[-1][1]:
+                    merged = {nid: sc for nid, sc in cur if nid != rid}
+                    merged[rid] = s
+                    touched[other] = _top_k(merged, public, k)
+
+        with transaction.atomic():
+            _save(lists)
+            Recipe.objects.filter(id__in=batch).update(related_dirty=False)
+        log(f"  related: {min(start + batch_size, len(targets))}/{len(targets)}")
+
+    if not full:
+        # 바뀐 레시피가 목록에 있었는데 이제 유사도 0/비공개/삭제 → 그 레시피는 처음부터 다시 계산
+        for other, cur in existing.items():
+            if other in dirty:
+                continue
+            if any(nid in dirty and (other, nid) not in seen for nid, _ in cur):
+                recompute.add(other)
+        for other in recompute:
+            touched[other] = _top_k(similarities(other, vectors, postings), public - {other}, k)
+
+        for start in range(0, len(touched), batch_size):
+            chunk = dict(list(touched.items())[start:start + batch_size])
+            with transaction.atomic():
+                _save(chunk)
+
+    return len(targets), len(touched)
+
+
+def get_related(recipe_id, limit=None):
+    """[(neighbor_id, score), ...] (PK 조회 한 번)"""
+    row = RecipeRelated.objects.filter(recipe_id=recipe_id).values_list("neighbor_ids", "scores").first()
+    if row is None:
+        return []
+    pairs = list(zip(*row))
+    return pairs[:limit] if limit else pairs
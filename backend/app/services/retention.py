@@ -0,0 +1,156 @@
+import gzip
+import json
+import time
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.models import (
+    RecipeAction,
+    RecipeExposure,
+    RecommendationHistory,
+    RecommendationImpression,
+    UserRecipeStats,
+)
+from app.services.conversion import ATTRIBUTION_DAYS, get_rollup_through
+
+# 보관 기간이 지난 이벤트 행을 gzip NDJSON으로 옮기고 DB에서 지움
+# - 추천은 최근 7일 액션/최근 노출만 읽으므로 오래된 행은 인덱스만 키움
+# - RecipeAction은 지우기 전에 UserRecipeStats(유저×레시피 누적 횟수)에 더함
+# - 배치마다 (파일에 쓰기 → 집계+삭제 한 트랜잭션) 이라서 중간에 죽으면
+#   같은 행이 다음 실행 때 한 번 더 아카이브될 수 있음 (at-least-once, 집계는 중복 안 됨)
+# - RecipeExposure는 일간 전환 집계(rollup_conversions)가 이미 끝난 날짜만 지움
+#   (집계는 마지막 집계일 - ATTRIBUTION_DAYS 부터 다시 계산하므로 그 이전 날짜만)
+# - UserConversionDaily/ConversionDaily는 하루 한 행짜리 요약이라 지우지 않음 (장기 대시보드용)
+
+# name: (모델, 기준 시각 필드, 아카이브할 필드)
+EVENT_TABLES = {
+    "recipe_actions": (
+        RecipeAction, "created_at",
+        ["id", "user_id", "recipe_id", "action", "created_at", "impression_id"],
+    ),
+    "recommendation_history": (
+        RecommendationHistory, "created_at",
+        ["id", "user_id", "context", "result_recipe_ids", "created_at"],
+    ),
+    "recommendation_impressions": (
+        RecommendationImpression, "served_at",
+        ["id", "user_id", "recipe_id", "position", "served_at", "impression_id"],
+    ),
+    "recipe_exposures": (
+        RecipeExposure, "day",
+        ["id", "user_id", "recipe_id", "day", "count", "converted"],
+    ),
+}
+
+_STAT_FIELDS = {"cook": "cooked", "save": "saved", "skip": "skipped"}
+
+
+def retention_cutoff(days=None):
+    return timezone.now() - timedelta(days=days if days is not None else settings.EVENT_RETENTION_DAYS)
+
+
+def _add_action_stats(rows):
+    """아카이브될 RecipeAction 행 → UserRecipeStats 증가 (F()로 더해서 동시 실행에도 안전)"""
+    counts = {}
+    for r in rows:
+        field = _STAT_FIELDS.get(r["action"])
+        if field is None:
+            continue
+        key = (r["user_id"], r["recipe_id"])
+        entry = counts.setdefault(key, [Counter(), None])
+        entry[0][field] += 1
+        if entry[1] is None or r["created_at"] > entry[1]:
+            entry[1] = r["created_at"]
+    if not counts:
+        return
+
+    UserRecipeStats.objects.bulk_create(
+        [UserRecipeStats(user_id=u, recipe_id=rid) for u, rid in counts],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+    rows = UserRecipeStats.objects.filter(
+        user_id__in={u for u, _ in counts},
+        recipe_id__in={rid for _, rid in counts},
+    ).only("id", "user_id", "recipe_id", "last_action_at")
+
+    to_update = []
+    for stat in rows:
+        entry = counts.get((stat.user_id, stat.recipe_id))
+        if entry is None:
+            continue
+        added, last = entry
+        for field in _STAT_FIELDS.values():
+            setattr(stat, field, F(field) + added[field])
+        if stat.last_action_at is None or last > stat.last_action_at:
+            stat.last_action_at = last
+        to_update.append(stat)
+    UserRecipeStats.objects.bulk_update(
+        to_update, [*_STAT_FIELDS.values(), "last_action_at"], batch_size=500
+    )
+
+
+def archive_path(name, archive_dir=None):
+    archive_dir = Path(archive_dir or settings.EVENT_ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    return archive_dir / f"{name}-{timezone.now():%Y%m%d-%H%M%S}.ndjson.gz"
+
+
+def _expired(name, cutoff):
+    """cutoff 이전 행 queryset (RecipeExposure는 날짜 기준 + 전환 집계가 끝난 날짜까지만)"""
+    model, ts_field, _ = EVENT_TABLES[name]
+    if model is RecipeExposure:
+        through = get_rollup_through()
+        if through is None:
+            return model.objects.none()  # 아직 집계 전: 지우면 전환율을 다시 계산할 수 없음
+        cutoff = min(timezone.localdate(cutoff), through - timedelta(days=ATTRIBUTION_DAYS))
+    return model.objects.filter(**{f"{ts_field}__lt": cutoff})
+
+
+def count_expired(name, cutoff):
+    return _expired(name, cutoff).count()
+
+
+def compact_table(name, cutoff, batch_size=1000, sleep_ms=50, archive_dir=None, log=print):
+    """
+    cutoff 이전 행을 batch_size씩: 아카이브 파일에 쓰고 → (집계 +) 삭제.
+    return: (옮긴 행 수, 아카이브 파일 경로 또는 None)
+    """
+    model, _, fields = EVENT_TABLES[name]
+    expired = _expired(name, cutoff).order_by("id")
+
+    moved = 0
+    path = None
+    out = None
+    try:
+        while True:
+            rows = list(expired.values(*fields)[:batch_size])
+            if not rows:
+                break
+            if out is None:
+                path = archive_path(name, archive_dir)
+                out = gzip.open(path, "at", encoding="utf-8")
+            out.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in rows))
+            out.flush()
+
+            with transaction.atomic():
+                if model is RecipeAction:
+                    _add_action_stats(rows)
+                model.objects.filter(id__in=[r["id"] for r in rows]).delete()
+            moved += len(rows)
+            log(f"  {name}: {moved}")
+
+            if len(rows) < batch_size:
+                break
+            if sleep_ms:
+                time.sleep(sleep_ms / 1000.0)
+    finally:
+        if out is not None:
+            out.close()
+    return moved, path
@@ -0,0 +1,140 @@
+import hashlib
+from typing import NamedTuple
+
+from django.conf import settings
+
+from app.models import AppSetting
+from app.services.versioning import VersionedSnapshot, bump_version
+
+# 추천 점수 가중치 프로필
+# - 기본값은 ScoringWeights, 프로필별 덮어쓰기는 settings.SCORING_PROFILES → AppSetting 순
+#   AppSetting "scoring:<프로필>:<가중치 이름>" = 값  (예: "scoring:b:coverage" = "0.6")
+# - A/B 비율(%): settings.SCORING_SPLIT → AppSetting "scoring_split" = "default:90,b:10"
+#   합이 100보다 작으면 나머지는 default, 100을 넘으면 설정 무시 (전부 default)
+#   비율에만 있고 덮어쓰기가 없는 프로필은 기본 가중치 그대로
+# - 설정이 바뀌면 버전을 올려서 프로세스마다 한 번만 다시 컴파일 (요청마다 dict 해석 없음)
+# - 유저 → 프로필은 user_id 해시로 고정 (비율만 바꾸면 대부분 유저는 같은 칸에 남음)
+
+SCORING_VERSION_KEY = "scoring_config_version"
+WEIGHT_KEY_PREFIX = "scoring:"
+SPLIT_KEY = "scoring_split"
+DEFAULT_PROFILE = "default"
+_BUCKETS = 100
+
+
+class ScoringWeights(NamedTuple):
+    coverage: float = 0.55             # 보유 필수 재료 비율
+    missing: float = 0.20              # 부족 재료 비율 (감점)
+    time_fit: float = 0.10
+    expiry_urgent: float = 0.25        # 0~2일 남은 재료 하나당
+    expiry_soon: float = 0.10          # 3~7일 남은 재료 하나당
+    expired: float = 0.20              # 기한 지난 재료 하나당 (감점)
+    expiry_cap: float = 0.5
+    expired_cap: float = 0.5
+    recent_cooked_saved: float = 0.15  # 감쇠 cook/save 점수 × (감점)
+    recent_skipped: float = 0.40       # 감쇠 skip 점수 × (감점)
+    cooldown: float = 0.10             # 최근 추천 노출 (감점)
+    ingredient_pref: float = 0.05
+    cooccurrence: float = 0.08
+    exposure_no_convert: float = 0.20  # 2번 이상 노출됐는데 전환 없음 (감점)
+    converted: float = 0.05
+    popularity: float = 0.08
+    popularity_cap_users: float = 20.0
+
+
+DEFAULT_WEIGHTS = ScoringWeights()
+
+
+class ScoringProfile(NamedTuple):
+    id: str
+    w: ScoringWeights
+
+
+class ScoringConfig(NamedTuple):
+    profiles: dict   # id -> ScoringProfile
+    buckets: list    # [(누적 상한, ScoringProfile), ...]
+
+
+def compile_weights(overrides):
+    """{이름: 값} → ScoringWeights (모르는 이름/숫자가 아닌 값은 무시)"""
+    values = {}
+    for name, value in overrides.items():
+        if name not in ScoringWeights._fields:
+            print(f"[scoring] unknown weight: {name}")
+            continue
+        try:
+            values[name] = float(value)
+        except (TypeError, ValueError):
+            print(f"[scoring] invalid weight {name}={value!r}")
+    return DEFAULT_WEIGHTS._replace(**values)
+
+
+def parse_split(text):
+    """"default:90,b:10" → {"default": 90, "b": 10}"""
+    split = {}
+    for part in (text or "").split(","):
+        pid, _, share = part.strip().partition(":")
+        try:
+            share = int(share)
+        except ValueError:
+            continue
+        if pid and share > 0:
+            split[pid] = share
+    return split
+
+
+def _load_config():
+    overrides = {pid: dict(values) for pid, values in getattr(settings, "SCORING_PROFILES", {}).items()}
+    overrides.setdefault(DEFAULT_PROFILE, {})
+    split = dict(getattr(settings, "SCORING_SPLIT", {DEFAULT_PROFILE: 100}))
+
+    for key, value in AppSetting.objects.filter(key__startswith=WEIGHT_KEY_PREFIX).values_list("key", "value"):
+        pid, _, name = key[len(WEIGHT_KEY_PREFIX):].partition(":")
+        if pid and name:
+            overrides.setdefault(pid, {})[name] = value
+    split_text = AppSetting.objects.filter(key=SPLIT_KEY).values_list("value", flat=True).first()
+    if split_text:
+        split = parse_split(split_text)
+
+    if sum(split.values()) > _BUCKETS:
+        print(f"[scoring] split total over {_BUCKETS}%: {split} (ignored)")
+        split = {}
+    for pid in split:
+        overrides.setdefault(pid, {})
+    profiles = {pid: ScoringProfile(pid, compile_weights(values)) for pid, values in overrides.items()}
+
+    # 비율(%) 그대로 누적 상한으로, 남는 칸은 default
+    buckets = []
+    upper = 0
+    for pid, share in split.items():
+        upper += share
+        buckets.append((upper, profiles[pid]))
+    if upper < _BUCKETS:
+        buckets.append((_BUCKETS, profiles[DEFAULT_PROFILE]))
+    return ScoringConfig(profiles, buckets)
+
+
+_config_snapshot = VersionedSnapshot(SCORING_VERSION_KEY, _load_config)
+
+
+def get_scoring_config() -> ScoringConfig:
+    return _config_snapshot.get()
+
+
+def bump_scoring_version() -> int:
+    return bump_version(SCORING_VERSION_KEY)
+
+
+def user_bucket(user_id):
+    """user_id → 0~99 (해시라서 id 순서와 무관하게 고르게 나뉨)"""
+    digest = hashlib.sha1(f"scoring:{user_id}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") % _BUCKETS
+
+
+def scoring_profile_for(user_id) -> ScoringProfile:
+    bucket = user_bucket(user_id)
+    buckets = get_scoring_config().buckets
+    for upper, profile in buckets:
+        if bucket < upper:
+            return profile
+    return buckets[-1][1]
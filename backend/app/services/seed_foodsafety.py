@@ -1,23 +1,15 @@
-import re
-from app.models import Recipe, Ingredient, RecipeIngredient, RecipeStep
+import hashlib
+import json
+import time
 
+from django.conf import settings
+from django.db import transaction
 
-def _split_ingredients(text: str):
-    """
-    MVP용: 재료 텍스트를 대충 잘라서 ingredient 이름 목록 만들기.
-    (정교한 파싱은 나중에)
-    """
-    if not text:
-        return []
-    # 줄바꿈/쉼표 기준으로 분리
-    parts = re.split(r"[\n,]", text)
-    cleaned = []
-    for p in parts:
-        name = p.strip()
-        if not name:
-            continue
-        cleaned.append(name)
-    return cleaned
+from app.models import Recipe, RecipeIngredient, RecipeStep
+from app.services.catalog import bump_catalog_version
+from app.services.dietary import recompute_recipe_flags
+from app.services.ingredient_graph import ensure_ingredients
+from app.services.ingredient_parser import parse_parts_dtls
 
 
 def _unique_merge_lists(existing: list, new_items: list) -> list:
@@ -44,156 +36,284 @@ def _unique_merge_lists(existing: list, new_items: list) -> list:
     return result
 
 
-def seed_from_foodsafety_rows(rows, limit=20):
+def _normalize_row(row):
     """
-    rows: COOKRCP01 row 리스트
-    limit: 최대 저장 개수
-    return: {"created": X, "updated": Y, "skipped": Z}
+    COOKRCP01 row → 적재에 필요한 값만 정리한 dict.
+    필수 값(RCP_NM, RCP_SEQ)이 없으면 None.
+    """
+    title = (row.get("RCP_NM") or "").strip()
+    if not title:
+        return None
+
+    # ✅ external_id는 RCP_SEQ 필수 - 없으면 스킵
+    raw_seq = (row.get("RCP_SEQ") or "").strip()
+    if not raw_seq:
+        print(f"[SKIP] RCP_SEQ 없음: {title}")
+        return None
+
+    # 조리 단계 (텍스트 + 이미지)
+    steps = []
+    step_images = []
+    for i in range(1, 21):
+        key_txt = f"MANUAL{str(i).zfill(2)}"
+        key_img = f"MANUAL_IMG{str(i).zfill(2)}"
+        txt = (row.get(key_txt) or "").strip()
+        img = (row.get(key_img) or "").strip()
+        if img:
+            step_images.append(img)
+        if txt:
+            steps.append((txt, img))
+
+    cook_time_raw = row.get("RCP_COOK_TIME") or ""
+    try:
+        cook_time_min = int(cook_time_raw) if cook_time_raw.strip() else None
+    except (ValueError, TypeError, AttributeError):
+        cook_time_min = None
+
+    return {
+        "title": title,
+        "external_id": raw_seq,
+        # 대표 이미지(대/소)
+        "img_large": (row.get("ATT_FILE_NO_MAIN") or "").strip(),
+        "img_small": (row.get("ATT_FILE_NO_MK") or "").strip(),
+        # 재료 원문
+        "parts_text": row.get("RCP_PARTS_DTLS") or "",
+        "step_images": step_images,
+        "steps": steps,
+        "cook_time_min": cook_time_min,
+    }
 
-    Upsert 로직:
-    - external_id(RCP_SEQ)로 기존 레시피 조회
-    - 있으면: 빈 필드만 채움 (기존 값 보존)
-    - 없으면: 새로 생성
+
+def row_content_hash(rec) -> str:
+    """정규화된 row의 안정적인 해시 (키 순서/공백 차이 무시)"""
+    raw = json.dumps(rec, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _fill_empty_fields(recipe, rec):
     """
-    created, updated, skipped = 0, 0, 0
+    UPDATE: 빈 필드만 채움 (기존 값 보존)
+    return: 바뀐 필드 목록
+    """
+    fields = []
 
-    for row in rows[:limit]:
-        title = (row.get("RCP_NM") or "").strip()
-        if not title:
-            skipped += 1
-            continue
+    # image_url: 비어있을 때만 채움
+    if not recipe.image_url and (rec["img_large"] or rec["img_small"]):
+        recipe.image_url = rec["img_large"] or rec["img_small"]
+        fields.append("image_url")
 
-        # ✅ external_id는 RCP_SEQ 필수 - 없으면 스킵
-        raw_seq = (row.get("RCP_SEQ") or "").strip()
-        if not raw_seq:
-            print(f"[SKIP] RCP_SEQ 없음: {title}")
-            skipped += 1
-            continue
+    # image_url_small: 비어있을 때만 채움
+    if not recipe.image_url_small and rec["img_small"]:
+        recipe.image_url_small = rec["img_small"]
+        fields.append("image_url_small")
 
-        external_id = raw_seq
+    # instruction_images: 리스트 병합 (중복 제거)
+    if rec["step_images"]:
+        merged_imgs = _unique_merge_lists(recipe.instruction_images, rec["step_images"])
+        if merged_imgs != recipe.instruction_images:
+            recipe.instruction_images = merged_imgs
+            fields.append("instruction_images")
 
-        # 대표 이미지(대/소)
-        img_large = (row.get("ATT_FILE_NO_MAIN") or "").strip()
-        img_small = (row.get("ATT_FILE_NO_MK") or "").strip()
+    # raw_ingredients: 비어있을 때만 채움
+    if not recipe.raw_ingredients and rec["parts_text"]:
+        recipe.raw_ingredients = rec["parts_text"]
+        fields.append("raw_ingredients")
 
-        # 재료 원문
-        parts_text = row.get("RCP_PARTS_DTLS") or ""
-
-        # 조리 단계 이미지 리스트 추출
-        step_images = []
-        for i in range(1, 21):
-            key_img = f"MANUAL_IMG{str(i).zfill(2)}"
-            img = (row.get(key_img) or "").strip()
-            if img:
-                step_images.append(img)
-
-        # ✅ 기존 레시피 조회
-        existing_recipe = Recipe.objects.filter(
-            external_source="foodsafety",
-            external_id=external_id,
-        ).first()
-
-        if existing_recipe:
-            # ========================================
-            # UPDATE: 빈 필드만 채움 (기존 값 보존)
-            # ========================================
-            recipe = existing_recipe
-            fields_to_update = []
-
-            # image_url: 비어있을 때만 채움
-            if not recipe.image_url and (img_large or img_small):
-                recipe.image_url = img_large or img_small
-                fields_to_update.append("image_url")
-
-            # image_url_small: 비어있을 때만 채움
-            if not recipe.image_url_small and img_small:
-                recipe.image_url_small = img_small
-                fields_to_update.append("image_url_small")
-
-            # instruction_images: 리스트 병합 (중복 제거)
-            if step_images:
-                merged_imgs = _unique_merge_lists(recipe.instruction_images, step_images)
-                if merged_imgs != recipe.instruction_images:
-                    recipe.instruction_images = merged_imgs
-                    fields_to_update.append("instruction_images")
-
-            # raw_ingredients: 비어있을 때만 채움
-            if not recipe.raw_ingredients and parts_text:
-                recipe.raw_ingredients = parts_text
-                fields_to_update.append("raw_ingredients")
-
-            # title은 항상 있으므로 건드리지 않음
-
-            if fields_to_update:
-                recipe.save(update_fields=fields_to_update)
-                print(f"[UPDATE] {recipe.id}: {title} - fields: {fields_to_update}")
+    # title은 항상 있으므로 건드리지 않음
+    return fields
+
+
+def _seed_batch(rows):
+    """
+    한 배치(트랜잭션 하나) 적재. return: (created, updated, skipped, unchanged)
+    쿼리 수가 행 수가 아니라 배치 수에 비례하도록 전부 bulk로 처리.
+    unchanged: 저장된 해시와 같아서 아무 작업 없이 넘긴 행 (skipped에 포함)
+    """
+    created, updated, skipped, unchanged = 0, 0, 0, 0
+
+    records = []
+    for row in rows:
+        rec = _normalize_row(row)
+        if rec is None:
+            skipped += 1
+        else:
+            records.append((rec, row_content_hash(rec)))
+
+    if not records:
+        return created, updated, skipped, unchanged
+
+    # ✅ 기존 레시피 해시만 먼저 한 번에 조회 (중복 레코드가 있으면 id 작은 것 기준)
+    stored_hash = {}
+    for ext_id, pk, h in Recipe.objects.filter(
+        external_source="foodsafety",
+        external_id__in={rec["external_id"] for rec, _ in records},
+    ).order_by("id").values_list("external_id", "id", "external_hash"):
+        stored_hash.setdefault(ext_id, (pk, h))
+
+    # 해시가 같은 행은 여기서 끝 (파싱/병합/쓰기 없음)
+    changed = []
+    for rec, h in records:
+        stored = stored_hash.get(rec["external_id"])
+        if stored is not None and stored[1] == h:
+            unchanged += 1
+            skipped += 1
+        else:
+            changed.append((rec, h))
+
+    if not changed:
+        return created, updated, skipped, unchanged
+
+    # 바뀐/새 행에 해당하는 레시피만 전체 로드
+    by_ext = {}
+    load_ids = [stored_hash[rec["external_id"]][0] for rec, _ in changed if rec["external_id"] in stored_hash]
+    for recipe in Recipe.objects.filter(id__in=load_ids):
+        by_ext[recipe.external_id] = recipe
+
+    to_create = []      # [(Recipe, rec)]
+    to_update = {}      # id(Recipe) -> Recipe
+    update_fields = set()
+
+    for rec, h in changed:
+        recipe = by_ext.get(rec["external_id"])
+
+        if recipe is not None:
+            fields = _fill_empty_fields(recipe, rec)
+            if recipe.external_hash != h:
+                recipe.external_hash = h
+                update_fields.add("external_hash")
+                if recipe.pk is not None:
+                    to_update[id(recipe)] = recipe
+            if fields:
+                update_fields.update(fields)
+                if recipe.pk is not None:
+                    to_update[id(recipe)] = recipe
                 updated += 1
             else:
-                # 업데이트할 필드가 없으면 스킵 카운트
+                # 업데이트할 필드가 없으면 스킵 카운트 (해시만 갱신)
                 skipped += 1
-                continue
+            continue
 
-        else:
-            # ========================================
-            # CREATE: 새 레시피 생성
-            # ========================================
-            cook_time_raw = row.get("RCP_COOK_TIME") or ""
-            try:
-                cook_time_min = int(cook_time_raw) if cook_time_raw.strip() else None
-            except (ValueError, TypeError):
-                cook_time_min = None
-
-            recipe = Recipe.objects.create(
+        # CREATE: 새 레시피 (같은 배치 안의 중복 RCP_SEQ는 위 UPDATE 경로로)
+        recipe = Recipe(
+            external_source="foodsafety",
+            external_id=rec["external_id"],
+            title=rec["title"],
+            cook_time_min=rec["cook_time_min"],
+            source="MFDS",
+            source_recipe_id=rec["external_id"],
+            image_url=rec["img_large"] or rec["img_small"],
+            image_url_small=rec["img_small"],
+            raw_ingredients=rec["parts_text"],
+            instruction_images=rec["step_images"],
+            external_hash=h,
+        )
+        by_ext[rec["external_id"]] = recipe
+        to_create.append((recipe, rec))
+        created += 1
+
+    if to_update:
+        Recipe.objects.bulk_update(list(to_update.values()), sorted(update_fields))
+
+    if not to_create:
+        return created, updated, skipped, unchanged
+
+    new_recipes = [recipe for recipe, _ in to_create]
+    Recipe.objects.bulk_create(new_recipes)
+
+    # RETURNING 미지원 DB면 id를 다시 조회
+    if any(r.pk is None for r in new_recipes):
+        ids = dict(
+            Recipe.objects.filter(
                 external_source="foodsafety",
-                external_id=external_id,
-                title=title,
-                cook_time_min=cook_time_min,
-                source="MFDS",
-                source_recipe_id=raw_seq,
-                image_url=img_large or img_small,
-                image_url_small=img_small,
-                raw_ingredients=parts_text,
-                instruction_images=step_images,
-            )
-            print(f"[CREATE] {recipe.id}: {title}")
-            created += 1
-
-        # ========================================
-        # 재료/스텝 처리 (새로 생성된 경우에만)
-        # 기존 레시피는 재료/스텝을 덮어쓰지 않음
-        # ========================================
-        if not existing_recipe:
-            # 1) 재료 저장
-            ing_names = _split_ingredients(parts_text)
-            for name in ing_names:
-                ing, _ = Ingredient.objects.get_or_create(name_ko=name)
-                RecipeIngredient.objects.update_or_create(
-                    recipe=recipe,
-                    ingredient=ing,
-                    defaults={
-                        "amount_text": "",
-                        "is_optional": False,
-                    },
-                )
-
-            # 2) 조리 단계 저장
-            step_no = 1
-            for i in range(1, 21):
-                key_txt = f"MANUAL{str(i).zfill(2)}"
-                key_img = f"MANUAL_IMG{str(i).zfill(2)}"
-
-                txt = (row.get(key_txt) or "").strip()
-                img = (row.get(key_img) or "").strip()
-
-                if not txt:
-                    continue
-
-                RecipeStep.objects.create(
-                    recipe=recipe,
-                    step_no=step_no,
-                    description=txt,
-                    image_url=img,
-                )
-                step_no += 1
-
-    return {"created": created, "updated": updated, "skipped": skipped}
+                external_id__in=[r.external_id for r in new_recipes],
+            ).order_by("-id").values_list("external_id", "id")
+        )
+        for r in new_recipes:
+            r.pk = ids.get(r.external_id)
+
+    # ========================================
+    # 재료/스텝 처리 (새로 생성된 경우에만)
+    # 기존 레시피는 재료/스텝을 덮어쓰지 않음
+    # ========================================
+    parsed_by_recipe = [
+        (recipe, parse_parts_dtls(rec["parts_text"], title=rec["title"]), rec)
+        for recipe, rec in to_create
+    ]
+
+    # 1) 재료: 이름 전체를 한 번에 조회/생성
+    ing_ids = ensure_ingredients(
+        p.name for _, parsed, _ in parsed_by_recipe for p in parsed
+    )
+
+    recipe_ingredients = []
+    recipe_steps = []
+    for recipe, parsed, rec in parsed_by_recipe:
+        seen = set()
+        for p in parsed:
+            iid = ing_ids.get(p.name)
+            if iid is None or iid in seen:
+                continue
+            seen.add(iid)
+            recipe_ingredients.append(RecipeIngredient(
+                recipe_id=recipe.pk,
+                ingredient_id=iid,
+                amount_text=p.amount_text,
+                is_optional=p.is_optional,
+            ))
+
+        # 2) 조리 단계
+        for step_no, (txt, img) in enumerate(rec["steps"], start=1):
+            recipe_steps.append(RecipeStep(
+                recipe_id=recipe.pk,
+                step_no=step_no,
+                description=txt,
+                image_url=img,
+            ))
+
+    RecipeIngredient.objects.bulk_create(recipe_ingredients, ignore_conflicts=True)
+    RecipeStep.objects.bulk_create(recipe_steps, ignore_conflicts=True)
+
+    # 알레르기/식단 비트 (추천 하드 필터)
+    recompute_recipe_flags([r.pk for r in new_recipes])
+    if new_recipes:
+        bump_catalog_version()  # 레시피 재료 스냅샷 (장보기 분석) 재로드
+
+    return created, updated, skipped, unchanged
+
+
+def seed_from_foodsafety_rows(rows, limit=20, batch_size=None):
+    """
+    rows: COOKRCP01 row 리스트
+    limit: 최대 저장 개수
+    batch_size: 트랜잭션 하나에 넣을 행 수 (기본 settings.FOODSAFETY_SEED_BATCH_SIZE)
+    return: {"created": X, "updated": Y, "skipped": Z, "unchanged": U, "elapsed_sec": T, "rows_per_sec": R}
+    (unchanged: 원본 해시가 같아 건너뛴 행, skipped에 포함)
+
+    Upsert 로직:
+    - external_id(RCP_SEQ)로 기존 레시피 조회
+    - 있으면: 빈 필드만 채움 (기존 값 보존)
+    - 없으면: 새로 생성
+    """
+    batch_size = max(1, int(batch_size or getattr(settings, "FOODSAFETY_SEED_BATCH_SIZE", 200)))
+    rows = list(rows[:limit])
+
+    started = time.monotonic()
+    created, updated, skipped, unchanged = 0, 0, 0, 0
+
+    for i in range(0, len(rows), batch_size):
+        with transaction.atomic():
+            c, u, s, n = _seed_batch(rows[i:i + batch_size])
+        created += c
+        updated += u
+        skipped += s
+        unchanged += n
+
+    elapsed = time.monotonic() - started
+    return {
+        "created": created,
+        "updated": updated,
+        "skipped": skipped,
+        "unchanged": unchanged,
+        "elapsed_sec": round(elapsed, 3),
+        "rows_per_sec": round(len(rows) / elapsed, 1) if elapsed > 0 else None,
+    }
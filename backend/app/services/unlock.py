@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from app.services.catalog import get_requirement_index
+
+# "이거 하나 사면 N개 레시피 가능" (장보기 추천)
+#
+# - 레시피 필수 재료 역색인 스냅샷 (catalog.get_requirement_index)
+# - 요청마다: 냉장고가 채우는 키들의 역색인만 훑어서 레시피별 보유 수 → 부족 수 = 필수 수 - 보유 수
+#   → 부족 재료가 적은 레시피만 골라서 "어떤 재료를 사면 몇 개가 풀리는지" 집계 (카탈로그 한 바퀴)
+# - 가중치는 추천 점수(score_recipe)로, 점수 계산은 후보 레시피만
+
+# 하나 사고 나서 이 개수 이하로 부족하면 "거의 가능"
+NEAR_MISSING = 1
+NEAR_WEIGHT = 0.5
+
+
+def missing_counts(index, have_keys, max_missing):
+    """
+    냉장고가 채우는 재료 키 집합 → {recipe_id: 부족 수} (1 ≤ 부족 수 ≤ max_missing 인 레시피만)
+    역색인으로 보유 수를 세고 레시피를 한 번만 훑음
+    """
+    have = defaultdict(int)
+    for key in have_keys:
+        for rid in index.postings.get(key, ()):
+            have[rid] += 1
+    result = {}
+    for rid, keys in index.requirements.items():
+        missing = len(keys) - have.get(rid, 0)
+        if 1 <= missing <= max_missing:
+            result[rid] = missing
+    return result
+
+
+def _unlocks(missing_keys, graph):
+    """
+    부족 재료 키 목록 → {살 재료 키: 사면 채워지는 부족 재료 수}
+    (상위/하위 재료는 서로 채움, 예: "돼지"와 "삼겹살"이 둘 다 필요하면 하나로 둘 다)
+    """
+    result = {}
+    for buy in set(missing_keys):
+        cover = graph.cover_of(buy) if buy > 0 else (buy,)
+        result[buy] = sum(1 for k in missing_keys if k in cover)
+    return result
+
+
+def unlock_analysis(user, limit=10, near_missing=NEAR_MISSING, per_item=3):
+    """
+    유저 냉장고 기준으로 "없는 재료 하나"를 살 때 가능해지는 레시피 수/가중치 순위.
+    return: [
+      {"ingredient", "canonical_id", "unlocks", "near", "weight", "recipes": [...]}, ...
+    ]
+      unlocks: 사면 바로 가능한 레시피 수, near: 사도 near_missing개 이하만 부족한 레시피 수
+      weight : Σ (산 뒤 추천 점수, 0 이상) × (1 또는 NEAR_WEIGHT)
+    """
+    from app.utils import ScoringContext, _recipes_with_ingredients, score_recipe
+
+    ctx = ScoringContext(user)
+    index = get_requirement_index()
+    graph = ctx.graph
+    # 재료 하나로 부족 수가 줄어드는 만큼의 기본 점수 변화 (coverage 가중치 + 부족 가중치)
+    gain = ctx.scoring.w.coverage + ctx.scoring.w.missing
+
+    have_keys = set(ctx.pantry_cover) | {-iid for iid in ctx.pantry_ids}
+    candidates = missing_counts(index, have_keys, max_missing=near_missing + 1)
+    candidates = {rid: m for rid, m in candidates.items() if rid not in ctx.saved_ids}
+    if not candidates:
+        return []
+
+    # 후보만 점수 계산 (알레르기/식단, 시간 엄격 모드는 추천과 같은 기준으로 제외)
+    scored = {}
+    for r in _recipes_with_ingredients(ctx.exclude_mask, ctx.time_cutoff).filter(id__in=list(candidates)):
+        item = score_recipe(ctx, r)
+        if item is not None:
+            scored[r.id] = item
+
+    totals = defaultdict(lambda: {"unlocks": 0, "near": 0, "weight": 0.0, "recipes": []})
+    for rid, item in scored.items():
+        keys = index.requirements[rid]
+        missing_keys = [k for k in keys if k not in have_keys]
+        for buy, covered in _unlocks(missing_keys, graph).items():
+            left = len(missing_keys) - covered
+            if left > near_missing:
+                continue
+            score = max(0.0, item["score"] + gain * covered / len(keys))
+            t = totals[buy]
+            if left == 0:
+                t["unlocks"] += 1
+                t["weight"] += score
+            else:
+                t["near"] += 1
+                t["weight"] += NEAR_WEIGHT * score
+            t["recipes"].append((score, left, rid))
+
+    results = []
+    for buy, t in totals.items():
+        t["recipes"].sort(key=lambda x: (x[1], -x[0], x[2]))
+        results.append({
+            "ingredient": index.names.get(buy, ""),
+            "canonical_id": buy if buy > 0 else None,
+            "unlocks": t["unlocks"],
+            "near": t["near"],
+            "weight": round(t["weight"], 4),
+            "recipes": [
+                {
+                    "recipe_id": rid,
+                    "title": scored[rid]["title"],
+                    "missing_after": left,
+                    "score": round(score, 4),
+                }
+                for score, left, rid in t["recipes"][:per_item]
+            ],
+        })
+    results.sort(key=lambda x: (-x["weight"], -x["unlocks"], x["ingredient"]))
+    return results[:limit]
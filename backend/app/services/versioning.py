@@ -0,0 +1,85 @@
+import threading
+import time
+
+from django.db import transaction
+
+from app.models import AppSetting
+
+# 다른 프로세스의 버전 변경을 확인하는 주기 (초)
+VERSION_CHECK_INTERVAL_SEC = 30
+
+_snapshots = {}  # version_key -> [VersionedSnapshot, ...]
+
+
+def get_version(key: str) -> int:
+    """AppSetting에 저장된 버전 번호 조회 (없으면 0)"""
+    value = AppSetting.objects.filter(key=key).values_list("value", flat=True).first()
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
+
+
+def bump_version(key: str) -> int:
+    """
+    버전 번호 +1.
+    - 같은 프로세스의 스냅샷은 커밋 직후 바로 무효화
+    - 다른 프로세스는 VERSION_CHECK_INTERVAL_SEC 안에 변경을 감지
+    """
+    with transaction.atomic():
+        setting, _ = AppSetting.objects.select_for_update().get_or_create(
+            key=key, defaults={"value": "0"}
+        )
+        try:
+            version = int(setting.value or 0) + 1
+        except ValueError:
+            version = 1
+        setting.value = str(version)
+        setting.save(update_fields=["value", "updated_at"])
+
+        def _invalidate_local():
+            for snap in _snapshots.get(key, []):
+                snap.invalidate()
+
+        transaction.on_commit(_invalidate_local)
+    return version
+
+
+class VersionedSnapshot:
+    """
+    프로세스당 한 번 로드해서 재사용하는 읽기 전용 스냅샷.
+    loader()는 전체 구조를 새로 만들어 반환해야 함.
+    버전 키가 바뀌면 다음 get() 때 다시 로드.
+    """
+
+    def __init__(self, version_key, loader, check_interval=VERSION_CHECK_INTERVAL_SEC):
+        self.version_key = version_key
+        self.loader = loader
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = 0.0
+        _snapshots.setdefault(version_key, []).append(self)
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is not None and now - self._checked_at < self.check_interval:
+            return self._value
+
+        with self._lock:
+            if self._value is not None and now - self._checked_at < self.check_interval:
+                return self._value
+
+            version = get_version(self.version_key)
+            if self._value is None or version != self._version:
+                self._value = self.loader()
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._version = None
+            self._checked_at = 0.0
@@ -0,0 +1,244 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections
+
+# 프로세스 내 쓰기 버퍼 (write-behind)
+# - add(): 레코드를 메모리 버퍼 + 로컬 spool 파일(NDJSON)에 추가하고 바로 리턴
+# - 개수(flush_size) 또는 시간(flush_interval초) 기준으로 flush_fn(records) 한 번에 호출
+# - spool 파일은 프로세스 실행마다: <name>-<pid>-<run id>.ndjson
+#   (컨테이너 재시작으로 죽은 프로세스와 같은 pid를 받아도 그 파일에 이어 쓰지 않고 replay)
+#   flush 성공 후 비우고, 프로세스가 죽으면 다음 프로세스가 replay (flush 스레드에서, 요청 스레드 X)
+# - 전달 보장은 at-least-once (flush 커밋 직후 죽으면 재적재될 수 있음)
+# - replay가 계속 실패하는 spool 파일은 MAX_REPLAY_ATTEMPTS번 뒤 .failed로 이름을 바꿔서 치워둠
+#   (다른 파일 / 새 레코드 flush를 막지 않게, 원인 확인 후 .failed 떼면 다시 replay)
+
+MAX_REPLAY_ATTEMPTS = 5
+FAILED_SUFFIX = ".failed"
+
+_buffers = []
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class WriteBehindBuffer:
+    def __init__(self, name, flush_fn, flush_size=200, flush_interval=2.0, spool_dir=None, enabled=True):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.spool_dir = Path(spool_dir or settings.EVENT_SPOOL_DIR)
+
+        self._lock = threading.Lock()        # 버퍼/spool 파일 보호
+        self._flush_lock = threading.Lock()  # flush는 한 번에 하나씩
+        self._records = []
+        self._spool = None
+        self._pid = None
+        self._run_id = None
+        self._timer = None
+        self._retry = False
+        self._replay_failures = {}  # spool 경로 -> 연속 replay 실패 수
+        _buffers.append(self)
+
+    # ---------- 쓰기 ----------
+
+    def add(self, records):
+        records = list(records)
+        if not records:
+            return
+        if not self.enabled:
+            # 버퍼 끔: 바로 적재 (테스트/관리 명령어용)
+            self.flush_fn(records)
+            return
+
+        self._ensure_started()
+        with self._lock:
+            lines = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+            self._spool.write(lines)
+            self._spool.flush()
+            self._records.extend(records)
+            full = len(self._records) >= self.flush_size
+
+        if full:
+            try:
+                self.flush()
+            except Exception as e:  # spool에 남아 있으므로 타이머가 재시도
+                print(f"[write-behind:{self.name}] flush failed: {e}")
+
+    def requeue(self, records):
+        """
+        flush_fn 안에서 아직 적재할 수 없는 레코드를 다음 flush로 미룸.
+        (add()와 달리 flush를 부르지 않음 → flush lock 재진입 없음, spool에도 다시 씀)
+        """
+        records = list(records)
+        if not records:
+            return
+        self._ensure_started()
+        with self._lock:
+            self._spool.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+            self._spool.flush()
+            self._records.extend(records)
+
+    def flush(self):
+        """버퍼 비우기. return: 적재 시도한 레코드 수"""
+        with self._flush_lock:
+            with self._lock:
+                records, self._records = self._records, []
+                if not records:
+                    return 0
+                # 적재 중 들어오는 레코드는 새 spool로
+                flushing = self._rotate_spool()
+
+            try:
+                self.flush_fn(records)
+            except Exception:
+                self._retry = True  # .flushing 파일은 남겨두고 다음 주기에 replay
+                raise
+            flushing.unlink(missing_ok=True)
+            return len(records)
+
+    # ---------- spool / 타이머 ----------
+
+    def _spool_path(self, suffix=""):
+        return self.spool_dir / f"{self.name}-{os.getpid()}-{self._run_id}.ndjson{suffix}"
+
+    def _open_spool(self):
+        if self._pid != os.getpid():
+            self._run_id = uuid.uuid4().hex[:12]
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._spool = open(self._spool_path(), "a", encoding="utf-8")
+        self._pid = os.getpid()
+
+    def _rotate_spool(self):
+        """현재 spool을 .flushing-<ts>로 옮기고 새 파일 열기 (lock 안에서 호출)"""
+        self._spool.close()
+        flushing = self._spool_path(f".flushing-{time.time_ns()}")
+        os.replace(self._spool_path(), flushing)
+        self._open_spool()
+        return flushing
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._timer is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork 이후면 부모 버퍼/파일은 버림 (부모가 처리)
+                self._records = []
+                self._timer = None
+                self._open_spool()
+            if self._timer is None:
+                self._timer = threading.Thread(
+                    target=self._run_timer, name=f"write-behind-{self.name}", daemon=True
+                )
+                self._timer.start()
+
+    def _replay_safely(self):
+        try:
+            self.replay_orphans()
+        except Exception as e:  # replay가 실패해도 새 레코드 flush는 진행
+            self._retry = True
+            print(f"[write-behind:{self.name}] replay failed: {e}")
+
+    def _run_timer(self):
+        # 시작할 때 한 번 replay (첫 add()를 부른 요청 스레드가 아니라 여기서)
+        close_old_connections()
+        self._replay_safely()
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            if self._retry:
+                self._retry = False
+                self._replay_safely()
+            try:
+                self.flush()
+            except Exception as e:  # 다음 주기에 spool replay로 재시도
+                self._retry = True
+                print(f"[write-behind:{self.name}] flush failed: {e}")
+
+    def replay_orphans(self):
+        """
+        죽은 프로세스(또는 같은 pid를 쓰던 이전 실행)가 남긴 spool(.ndjson, .flushing-*) 재적재.
+        파일 하나가 실패해도 나머지는 계속 (실패한 파일은 다음 주기에 재시도).
+        return: 재적재한 레코드 수
+        """
+        if not self.spool_dir.exists():
+            return 0
+        with self._flush_lock:
+            return self._replay_orphans()
+
+    def _replay_orphans(self):
+        replayed = 0
+        for path in sorted(self.spool_dir.glob(f"{self.name}-*.ndjson*")):
+            if path.name.endswith(FAILED_SUFFIX):
+                continue
+            # <pid>-<run id> (run id가 없는 예전 형식 <pid>도 처리)
+            owner = path.name[len(self.name) + 1:].split(".", 1)[0]
+            try:
+                pid = int(owner.partition("-")[0])
+            except ValueError:
+                continue
+            if pid == os.getpid() and self._spool is not None and path == self._spool_path():
+                continue  # 지금 쓰고 있는 파일
+            if pid != os.getpid() and _pid_alive(pid):
+                continue  # 다른 살아있는 프로세스 것
+
+            try:
+                replayed += self._replay_file(path)
+            except Exception as e:
+                self._retry = True
+                failures = self._replay_failures.get(path, 0) + 1
+                if failures < MAX_REPLAY_ATTEMPTS:
+                    self._replay_failures[path] = failures
+                    print(f"[write-behind:{self.name}] replay {path.name} failed ({failures}): {e}")
+                    continue
+                self._replay_failures.pop(path, None)
+                os.replace(path, path.with_name(path.name + FAILED_SUFFIX))
+                print(f"[write-behind:{self.name}] replay {path.name} gave up after {failures} tries: {e}")
+                continue
+            self._replay_failures.pop(path, None)
+        return replayed
+
+    def _replay_file(self, path):
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # 쓰다 끊긴 마지막 줄
+        if records:
+            self.flush_fn(records)
+        path.unlink(missing_ok=True)
+        return len(records)
+
+
+def flush_all():
+    for buf in _buffers:
+        if buf.enabled and buf._pid == os.getpid():
+            try:
+                buf.flush()
+            except Exception as e:  # spool에 남아 있으므로 다음 실행 때 replay
+                print(f"[write-behind:{buf.name}] flush at exit failed: {e}")
+
+
+atexit.register(flush_all)
@@ -0,0 +1,48 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CanonicalIngredient, IngredientSynonym, Recipe
+
+_state = threading.local()
+
+
+@contextmanager
+def graph_bulk_edit():
+    """
+    대량 수정 동안 행마다 버전을 올리지 않고, 끝나고 한 번만 올림.
+    (명령어에서 표준 재료를 여러 개 지울 때 등)
+    """
+    from .services.ingredient_graph import bump_ingredient_graph_version
+
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = False
+    bump_ingredient_graph_version()
+
+
+@receiver(post_save, sender=CanonicalIngredient)
+@receiver(post_delete, sender=CanonicalIngredient)
+@receiver(post_save, sender=IngredientSynonym)
+@receiver(post_delete, sender=IngredientSynonym)
+def on_ingredient_graph_changed(sender, instance, **kwargs):
+    # 관리자에서 동의어/상하위 관계를 고치면 모든 프로세스의 그래프 재로드
+    from .services.ingredient_graph import bump_ingredient_graph_version
+
+    if kwargs.get("raw") or getattr(_state, "suppressed", False):
+        return  # loaddata / graph_bulk_edit
+    if sender is CanonicalIngredient and kwargs.get("created") and instance.parent_id is None:
+        return  # 적재 중 새로 생긴 단독 노드는 canonical_id_for가 스냅샷에 직접 추가
+    bump_ingredient_graph_version()
+
+
+@receiver(post_delete, sender=Recipe)
+def on_recipe_deleted(sender, instance, **kwargs):
+    # 레시피 id 집합 스냅샷 갱신 (추가는 existing_recipe_ids가 DB 확인으로 처리)
+    from .services.catalog import bump_catalog_version
+
+    bump_catalog_version()
@@ -1,3 +1,814 @@
-from django.test import TestCase
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.external.http import CircuitBreaker, CircuitOpenError, HttpClient, UpstreamError
+from app.models import (
+    AppSetting,
+    CanonicalIngredient,
+    ExpiryDigest,
+    Ingredient,
+    Recipe,
+    RecipeAction,
+    RecipeExposure,
+    RecipeIngredient,
+    RecipeRelated,
+    RecommendationImpression,
+    User,
+    UserPantry,
+    UserProfile,
+    UserRecipeAffinity,
+)
+from app.serializers import UserProfileSerializer
+from app.services.actions import ATTRIBUTION_WAIT, _flush_actions, action_buffer
+from app.services.affinity import HALF_LIFE_DAYS, _fold, apply_actions, decayed
+from app.services.catalog import RequirementIndex, bump_catalog_version
+from app.services.conversion import ROLLUP_THROUGH_KEY
+from app.services.dietary import ALLERGENS, ANIMAL, HIGH_SODIUM, exclusion_mask, ingredient_flags
+from app.services.digest import build_digests
+from app.services.diversity import jaccard, mmr_rerank
+from app.services.foodsafety_sync import SYNC_NEXT_START_KEY, SyncError, fetch_page, sync_catalog
+from app.services.ingredient_graph import canonical_id_for, canonical_ids_for, get_ingredient_graph
+from app.services.ingredient_parser import ParsedIngredient, parse_ingredient_item, parse_parts_dtls
+from app.services.planner import _evaluate, _greedy, _local_search, _Pantry, plan_meals
+from app.services.related import build_related
+from app.services.retention import compact_table, retention_cutoff
+from app.services.scoring import (
+    DEFAULT_WEIGHTS,
+    SPLIT_KEY,
+    _config_snapshot,
+    _load_config,
+    scoring_profile_for,
+    user_bucket,
+)
+from app.services.seed_foodsafety import seed_from_foodsafety_rows
+from app.services.unlock import _unlocks, missing_counts
+from app.services.write_behind import MAX_REPLAY_ATTEMPTS, WriteBehindBuffer
+
+
+class IngredientParserTests(SimpleTestCase):
+    def test_name_starting_with_digit(self):
+        self.assertEqual(
+            parse_ingredient_item("2%우유 200ml"),
+            ParsedIngredient("2%우유", "200ml", False),
+        )
+
+    def test_amount_only_item_is_dropped(self):
+        self.assertIsNone(parse_ingredient_item("200ml"))
+
+    def test_section_word_prefix(self):
+        self.assertEqual(
+            parse_parts_dtls("재료 방울토마토 5개, 양파 1/2개"),
+            [ParsedIngredient("방울토마토", "5개", False), ParsedIngredient("양파", "1/2개", False)],
+        )
+
+    def test_section_word_with_amount_is_an_ingredient(self):
+        self.assertEqual(parse_parts_dtls("육수 500ml"), [ParsedIngredient("육수", "500ml", False)])
+        self.assertEqual(
+            parse_parts_dtls("닭고기 200g, 육수 500ml\n소스 약간"),
+            [
+                ParsedIngredient("닭고기", "200g", False),
+                ParsedIngredient("육수", "500ml", False),
+                ParsedIngredient("소스", "약간", False),
+            ],
+        )
+
+    def test_bracket_section_prefix(self):
+        self.assertEqual(parse_parts_dtls("[양념] 간장"), [ParsedIngredient("간장", "", False)])
+
+    def test_optional_bracket_section_applies_to_following_lines(self):
+        self.assertEqual(
+            parse_parts_dtls("[고명] 김가루 약간\n통깨 1작은술"),
+            [ParsedIngredient("김가루", "약간", True), ParsedIngredient("통깨", "1작은술", True)],
+        )
+
+    def test_colon_section_and_header_only_line(self):
+        self.assertEqual(
+            parse_parts_dtls("주재료 : 닭가슴살 100g\n양념장\n고추장 1큰술"),
+            [ParsedIngredient("닭가슴살", "100g", False), ParsedIngredient("고추장", "1큰술", False)],
+        )
+
+
+class BuildRelatedIncrementalTests(TestCase):
+    """증분 build_related 결과 == --full 결과 (IDF가 그대로인 변경만: 선택 여부 토글, 재료 맞바꾸기, 비공개 전환)"""
+
+    K = 3
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.ingredients = []
+        for i in range(10):
+            canonical = CanonicalIngredient.objects.create(name_ko=f"재료{i}")
+            self.ingredients.append(Ingredient.objects.create(name_ko=f"재료{i}", canonical=canonical))
+        self.recipes = []
+        for i in range(16):
+            recipe = Recipe.objects.create(title=f"레시피{i}")
+            for ing in rng.sample(self.ingredients, rng.randint(2, 5)):
+                RecipeIngredient.objects.create(recipe=recipe, ingredient=ing, is_optional=rng.random() < 0.3)
+            self.recipes.append(recipe)
+        build_related(full=True, k=self.K, log=lambda *a: None)
+
+    def _lists(self):
+        return {
+            rid: (ids, scores)
+            for rid, ids, scores in RecipeRelated.objects.order_by("recipe_id").values_list(
+                "recipe_id", "neighbor_ids", "scores"
+            )
+        }
+
+    def _swap_ingredient(self):
+        """재료 x가 있고 y가 없는 레시피 a, 반대인 레시피 b → a는 y, b는 x로 (재료별 레시피 수 그대로)"""
+        have = {r.id: set(r.recipe_ingredients.values_list("ingredient_id", flat=True)) for r in self.recipes}
+        for x in self.ingredients:
+            for y in self.ingredients:
+                a = next((rid for rid, s in have.items() if x.id in s and y.id not in s), None)
+                b = next((rid for rid, s in have.items() if y.id in s and x.id not in s and rid != a), None)
+                if x != y and a and b:
+                    RecipeIngredient.objects.filter(recipe_id=a, ingredient=x).update(ingredient=y)
+                    RecipeIngredient.objects.filter(recipe_id=b, ingredient=y).update(ingredient=x)
+                    return [a, b]
+        self.fail("no swappable ingredient pair")
+
+    def test_incremental_matches_full(self):
+        changed = self._swap_ingredient()
+
+        ri = RecipeIngredient.objects.filter(recipe=self.recipes[3]).first()
+        ri.is_optional = not ri.is_optional
+        ri.save()
+        changed.append(self.recipes[3].id)
+
+        Recipe.objects.filter(id=self.recipes[5].id).update(is_public=False)
+        changed.append(self.recipes[5].id)
+
+        Recipe.objects.filter(id__in=changed).update(related_dirty=True)
+        recomputed, _ = build_related(k=self.K, log=lambda *a: None)
+        self.assertEqual(recomputed, len(set(changed)))
+        incremental = self._lists()
+
+        build_related(full=True, k=self.K, log=lambda *a: None)
+        self.assertEqual(incremental, self._lists())
+
+    def test_nothing_dirty_is_noop(self):
+        self.assertEqual(build_related(k=self.K, log=lambda *a: None), (0, 0))
+
+
+class WriteBehindReplayTests(SimpleTestCase):
+    DEAD_PID = 999999991
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.flushed = []
+
+    def _buffer(self, fail_on=None):
+        def flush_fn(records):
+            if fail_on and any(r.get(fail_on) for r in records):
+                raise RuntimeError("flush failed")
+            self.flushed.extend(records)
+
+        return WriteBehindBuffer("t", flush_fn, spool_dir=self.dir)
+
+    def _spool(self, name, records, tail=""):
+        path = self.dir / name
+        path.write_text("".join(json.dumps(r) + "\n" for r in records) + tail, encoding="utf-8")
+        return path
+
+    def test_replays_dead_process_spools(self):
+        spool = self._spool(f"t-{self.DEAD_PID}.ndjson", [{"n": 1}], tail='{"n": ')
+        flushing = self._spool(f"t-{self.DEAD_PID}.ndjson.flushing-1", [{"n": 2}])
+        self.assertEqual(self._buffer().replay_orphans(), 2)
+        self.assertEqual(self.flushed, [{"n": 1}, {"n": 2}])
+        self.assertFalse(spool.exists() or flushing.exists())
+
+    def test_skips_own_live_spool_and_other_buffers(self):
+        buf = self._buffer()
+        buf._open_spool()
+        self.addCleanup(buf._spool.close)
+        buf._spool.write(json.dumps({"n": 1}) + "\n")
+        buf._spool.flush()
+        other = self._spool(f"other-{self.DEAD_PID}.ndjson", [{"n": 2}])
+        self.assertEqual(buf.replay_orphans(), 0)
+        self.assertTrue(buf._spool_path().exists() and other.exists())
+
+    def test_replays_previous_run_with_same_pid(self):
+        # 컨테이너 재시작으로 죽은 프로세스와 같은 pid를 받은 경우 (예전 형식 파일 포함)
+        old_run = self._spool(f"t-{os.getpid()}-0123456789ab.ndjson", [{"n": 1}])
+        legacy = self._spool(f"t-{os.getpid()}.ndjson", [{"n": 2}])
+        buf = self._buffer()
+        buf._open_spool()
+        self.addCleanup(buf._spool.close)
+        self.assertNotEqual(buf._spool_path(), old_run)
+        self.assertEqual(buf.replay_orphans(), 2)
+        self.assertEqual(sorted(r["n"] for r in self.flushed), [1, 2])
+        self.assertFalse(old_run.exists() or legacy.exists())
+
+    def test_failing_file_does_not_block_others(self):
+        bad = self._spool(f"t-{self.DEAD_PID}.ndjson", [{"bad": True}])
+        self._spool(f"t-{self.DEAD_PID + 1}.ndjson", [{"n": 1}])
+        buf = self._buffer(fail_on="bad")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(buf.replay_orphans(), 1)
+            self.assertEqual(self.flushed, [{"n": 1}])
+            self.assertTrue(bad.exists())
+            for _ in range(MAX_REPLAY_ATTEMPTS - 1):
+                buf.replay_orphans()
+        self.assertFalse(bad.exists())
+        self.assertTrue(bad.with_name(bad.name + ".failed").exists())
+        self.assertEqual(buf.replay_orphans(), 0)
+
+
+class UnlockTests(SimpleTestCase):
+    def setUp(self):
+        # 키 1 = 돼지고기(상위), 2 = 삼겹살(하위), 3 = 양파, 음수 = 사전에 없는 재료
+        self.index = RequirementIndex(
+            {100: (1, 3), 101: (2, 3, -5), 102: (3,), 103: (1, 2, -5, -6), 104: (3, 3)},
+            names={},
+        )
+        self.graph = SimpleNamespace(cover_of=lambda cid: {2: frozenset({1, 2})}.get(cid, frozenset({cid})))
+
+    def test_missing_counts(self):
+        self.assertEqual(missing_counts(self.index, {3}, max_missing=2), {100: 1, 101: 2})
+        self.assertEqual(missing_counts(self.index, {3}, max_missing=4), {100: 1, 101: 2, 103: 4})
+
+    def test_fully_covered_recipes_are_excluded(self):
+        self.assertNotIn(102, missing_counts(self.index, {3}, max_missing=3))
+        self.assertNotIn(104, missing_counts(self.index, {3}, max_missing=3))
+
+    def test_unlocks_child_covers_parent(self):
+        self.assertEqual(_unlocks([1, 2, -5], self.graph), {1: 1, 2: 2, -5: 1})
+
+    def test_unlocks_unresolved_key_covers_only_itself(self):
+        self.assertEqual(_unlocks([-5, -6], self.graph), {-5: 1, -6: 1})
+
+
+class MmrRerankTests(SimpleTestCase):
+    def setUp(self):
+        self.items = [{"recipe_id": rid, "score": score} for rid, score in [(1, 1.0), (2, 0.95), (3, 0.7)]]
+        # 1과 2는 재료가 같고 3은 전혀 다름
+        self.bitsets = {1: 0b0011, 2: 0b0011, 3: 0b1100}
+
+    def _ids(self, picked):
+        return [item["recipe_id"] for item, _, _ in picked]
+
+    def test_lambda_one_keeps_score_order(self):
+        picked = mmr_rerank(self.items, self.bitsets, k=3, lam=1.0)
+        self.assertEqual(self._ids(picked), [1, 2, 3])
+        self.assertTrue(all(adj == 0 for _, adj, _ in picked))
+
+    def test_similar_item_is_demoted(self):
+        picked = mmr_rerank(self.items, self.bitsets, k=3, lam=0.5)
+        self.assertEqual(self._ids(picked), [1, 3, 2])
+        item, adjustment, sim = picked[2]
+        self.assertEqual(sim, 1.0)
+        self.assertAlmostEqual(adjustment, -0.5)
+
+    def test_k_and_missing_bitsets(self):
+        picked = mmr_rerank(self.items, {}, k=2, lam=0.5)
+        self.assertEqual(self._ids(picked), [1, 2])
+        self.assertEqual(jaccard(0, 0), 0.0)
+
+
+class ScoringProfileTests(TestCase):
+    def setUp(self):
+        _config_snapshot.invalidate()
+        self.addCleanup(_config_snapshot.invalidate)
+
+    def _split(self, text):
+        AppSetting.objects.update_or_create(key=SPLIT_KEY, defaults={"value": text})
+
+    def test_default_only(self):
+        config = _load_config()
+        self.assertEqual(config.buckets, [(100, config.profiles["default"])])
+        self.assertEqual(config.profiles["default"].w, DEFAULT_WEIGHTS)
+
+    def test_split_is_percent_with_default_remainder(self):
+        self._split("b:10")
+        config = _load_config()
+        self.assertEqual([(upper, p.id) for upper, p in config.buckets], [(10, "b"), (100, "default")])
+        # 덮어쓰기 없이 비율에만 있는 프로필은 기본 가중치
+        self.assertEqual(config.profiles["b"].w, DEFAULT_WEIGHTS)
+
+    def test_weight_override(self):
+        self._split("default:50,b:50")
+        AppSetting.objects.create(key="scoring:b:coverage", value="0.6")
+        config = _load_config()
+        self.assertEqual(config.profiles["b"].w.coverage, 0.6)
+        self.assertEqual([(upper, p.id) for upper, p in config.buckets], [(50, "default"), (100, "b")])
+
+    def test_split_over_100_is_ignored(self):
+        self._split("b:60,c:50")
+        with contextlib.redirect_stdout(io.StringIO()):
+            config = _load_config()
+        self.assertEqual([(upper, p.id) for upper, p in config.buckets], [(100, "default")])
+
+    def test_scoring_profile_for_follows_user_bucket(self):
+        self._split("b:30")
+        for user_id in range(200):
+            expected = "b" if user_bucket(user_id) < 30 else "default"
+            self.assertEqual(scoring_profile_for(user_id).id, expected)
+
+
+class CanonicalSnapshotTests(TestCase):
+    """새 표준 재료는 트랜잭션이 커밋된 뒤에만 프로세스 스냅샷에 들어감"""
+
+    def test_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cid = canonical_id_for("용과")
+            self.assertIsNone(get_ingredient_graph().resolve("용과"))
+        self.assertEqual(get_ingredient_graph().resolve("용과"), cid)
+
+    def test_rolled_back_node_is_not_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                ids = canonical_ids_for(["두리안", "람부탄"])
+                self.assertEqual(len(set(ids.values())), 2)
+                raise RuntimeError("rollback")
+        graph = get_ingredient_graph()
+        self.assertIsNone(graph.resolve("두리안"))
+        self.assertIsNone(graph.resolve("람부탄"))
+        self.assertFalse(CanonicalIngredient.objects.filter(name_ko__in=["두리안", "람부탄"]).exists())
+
+
+class AffinityDecayTests(SimpleTestCase):
+    t0 = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    def _row(self, engaged, updated_at):
+        return SimpleNamespace(user_id=1, recipe_id=10, engaged=engaged, skipped=0.0, updated_at=updated_at)
+
+    def _fold(self, row, evs):
+        _fold([row], {(1, 10): evs}, ["engaged", "skipped"], key_of=lambda r: (r.user_id, r.recipe_id))
+        return row
+
+    def test_half_life(self):
+        self.assertAlmostEqual(decayed(1.0, self.t0, self.t0 + timedelta(days=HALF_LIFE_DAYS)), 0.5)
+        self.assertAlmostEqual(decayed(1.0, self.t0, self.t0 + timedelta(days=2 * HALF_LIFE_DAYS)), 0.25)
+
+    def test_no_decay_backwards(self):
+        self.assertEqual(decayed(0.8, self.t0, self.t0 - timedelta(days=1)), 0.8)
+
+    def test_fold_new_event_decays_stored_value(self):
+        later = self.t0 + timedelta(days=HALF_LIFE_DAYS)
+        row = self._fold(self._row(1.0, self.t0), [(later, "engaged", 1.0)])
+        self.assertAlmostEqual(row.engaged, 1.5)
+        self.assertEqual(row.updated_at, later)
+
+    def test_fold_late_event_keeps_reference_time(self):
+        later = self.t0 + timedelta(days=HALF_LIFE_DAYS)
+        row = self._fold(self._row(1.0, later), [(self.t0, "engaged", 1.0)])
+        self.assertAlmostEqual(row.engaged, 1.5)
+        self.assertEqual(row.updated_at, later)
+
+    def test_fold_order_independent(self):
+        evs = [(self.t0 + timedelta(days=d), f, 1.0) for d, f in [(3, "engaged"), (1, "skipped"), (9, "engaged")]]
+        at_once = self._fold(self._row(0.0, self.t0), evs)
+        one_by_one = self._row(0.0, self.t0)
+        for ev in reversed(evs):
+            self._fold(one_by_one, [ev])
+        self.assertAlmostEqual(at_once.engaged, one_by_one.engaged)
+        self.assertAlmostEqual(at_once.skipped, one_by_one.skipped)
+        self.assertEqual(at_once.updated_at, one_by_one.updated_at)
+
+
+class AffinityUpsertTests(TestCase):
+    def setUp(self):
+        self.u1, self.u2 = User.objects.create(), User.objects.create()
+        self.r1, self.r2 = Recipe.objects.create(title="a"), Recipe.objects.create(title="b")
+        self.t0 = timezone.now() - timedelta(days=HALF_LIFE_DAYS)
+
+    def _action(self, user, recipe, action, at):
+        return RecipeAction(user_id=user.id, recipe_id=recipe.id, action=action, created_at=at)
+
+    def test_only_exact_pairs_are_rewritten(self):
+        # (u1, r2)는 이벤트가 없음 → user_id × recipe_id 교차 조합이라도 건드리지 않음
+        untouched = UserRecipeAffinity.objects.create(user=self.u1, recipe=self.r2, engaged=1.0, updated_at=self.t0)
+        apply_actions([self._action(self.u1, self.r1, "cook", self.t0), self._action(self.u2, self.r2, "skip", self.t0)])
+
+        untouched.refresh_from_db()
+        self.assertEqual((untouched.engaged, untouched.updated_at), (1.0, self.t0))
+        self.assertEqual(UserRecipeAffinity.objects.count(), 3)
+        self.assertFalse(UserRecipeAffinity.objects.filter(user=self.u2, recipe=self.r1).exists())
+
+    def test_flushes_accumulate(self):
+        later = self.t0 + timedelta(days=HALF_LIFE_DAYS)
+        apply_actions([self._action(self.u1, self.r1, "cook", self.t0)])
+        apply_actions([self._action(self.u1, self.r1, "save", later)])
+        row = UserRecipeAffinity.objects.get(user=self.u1, recipe=self.r1)
+        self.assertAlmostEqual(row.engaged, 1.5)
+        self.assertEqual(row.updated_at, later)
+
+
+class ActionAttributionTests(TestCase):
+    def setUp(self):
+        self.user, self.other = User.objects.create(), User.objects.create()
+        self.recipe = Recipe.objects.create(title="a")
+        self.impression_id = "8c0f8d6e-7a4e-4f7a-9d2b-3f1c2a5b6e71"
+        RecommendationImpression.objects.create(user=self.user, recipe=self.recipe, impression_id=self.impression_id)
+
+    def _record(self, action="cook", user=None, impression_id=None, age=timedelta(0)):
+        return {
+            "user_id": (user or self.user).id,
+            "recipe_id": self.recipe.id,
+            "action": action,
+            "created_at": (timezone.now() - age).isoformat(),
+            "impression_id": impression_id or self.impression_id,
+        }
+
+    def _flush(self, records):
+        with mock.patch.object(action_buffer, "enabled", True), mock.patch.object(action_buffer, "requeue") as requeue:
+            _flush_actions(records)
+        return [r for call in requeue.call_args_list for r in call.args[0]]
+
+    def test_first_conversion_per_impression_counted_once(self):
+        self.assertEqual(self._flush([self._record("cook"), self._record("save")]), [])
+        self.assertEqual(RecipeAction.objects.filter(impression_id=self.impression_id).count(), 2)
+        self.assertEqual(RecipeExposure.objects.get(user=self.user, recipe=self.recipe).converted, 1)
+
+    def test_other_users_impression_is_not_attributed(self):
+        self._flush([self._record(user=self.other)])
+        self.assertIsNone(RecipeAction.objects.get().impression_id)
+        self.assertFalse(RecipeExposure.objects.filter(converted__gt=0).exists())
+
+    def test_recent_unknown_impression_is_requeued(self):
+        record = self._record(impression_id="0b7e3c1a-5d2f-4e8b-9a6c-1f4d7e2b8c90")
+        self.assertEqual(self._flush([record, self._record()]), [record])
+        self.assertEqual(RecipeAction.objects.count(), 1)
+
+    def test_unknown_impression_after_wait_is_dropped(self):
+        record = self._record(impression_id="0b7e3c1a-5d2f-4e8b-9a6c-1f4d7e2b8c90", age=ATTRIBUTION_WAIT * 2)
+        self.assertEqual(self._flush([record]), [])
+        self.assertIsNone(RecipeAction.objects.get().impression_id)
+
+
+class SyncCatalogResumeTests(TestCase):
+    def _run(self, fail_at=None, **kwargs):
+        calls = []
+
+        def fetch(start, end, *args):
+            calls.append(start)
+            if start == fail_at:
+                raise SyncError("boom")
+            return [{"RCP_SEQ": str(i)} for i in range(start, end + 1)], 500
+
+        counts = {"created": 0, "updated": 0, "skipped": 0, "unchanged": 0}
+        with (
+            mock.patch("app.services.foodsafety_sync.fetch_page", side_effect=fetch),
+            mock.patch("app.services.foodsafety_sync.seed_from_foodsafety_rows", return_value=counts),
+        ):
+            result = sync_catalog(page_size=100, workers=1, log=lambda *_: None, **kwargs)
+        return result, calls
+
+    def test_failed_page_holds_watermark_and_next_run_resumes_there(self):
+        result, _ = self._run(fail_at=301)
+        self.assertFalse(result["completed"])
+        self.assertEqual(result["resume_from"], 301)
+        self.assertEqual(AppSetting.objects.get(key=SYNC_NEXT_START_KEY).value, "301")
+
+        result, calls = self._run()
+        self.assertEqual(calls[0], 301)
+        self.assertNotIn(1, calls)
+        self.assertTrue(result["completed"])
+        self.assertEqual(AppSetting.objects.get(key=SYNC_NEXT_START_KEY).value, "1")
+
+    def test_restart_ignores_watermark(self):
+        AppSetting.objects.create(key=SYNC_NEXT_START_KEY, value="301")
+        _, calls = self._run(resume=False)
+        self.assertEqual(calls[0], 1)
+
+    @override_settings(FOODS_API_KEY="")
+    def test_missing_api_key_is_a_sync_error(self):
+        with self.assertRaises(SyncError):
+            fetch_page(1, 10)
+
+
+class ExposureRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create()
+        self.recipe = Recipe.objects.create(title="a")
+        self.today = timezone.localdate()
+        for age in (200, 100, 20):
+            RecipeExposure.objects.create(user=self.user, recipe=self.recipe, day=self.today - timedelta(days=age))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive_dir = tmp.name
+
+    def _compact(self):
+        moved, _ = compact_table("recipe_exposures", retention_cutoff(90), archive_dir=self.archive_dir, log=lambda *_: None)
+        return moved
+
+    def test_kept_until_rollup_has_run(self):
+        self.assertEqual(self._compact(), 0)
+        self.assertEqual(RecipeExposure.objects.count(), 3)
+
+    def test_only_rolled_up_days_past_retention_are_archived(self):
+        AppSetting.objects.create(key=ROLLUP_THROUGH_KEY, value=(self.today - timedelta(days=150)).isoformat())
+        self.assertEqual(self._compact(), 1)  # 100일 전은 보관 기간은 지났지만 아직 다시 집계될 수 있음
+
+        AppSetting.objects.filter(key=ROLLUP_THROUGH_KEY).update(value=self.today.isoformat())
+        self.assertEqual(self._compact(), 1)
+        self.assertEqual(list(RecipeExposure.objects.values_list("day", flat=True)), [self.today - timedelta(days=20)])
+
+
+class SeedFoodsafetyTests(TestCase):
+    def _row(self, seq, **extra):
+        return {
+            "RCP_SEQ": seq,
+            "RCP_NM": f"레시피{seq}",
+            "RCP_PARTS_DTLS": "두부 1모, 대파 1대",
+            "MANUAL01": "두부를 자른다.",
+            "RCP_COOK_TIME": "10",
+            **extra,
+        }
+
+    def _seed(self, rows):
+        result = seed_from_foodsafety_rows(rows, limit=len(rows), batch_size=2)
+        return {k: result[k] for k in ("created", "updated", "skipped", "unchanged")}
+
+    def test_first_seed_creates_and_skips_invalid_rows(self):
+        counts = self._seed([self._row("1"), self._row("2"), {"RCP_SEQ": "3"}, self._row("1")])
+        # 다음 배치의 중복 RCP_SEQ는 이미 적재된 해시와 같으므로 unchanged
+        self.assertEqual(counts, {"created": 2, "updated": 0, "skipped": 2, "unchanged": 1})
+        recipe = Recipe.objects.get(external_id="1")
+        self.assertEqual(recipe.recipe_ingredients.count(), 2)
+        self.assertEqual(recipe.steps.count(), 1)
+
+    def test_same_rows_are_unchanged(self):
+        self._seed([self._row("1"), self._row("2")])
+        counts = self._seed([self._row("1"), self._row("2")])
+        self.assertEqual(counts, {"created": 0, "updated": 0, "skipped": 2, "unchanged": 2})
+
+    def test_changed_row_fills_only_empty_fields(self):
+        self._seed([self._row("1")])
+        counts = self._seed([self._row("1", ATT_FILE_NO_MAIN="http://img/1.jpg", RCP_PARTS_DTLS="소금 약간")])
+        self.assertEqual(counts, {"created": 0, "updated": 1, "skipped": 0, "unchanged": 0})
+        recipe = Recipe.objects.get(external_id="1")
+        self.assertEqual(recipe.image_url, "http://img/1.jpg")
+        self.assertEqual(recipe.raw_ingredients, "두부 1모, 대파 1대")  # 기존 값 보존
+        self.assertEqual(recipe.recipe_ingredients.count(), 2)
+
+    def test_changed_row_without_fillable_fields_only_refreshes_hash(self):
+        self._seed([self._row("1")])
+        counts = self._seed([self._row("1", RCP_COOK_TIME="20")])
+        self.assertEqual(counts, {"created": 0, "updated": 0, "skipped": 1, "unchanged": 0})
+        self.assertEqual(self._seed([self._row("1", RCP_COOK_TIME="20")])["unchanged"], 1)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("app.external.http.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+
+    def _open(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_allows_a_single_probe(self):
+        self._open()
+        self.now += 30
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_failed_probe_reopens(self):
+        self._open()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+
+    def test_released_probe_can_be_retried(self):
+        self._open()
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release_probe()
+        self.assertTrue(self.breaker.allow())
+
+
+class HttpClientRetryTests(SimpleTestCase):
+    def setUp(self):
+        self.client = HttpClient("test", retries=2, backoff=0, failure_threshold=1)
+        self.addCleanup(self.client.session.close)
+
+    def _respond(self, *statuses):
+        responses = [SimpleNamespace(status_code=s) for s in statuses]
+        return mock.patch.object(self.client.session, "request", side_effect=responses)
+
+    def test_idempotent_method_retries_on_5xx(self):
+        with self._respond(503, 502, 200) as request:
+            self.assertEqual(self.client.get("http://upstream/x").status_code, 200)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(self.client.breaker.state, "closed")
+
+    def test_post_is_not_retried(self):
+        with self._respond(503, 200) as request, self.assertRaises(UpstreamError) as ctx:
+            self.client.post("http://upstream/x")
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    def test_4xx_is_returned_without_retry(self):
+        with self._respond(404) as request:
+            self.assertEqual(self.client.get("http://upstream/x").status_code, 404)
+        self.assertEqual(request.call_count, 1)
+
+    def test_open_circuit_fails_fast(self):
+        with self._respond(500, 500, 500), self.assertRaises(UpstreamError):
+            self.client.get("http://upstream/x")
+        with self._respond(200) as request, self.assertRaises(CircuitOpenError):
+            self.client.get("http://upstream/x")
+        request.assert_not_called()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "auth-tests"}},
+    SESSION_ENGINE="django.contrib.sessions.backends.cache",
+)
+class SessionIdentityCacheTests(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.client.post("/api/auth/demo/login/", {"demo_user": "user"}, content_type="application/json")
+        self.user = User.objects.get(toss_user_id="demo_user_1")
+
+    def _user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [q["sql"] for q in ctx.captured_queries if '"app_user' in q["sql"]]
+
+    def test_repeat_requests_resolve_user_from_cache(self):
+        self._user_queries("/api/profile/")
+        response, queries = self._user_queries("/api/profile/")
+        self.assertEqual(queries, [])
+        self.assertEqual(response.data["spice_level"], 0)
+
+    def test_profile_update_invalidates_cached_user(self):
+        self._user_queries("/api/profile/")
+        self.client.put("/api/profile/", {"spice_level": 2}, content_type="application/json")
+        response, _ = self._user_queries("/api/profile/")
+        self.assertEqual(response.data["spice_level"], 2)
+
+    def test_logout_drops_session_mapping(self):
+        self._user_queries("/api/profile/")
+        self.client.post("/api/auth/logout/")
+        self.assertFalse(self.client.get("/api/auth/status/").data["logged_in"])
+        self.assertNotEqual(self.client.get("/api/profile/").wsgi_request.user.id, self.user.id)
+
+
+class AllergyValidationTests(SimpleTestCase):
+    def _validate(self, allergies):
+        serializer = UserProfileSerializer(data={"allergies": allergies}, partial=True)
+        return serializer.is_valid(), serializer
+
+    def test_keys_and_labels_normalize_to_unique_keys(self):
+        ok, serializer = self._validate(["peanut", "땅콩", " Milk ", "조개류"])
+        self.assertTrue(ok, serializer.errors)
+        self.assertEqual(serializer.validated_data["allergies"], ["peanut", "milk", "shellfish"])
+
+    def test_unknown_allergy_is_rejected(self):
+        ok, serializer = self._validate(["peanut", "고수"])
+        self.assertFalse(ok)
+        self.assertIn("고수", str(serializer.errors["allergies"]))
+
+    def test_non_list_is_rejected(self):
+        ok, _ = self._validate("peanut")
+        self.assertFalse(ok)
+
+
+class ExclusionMaskTests(SimpleTestCase):
+    def test_allergies_and_diet_combine(self):
+        profile = SimpleNamespace(allergies=["peanut", "우유", "unknown"], diet_type="VEGAN")
+        self.assertEqual(exclusion_mask(profile), ALLERGENS["peanut"][0] | ALLERGENS["milk"][0] | ANIMAL)
+
+    def test_preference_diet_has_no_hard_filter(self):
+        self.assertEqual(exclusion_mask(SimpleNamespace(allergies=[], diet_type="HIGH_PROTEIN")), 0)
+        self.assertEqual(exclusion_mask(None), 0)
+
+    def test_ingredient_flags(self):
+        self.assertEqual(ingredient_flags("두부"), ALLERGENS["soy"][0])
+        self.assertEqual(ingredient_flags("닭가슴살"), ALLERGENS["chicken"][0] | ANIMAL)
+        self.assertEqual(ingredient_flags("소금"), 0)  # "소"는 정확히 같을 때만
+        self.assertEqual(ingredient_flags("간장") & HIGH_SODIUM, HIGH_SODIUM)
+
+
+class PlannerSearchTests(SimpleTestCase):
+    def setUp(self):
+        # 냉장고 비트 0: 임박 재료 (기한 안에 처음 쓰면 보너스 2.0), 오늘만 살아 있음
+        self.pantry = _Pantry.__new__(_Pantry)
+        self.pantry.bonus_masks = [(2.0, 0b1)]
+        self.alive = [0b1, 0b0, 0b0]
+        self.cands = {1: (0b1, 1.0), 2: (0b1, 1.0), 3: (0b0, 1.5)}
+
+    def test_expiry_bonus_counts_only_first_use(self):
+        self.assertEqual(_evaluate([1, 2], self.cands, [0b1, 0b1], self.pantry, 1), 1.0 + 2.0 + 1.0)
+
+    def test_expiring_recipe_goes_before_its_ingredient_expires(self):
+        plan = _greedy(self.cands, self.alive, self.pantry, 2, 1)
+        self.assertEqual(plan, [1, 3])
+        self.assertEqual(_evaluate([3, 1], self.cands, self.alive, self.pantry, 1), 2.5)  # 다음 날이면 보너스 없음
+
+    def test_local_search_improves_until_done(self):
+        plan, objective, _, timed_out = _local_search([3, 2], self.cands, self.alive, self.pantry, 1, float("inf"))
+        self.assertFalse(timed_out)
+        self.assertEqual(objective, _evaluate([1, 3], self.cands, self.alive, self.pantry, 1))
+        self.assertIn(plan[0], (1, 2))
+
+    def test_deadline_returns_best_so_far(self):
+        plan, objective, rounds, timed_out = _local_search([3, 2], self.cands, self.alive, self.pantry, 1, 0.0)
+        self.assertTrue(timed_out)
+        self.assertEqual((plan, rounds), ([3, 2], 1))
+        self.assertEqual(objective, _evaluate([3, 2], self.cands, self.alive, self.pantry, 1))
+
+
+class PlanMealsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create()
+        UserProfile.objects.create(user=self.user, max_cook_time_min=30)
+        tofu, egg, rice = (Ingredient.objects.create(name_ko=n) for n in ("두부", "계란", "밥"))
+        today = date.today()
+        UserPantry.objects.create(user=self.user, ingredient=tofu, expires_at=today + timedelta(days=1))
+        UserPantry.objects.create(user=self.user, ingredient=egg)
+        UserPantry.objects.create(user=self.user, ingredient=rice)
+        for title, ingredients in (("두부조림", [tofu]), ("두부계란찜", [tofu, egg]), ("계란밥", [egg, rice])):
+            recipe = Recipe.objects.create(title=title, cook_time_min=15)
+            for ing in ingredients:
+                RecipeIngredient.objects.create(recipe=recipe, ingredient=ing)
+        bump_catalog_version()
+
+    def test_expiring_ingredient_used_once_within_its_date(self):
+        result = plan_meals(self.user, days=3)
+        self.assertEqual(len(result["plan"]), 3)
+        uses = [(item["day"], item["uses_expiring"]) for item in result["plan"] if item["uses_expiring"]]
+        self.assertEqual(len(uses), 1)  # 두 번째로 쓰는 레시피는 보너스 없음
+        self.assertLessEqual(uses[0][0], 1)
+        self.assertEqual(result["expiring_unused"], [])
+
+    def test_zero_deadline_still_returns_greedy_plan(self):
+        result = plan_meals(self.user, days=3, deadline_ms=0)
+        self.assertTrue(result["search"]["timed_out"])
+        self.assertEqual(len(result["plan"]), 3)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "digest-tests"}},
+)
+class ExpiryDigestTests(TransactionTestCase):
+    # build_digests는 워커 스레드(별도 DB 연결)에서 읽으므로 커밋된 데이터가 필요
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.today = date.today()
+        self.client.post("/api/auth/demo/login/", {"demo_user": "user"}, content_type="application/json")
+        self.user = User.objects.get(toss_user_id="demo_user_1")
+        self.tofu, self.egg = (Ingredient.objects.create(name_ko=n) for n in ("두부", "계란"))
+        recipe = Recipe.objects.create(title="두부계란찜")
+        RecipeIngredient.objects.create(recipe=recipe, ingredient=self.tofu)
+        RecipeIngredient.objects.create(recipe=recipe, ingredient=self.egg)
+        bump_catalog_version()
+        UserPantry.objects.create(user=self.user, ingredient=self.tofu, expires_at=self.today + timedelta(days=1))
+        UserPantry.objects.create(user=self.user, ingredient=self.egg)
+
+    def test_build_writes_current_users_and_deletes_stale_rows(self):
+        stale = User.objects.create()
+        ExpiryDigest.objects.create(user=stale, day=self.today - timedelta(days=1))
+
+        users, written, deleted = build_digests(workers=2, log=lambda *_: None, today=self.today)
+        self.assertEqual((users, written, deleted), (1, 1, 1))
+        digest = ExpiryDigest.objects.get()
+        self.assertEqual(digest.user_id, self.user.id)
+        self.assertEqual([r["title"] for r in digest.recipes], ["두부계란찜"])
+
+    def test_view_serves_precomputed_until_pantry_changes(self):
+        build_digests(workers=1, log=lambda *_: None, today=self.today)
+        data = self.client.get("/api/digest/expiry/").data
+        self.assertTrue(data["precomputed"])
+        self.assertEqual([i["name"] for i in data["items"]], ["두부"])
+
+        UserPantry.objects.filter(user=self.user, ingredient=self.egg).update(expires_at=self.today)
+        data = self.client.get("/api/digest/expiry/").data
+        self.assertFalse(data["precomputed"])
+        self.assertEqual([i["name"] for i in data["items"]], ["계란", "두부"])
@@ -6,6 +6,7 @@ from .views import (
     PantryItemUpdateView,
     RecipeRecommendationView,
     RecipeActionView,
+    RecipeActionBatchView,
     RecommendationHistoryView,
     RecommendationConversionView,
     RecipeSaveView,
@@ -14,10 +15,16 @@ from .views import (
     ExternalRecipeSearchView,
     ExternalRecipeSeedView,
     AdminStatusView,
+    AdminConversionView,
     UserRecipeListCreateView,
     UserRecipeDestroyView,
     RecipeDetailView,
+    RecipeSimilarView,
+    RecipeRelatedView,
     RecipeSearchView,
+    ShoppingUnlockView,
+    MealPlanView,
+    ExpiryDigestView,
     AdminRecipeDebugView,
     TossLoginView,
     AuthStatusView,
@@ -34,6 +41,7 @@ urlpatterns = [
     path("pantry/<int:item_id>/update/", PantryItemUpdateView.as_view()),
     path("recommendations/recipes/", RecipeRecommendationView.as_view()),
     path("recipes/action/", RecipeActionView.as_view()),
+    path("recipes/actions/batch/", RecipeActionBatchView.as_view()),
     path("recommendations/history/", RecommendationHistoryView.as_view()),
     path("recommendations/conversion/", RecommendationConversionView.as_view()),
     path("recipes/save/", RecipeSaveView.as_view()),
@@ -42,11 +50,17 @@ urlpatterns = [
     path("external/recipes/", ExternalRecipeSearchView.as_view()),
     path("external/recipes/seed/", ExternalRecipeSeedView.as_view()),
     path("admin/status/", AdminStatusView.as_view()),
+    path("admin/conversion/", AdminConversionView.as_view()),
     path("admin/recipe-debug/", AdminRecipeDebugView.as_view()),
     path("recipes/user/", UserRecipeListCreateView.as_view()),
     path("recipes/user/<int:pk>/", UserRecipeDestroyView.as_view()),
     path("recipes/search/", RecipeSearchView.as_view()),
     path("recipes/<int:pk>/", RecipeDetailView.as_view()),
+    path("recipes/<int:pk>/similar/", RecipeSimilarView.as_view()),
+    path("recipes/<int:pk>/related/", RecipeRelatedView.as_view()),
+    path("shopping/unlock/", ShoppingUnlockView.as_view()),
+    path("plans/meals/", MealPlanView.as_view()),
+    path("digest/expiry/", ExpiryDigestView.as_view()),
     # 인증
     path("auth/toss/login/", TossLoginView.as_view()),
     path("auth/demo/login/", DemoLoginView.as_view()),  # 발표용 데모 로그인
@@ -1,8 +1,7 @@
 from datetime import date, timedelta
 from django.utils import timezone
 from math import exp
-from django.db.models import Prefetch, Count
-from django.utils import timezone
+from django.db.models import Count, F, Prefetch, Q
 from .models import (
     User,
     UserProfile,
@@ -10,92 +9,18 @@ from .models import (
     Recipe,
     RecipeIngredient,
     RecipeAction,
-    RecommendationHistory,
     UserSavedRecipe,
 )
+from .services.affinity import MIN_AFFINITY, ingredient_affinity_map, recipe_affinity_map
+from .services.dietary import exclusion_mask
+from .services.diversity import MMR_POOL, ingredient_bitsets, mmr_rerank
+from .services.impressions import exposure_counts_since, recent_impression_recipe_ids
+from .services.neighbors import get_neighbor_index
+from .services.scoring import DEFAULT_WEIGHTS, scoring_profile_for
+from .services.ingredient_graph import get_ingredient_graph, normalize_ingredient  # noqa: F401
 import hashlib
 import json
-import re
-
-# =============================================
-# 재료 표준화: 동의어 사전 + 정규화 함수
-# =============================================
-
-SYNONYM_MAP = {
-    # 계란 계열
-    "달걀": "계란",
-    "전란": "계란",
-    "계란흰자": "계란",
-    "계란노른자": "계란",
-    "달걀흰자": "계란",
-    "달걀노른자": "계란",
-    "흰자": "계란",
-    "노른자": "계란",
-    # 파 계열
-    "대파": "파",
-    "쪽파": "파",
-    "실파": "파",
-    # 설탕 계열
-    "슈가": "설탕",
-    "백설탕": "설탕",
-    "황설탕": "설탕",
-    # 간장 계열
-    "진간장": "간장",
-    "국간장": "간장",
-    "양조간장": "간장",
-    # 고추 계열
-    "청양고추": "고추",
-    "홍고추": "고추",
-    "풋고추": "고추",
-    # 마늘 계열
-    "다진마늘": "마늘",
-    "마늘쫑": "마늘",
-    # 양파 계열
-    "적양파": "양파",
-    # 고기 계열
-    "돼지고기": "돼지",
-    "돼지앞다리": "돼지",
-    "돼지목살": "돼지",
-    "돼지삼겹": "돼지",
-    "삼겹살": "돼지",
-    "소고기": "소",
-    "쇠고기": "소",
-    "닭고기": "닭",
-    "닭가슴살": "닭",
-    "닭다리": "닭",
-}
-
-
-def normalize_ingredient(s: str) -> str:
-    """
-    재료명 정규화:
-    1. 앞뒤 공백 제거 + 소문자
-    2. 괄호 내용 제거: "당근(1/2개)" → "당근"
-    3. 숫자 제거
-    4. 특수문자 제거 (한글/영문만 남기기)
-    5. 공백 제거
-    6. 동의어 사전 적용
-    """
-    if not s:
-        return ""
-
-    text = s.strip().lower()
-
-    # 괄호 내용 제거: (xxx), [xxx]
-    text = re.sub(r'\([^)]*\)', '', text)
-    text = re.sub(r'\[[^\]]*\]', '', text)
-
-    # 숫자 제거
-    text = re.sub(r'\d+', '', text)
-
-    # 한글, 영문만 남기기 (특수문자, 공백 제거)
-    text = re.sub(r'[^가-힣a-zA-Z]', '', text)
-
-    # 동의어 사전 적용
-    if text in SYNONYM_MAP:
-        text = SYNONYM_MAP[text]
-
-    return text
+import time
 
 def get_or_create_test_user():
     """
@@ -132,54 +57,71 @@ def get_current_user(request):
     1. 세션에 user_id가 있으면 해당 유저 반환
     2. demo_user 파라미터/헤더가 있으면 데모 유저 반환
     3. 없으면 로컬 개발용 test_user_1 fallback
+    DRF 뷰에서는 인증 클래스가 이미 결정한 request.user를 그대로 씀.
     """
-    # 1) 세션에서 user_id 확인 (토스 로그인 성공 시 저장됨)
-    user_id = request.session.get("user_id") if hasattr(request, "session") else None
-    if user_id:
-        try:
-            user = User.objects.get(id=user_id)
-            return user
-        except User.DoesNotExist:
-            pass  # 세션에 있지만 DB에 없으면 fallback
-
-    # 2) Django auth 유저 (미래 확장용)
     u = getattr(request, "user", None)
-    if u is not None and getattr(u, "is_authenticated", False):
+    if isinstance(u, User):
         return u
 
-    # 3) demo_user 파라미터 (개발/디버그용)
-    demo = None
-    if request is not None:
-        demo = request.query_params.get("demo_user") or request.headers.get("X-DEMO-USER")
+    from .authentication import resolve_request_user  # 순환 import 방지
+    return resolve_request_user(request)
+
+
+PANTRY_FINGERPRINT_FIELDS = ("ingredient_id", "quantity_text", "expires_at")
+
+
+def fingerprint_rows(pantry_rows):
+    """[{ingredient_id, quantity_text, expires_at}, ...] (ingredient_id 순) → 해시"""
+    return hashlib.md5(json.dumps(pantry_rows, default=str).encode()).hexdigest()
+
+
+def pantry_fingerprint(user_id):
+    """냉장고 상태 해시 (추천 캐시 키에 포함 → 냉장고가 바뀌면 자동으로 새 키)"""
+    from .models import UserPantry  # 순환 import 방지
+
+    pantry_rows = list(
+        UserPantry.objects.filter(user_id=user_id)
+        .values(*PANTRY_FINGERPRINT_FIELDS)
+        .order_by("ingredient_id")
+    )
+    return fingerprint_rows(pantry_rows)
+
+
+def _recommendation_generation_key(user_id):
+    return f"reco:gen:user:{user_id}"
+
+
+def recommendation_cache_generation(user_id):
+    """
+    유저별 추천 캐시 세대 번호 (키에 포함).
+    처음 값은 현재 시각(ms) → 세대 키가 캐시에서 밀려나도 예전 번호와 겹치지 않음
+    """
+    from django.core.cache import cache
+
+    return cache.get_or_set(_recommendation_generation_key(user_id), int(time.time() * 1000), timeout=None)
+
 
-    if demo:
-        return get_demo_user(demo)
+def recommendation_cache_key(user_id, top, fingerprint, variant=""):
+    """variant: 요청 옵션(시간 필터 등) 구분 문자열"""
+    gen = recommendation_cache_generation(user_id)
+    return f"reco:v2:user:{user_id}:gen:{gen}:top:{top}:fp:{fingerprint}:{variant}"
 
-    # 4) Fallback: 로컬 개발용 test_user
-    return get_or_create_test_user()
 
 def invalidate_recommendation_cache(user):
     """
     추천 캐시 무효화:
     추천 API는 pantry fingerprint만으로 캐시 키를 만들기 때문에,
     cook/save/skip 같은 행동 변화는 fingerprint가 안 바뀜.
-    -> 액션 후 캐시 삭제를 해줘야 바로 변화가 보임.
+    -> 액션 후 유저 세대 번호를 올려서 (top/옵션 조합과 상관없이) 예전 키를 전부 무효화.
+    user: User 또는 user id
     """
-    from .models import UserPantry  # 순환 import 방지
-
-    for top in [3, 5, 10, 20]:
-        pantry_rows = list(
-            UserPantry.objects.filter(user=user)
-            .values("ingredient_id", "quantity_text", "expires_at")
-            .order_by("ingredient_id")
-        )
-        fingerprint = hashlib.md5(
-            json.dumps(pantry_rows, default=str).encode()
-        ).hexdigest()
+    from django.core.cache import cache
 
-        cache_key = f"reco:v1:user:{user.id}:top:{top}:fp:{fingerprint}"
-        from django.core.cache import cache
-        cache.delete(cache_key)
+    key = _recommendation_generation_key(getattr(user, "id", user))
+    try:
+        cache.incr(key)
+    except ValueError:  # 세대 키가 없으면 (만료/재시작) 새 번호로 시작
+        cache.set(key, int(time.time() * 1000), timeout=None)
 
 def get_user_pantry_ingredient_ids(user):
     """
@@ -192,197 +134,364 @@ def get_user_pantry_ingredient_ids(user):
     )
 
 
-def get_user_pantry_ingredient_names(user):
+def get_user_pantry_cover(user, graph=None):
     """
-    유저 냉장고 재료 이름들을 정규화해서 set로 반환
-    (부분 매칭용)
+    유저 냉장고 재료를 표준 재료(canonical) 기준으로 펼쳐서 반환.
+    Returns:
+        pantry_ids: set of ingredient_id (원문 재료 ID 그대로 매칭용)
+        cover: dict { canonical_id: {"pantry_name": str, "expires_at": date or None} }
+               - 상위/하위 재료까지 포함 (IngredientGraph 참고)
+               - 같은 canonical을 여러 재료가 채우면 가장 임박한 날짜 사용
     """
-    from .models import Ingredient
-    pantry_ing_ids = UserPantry.objects.filter(user=user).values_list("ingredient_id", flat=True)
-    raw_names = Ingredient.objects.filter(id__in=pantry_ing_ids).values_list("name_ko", flat=True)
-    # 정규화된 이름 set 반환
-    return set(normalize_ingredient(name) for name in raw_names if name)
+    graph = graph or get_ingredient_graph()
+
+    rows = UserPantry.objects.filter(user=user).values_list(
+        "ingredient_id", "ingredient__name_ko", "ingredient__canonical_id", "expires_at"
+    )
+
+    pantry_ids = set()
+    cover = {}
+
+    for ingredient_id, name, cid, exp_date in rows:
+        pantry_ids.add(ingredient_id)
+        if cid is None:
+            cid = graph.resolve(name)
+        if cid is None:
+            continue
 
+        for covered in graph.cover_of(cid):
+            cur = cover.get(covered)
+            if cur is None:
+                cover[covered] = {"pantry_name": name, "expires_at": exp_date}
+            elif exp_date and (cur["expires_at"] is None or cur["expires_at"] > exp_date):
+                cover[covered] = {"pantry_name": name, "expires_at": exp_date}
 
-def get_user_pantry_with_expiry(user):
+    return pantry_ids, cover
+
+
+class ScoringContext:
     """
-    유저 냉장고 재료를 정규화된 이름 + 유통기한으로 반환.
-    Returns:
-        normalized_names: set of normalized ingredient names
-        expiry_map: dict { normalized_name: expires_at (date or None) }
-                    - 같은 재료가 여러 개면 가장 임박한 날짜 사용
+    추천 점수 계산에 필요한 유저 단위 데이터.
+    레시피 루프 전에 한 번만 조회해서 recommend/score_single이 같이 씀.
     """
-    from .models import Ingredient
 
-    pantry_items = UserPantry.objects.filter(user=user).select_related("ingredient")
+    def __init__(self, user, max_time=None, strict_time=None):
+        self.today = date.today()
+        self.graph = get_ingredient_graph()
+
+        self.pantry_ids, self.pantry_cover = get_user_pantry_cover(user, self.graph)
+
+        # 점수 가중치 프로필 (user_id 해시로 A/B 고정)
+        self.scoring = scoring_profile_for(user.id)
+
+        # 유저 프로필
+        profile = getattr(user, "profile", None)
+        self.max_time = max_time or (getattr(profile, "max_cook_time_min", None) if profile else None)
+
+        # 시간 엄격 모드: max_time × time_limit_factor 초과 레시피는 후보에서 제외 (조리 시간 미상은 유지)
+        # strict_time/max_time 인자는 요청 파라미터로 프로필 설정을 덮어쓸 때
+        if strict_time is None:
+            strict_time = bool(getattr(profile, "strict_time_filter", False))
+        factor = getattr(profile, "time_limit_factor", None) or 1.5
+        self.time_cutoff = int(self.max_time * factor) if strict_time and self.max_time else None
+        # 알레르기/식단 하드 필터: (레시피 diet_flags & exclude_mask) != 0 이면 제외
+        self.exclude_mask = exclusion_mask(profile)
+
+        # 행동 로그: 시간 감쇠 선호도 (액션 적재 때 갱신, 반감기 7일)
+        # recipe_id -> (cook/save 점수, skip 점수), canonical id -> 재료 선호도
+        self.recipe_affinity = recipe_affinity_map(user.id)
+        self.ingredient_affinity = ingredient_affinity_map(user.id)
+
+        # 최근 추천 노출(쿨타임): 최근 10번 추천 응답에 나온 레시피
+        self.recent_recommended_ids = recent_impression_recipe_ids(user.id)
+
+        # (A) 레시피별 추천 노출 횟수 (최근 7일, RecipeExposure 집계)
+        self.exposure_counts = exposure_counts_since(user.id, self.today - timedelta(days=7))
+
+        # 같이 만든 레시피 신호: cook/save한 레시피들의 이웃 유사도 합 (mmap 인덱스, DB 쿼리 없음)
+        # recipe_id -> Σ engaged × 유사도
+        self.neighbor_scores = {}
+        index = get_neighbor_index()
+        for rid, (engaged, _) in self.recipe_affinity.items():
+            if engaged < MIN_AFFINITY:
+                continue
+            for nid, sim in index.neighbors(rid):
+                self.neighbor_scores[nid] = self.neighbor_scores.get(nid, 0.0) + engaged * sim
+
+        # (B) 레시피별 전환(cook/save) 발생 여부
+        # cook/save 점수가 반감기 한 번(7일) 이내 수준인 레시피
+        self.converted_ids = {
+            rid for rid, (engaged, _) in self.recipe_affinity.items() if engaged >= 0.5
+        }
 
-    normalized_names = set()
-    expiry_map = {}  # normalized_name -> expires_at (가장 임박한 것)
+        # recipe_id -> 유니크 유저 수
+        pop_cutoff = timezone.now() - timedelta(days=7)
+        self.pop_map = dict(
+            RecipeAction.objects.filter(
+                action__in=["cook", "save"],
+                created_at__gte=pop_cutoff,
+            )
+            .values("recipe_id")
+            .annotate(u=Count("user_id", distinct=True))
+            .values_list("recipe_id", "u")
+        )
 
-    for item in pantry_items:
-        raw_name = item.ingredient.name_ko
-        norm_name = normalize_ingredient(raw_name)
-        if not norm_name:
-            continue
+        self.saved_ids = set(
+            UserSavedRecipe.objects.filter(user=user)
+            .values_list("recipe_id", flat=True)
+        )
 
-        normalized_names.add(norm_name)
+    def canonical_id(self, ingredient):
+        """RecipeIngredient의 재료 → canonical id (미연결 재료는 사전에서 조회)"""
+        if ingredient.canonical_id is not None:
+            return ingredient.canonical_id
+        return self.graph.resolve(ingredient.name_ko)
 
-        exp_date = item.expires_at
-        if exp_date:
-            # 같은 재료가 여러 개면 가장 임박한 날짜 사용
-            if norm_name not in expiry_map or expiry_map[norm_name] is None:
-                expiry_map[norm_name] = exp_date
-            elif expiry_map[norm_name] > exp_date:
-                expiry_map[norm_name] = exp_date
-        else:
-            # expires_at이 None인 경우, 기존 값이 없을 때만 설정
-            if norm_name not in expiry_map:
-                expiry_map[norm_name] = None
 
-    return normalized_names, expiry_map
+def expiry_bucket(days_left, w=DEFAULT_WEIGHTS):
+    """
+    유통기한 남은 일수 → (보너스, 패널티). 추천 점수와 식단 플래너가 같이 씀
+    w: 점수 가중치 프로필 (ScoringWeights)
+    """
+    if days_left <= -1:
+        # 이미 지남 (expired)
+        return 0.0, w.expired
+    if days_left <= 2:
+        # 0~2일 남음: 긴급
+        return w.expiry_urgent, 0.0
+    if days_left <= 7:
+        # 3~7일 남음: 임박
+        return w.expiry_soon, 0.0
+    # 8일 이상: 보너스 없음
+    return 0.0, 0.0
+
+
+def time_fit_score(cook_time, max_time):
+    """조리 시간 적합도 0~1 (예산과 차이가 클수록 낮음, 정보 없으면 0.5)"""
+    if max_time and cook_time is not None and max_time > 0:
+        diff = abs(cook_time - max_time) / max_time
+        return max(0.0, 1.0 - min(diff, 1.0))
+    return 0.5
 
 
-def ingredient_matches_pantry(recipe_ingredient_name, pantry_names):
+def score_recipe(ctx, r):
     """
-    레시피 재료명이 냉장고 재료와 매칭되는지 확인 (정규화 + 부분 매칭)
-    예: 냉장고에 "계란"이 있으면 "달걀 2개", "전란" 등과 매칭
+    레시피 하나의 추천 점수/디버그 계산.
+    필수 재료가 없으면 None.
+    재료 매칭은 canonical id 정확 일치 (부분 문자열 비교 없음)
+    """
+    today = ctx.today
+    w = ctx.scoring.w
 
-    Args:
-        recipe_ingredient_name: 레시피 재료명 (원본)
-        pantry_names: 정규화된 냉장고 재료명 set
+    # 필수 재료만
+    required_items = [
+        ri for ri in r.recipe_ingredients.all()
+        if not ri.is_optional
+    ]
+    required_count = len(required_items)
 
-    Returns:
-        matched_name: 매칭된 pantry 재료명 (정규화된) or None
-    """
-    recipe_norm = normalize_ingredient(recipe_ingredient_name)
-    if not recipe_norm:
+    if required_count == 0:
         return None
 
-    # 1. 정확히 일치
-    if recipe_norm in pantry_names:
-        return recipe_norm
+    # ID 매칭 또는 canonical 매칭 + 유통기한 추적
+    have_count = 0
+    missing_items = []
+    matched_expiry_info = []  # 매칭된 재료 중 유통기한 있는 것들
 
-    # 2. 부분 매칭 (pantry가 recipe에 포함되거나 그 반대)
-    for pantry_name in pantry_names:
-        if pantry_name in recipe_norm or recipe_norm in pantry_name:
-            return pantry_name
+    for ri in required_items:
+        cid = ctx.canonical_id(ri.ingredient)
+        hit = ctx.pantry_cover.get(cid) if cid is not None else None
 
-    return None
+        if ri.ingredient_id in ctx.pantry_ids or hit is not None:
+            have_count += 1
+            # 유통기한 정보 추적 (매칭된 pantry 재료 기준)
+            if hit is not None and hit["expires_at"]:
+                exp_date = hit["expires_at"]
+                matched_expiry_info.append({
+                    "name": ri.ingredient.name_ko,
+                    "pantry_name": hit["pantry_name"],
+                    "expires_at": exp_date,
+                    "days_left": (exp_date - today).days,
+                })
+        else:
+            missing_items.append(ri)
 
+    missing_count = required_count - have_count
+    coverage = have_count / required_count
+    missing_ratio = missing_count / required_count
 
-def recommend_recipes_for_user(user, top=10):
-    """
-    레시피 추천 로직 (MVP v1)
+    # =============================================
+    # 유통기한 기반 보너스/패널티 계산 (세분화)
+    # =============================================
+    bonus_expiry = 0.0
+    penalty_expired = 0.0
+    expiry_min_days = None
 
-    반영 요소:
-    - coverage: 보유 필수 재료 비율
-    - missing_ratio: 부족 재료 비율
-    - expiry_bonus: 유통기한 임박 재료 포함 여부
-    - time_fit: 유저 요리 가능 시간 적합도
-    - diversity: 최근 행동(cook/save/skip)
-    - cooldown: 최근 추천 노출 쿨타임
-    """
+    for info in matched_expiry_info:
+        days_left = info["days_left"]
 
-    today = date.today()
-    top_n = max(1, int(top))
+        # 가장 임박한 날짜 추적
+        if expiry_min_days is None or days_left < expiry_min_days:
+            expiry_min_days = days_left
 
-    pop_cutoff = timezone.now() - timedelta(days=7)
+        bonus, penalty = expiry_bucket(days_left, w)
+        bonus_expiry += bonus
+        penalty_expired += penalty
 
-    # recipe_id -> 유니크 유저 수
-    pop_map = dict(
-        RecipeAction.objects.filter(
-            action__in=["cook", "save"],
-            created_at__gte=pop_cutoff,
-        )
-        .values("recipe_id")
-        .annotate(u=Count("user_id", distinct=True))
-        .values_list("recipe_id", "u")
+    # cap 적용 (기본: 최대 보너스 +0.5, 최대 패널티 -0.5)
+    bonus_expiry = min(bonus_expiry, w.expiry_cap)
+    penalty_expired = min(penalty_expired, w.expired_cap)
+
+    # 시간 적합도
+    cook_time = getattr(r, "cook_time_min", None)
+    time_fit = time_fit_score(cook_time, ctx.max_time)
+
+    # 기본 점수 (유통기한 보너스/패널티 반영)
+    base = w.coverage * coverage - w.missing * missing_ratio + w.time_fit * time_fit
+    score = (
+        base
+        + bonus_expiry           # 유통기한 임박 보너스
+        - penalty_expired        # 유통기한 만료 패널티
     )
 
-    # =====================================
-    # [1] 루프 전에 공통 데이터 준비
-    # =====================================
+    # 다양성 / 피드백 (감쇠 점수 1.0 = 방금 한 액션 → 최대 감점, 시간이 지나면 줄어듦)
+    engaged, skipped = ctx.recipe_affinity.get(r.id, (0.0, 0.0))
+    penalty_cooked_saved = w.recent_cooked_saved * min(engaged, 1.0)
+    penalty_skipped = w.recent_skipped * min(skipped, 1.0)
+    penalty_cooldown = w.cooldown if r.id in ctx.recent_recommended_ids else 0.0
+    score -= penalty_cooked_saved
+    score -= penalty_skipped
+    score -= penalty_cooldown
+
+    # 재료 선호도: 필수 재료 canonical 선호도 평균 (-1~1) → 기본 ±0.05
+    ing_scores = [
+        max(-1.0, min(1.0, ctx.ingredient_affinity[cid]))
+        for cid in (ctx.canonical_id(ri.ingredient) for ri in required_items)
+        if cid in ctx.ingredient_affinity
+    ]
+    ingredient_pref = sum(ing_scores) / required_count if ing_scores else 0.0
+    score += w.ingredient_pref * ingredient_pref
 
-    pantry_ids = get_user_pantry_ingredient_ids(user)
-    # 정규화된 pantry 이름 + 유통기한 맵
-    pantry_names, expiry_map = get_user_pantry_with_expiry(user)
+    # 같이 만든 레시피 보너스 (기본 최대 +0.08)
+    cooccurrence = min(ctx.neighbor_scores.get(r.id, 0.0), 1.0)
+    score += w.cooccurrence * cooccurrence
 
-    # 유저 프로필
-    profile = getattr(user, "profile", None)
-    max_time = getattr(profile, "max_cook_time_min", None) if profile else None
+    # 전환율 피드백 감점/보너스
+    exposure = ctx.exposure_counts.get(r.id, 0)
+    is_converted = (r.id in ctx.converted_ids)
 
-    # 최근 7일 행동 로그
-    recent_cutoff = timezone.now() - timedelta(days=7)
+    penalty_exposure = w.exposure_no_convert if exposure >= 2 and not is_converted else 0.0
+    bonus_converted = w.converted if is_converted else 0.0
+    score += bonus_converted - penalty_exposure
 
-    recent_cooked_saved_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action__in=["save", "cook"],
-            created_at__gte=recent_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
+    missing_names = [ri.ingredient.name_ko for ri in missing_items]
 
-    recent_skipped_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action="skip",
-            created_at__gte=recent_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
+    pop_users = ctx.pop_map.get(r.id, 0)
+    # 너무 세게 먹이면 개인화가 죽음 → 상한을 둔다
+    # 예: 유저 20명 이상이면 더 올라가지 않게 캡
+    pop_cap = max(w.popularity_cap_users, 1.0)
+    pop_norm = min(pop_users, pop_cap) / pop_cap  # 0~1
+    # 가산점은 작게(서비스스럽게)
+    score += w.popularity * pop_norm
 
-    # 최근 추천 노출(쿨타임)
-    recent_recommended_ids = set()
-    for h in RecommendationHistory.objects.filter(user=user).order_by("-created_at")[:10]:
-        for rid in (h.result_recipe_ids or []):
-            recent_recommended_ids.add(rid)
+    debug = {
+        "scoring_profile": ctx.scoring.id,
+        "base": round(base, 4),
+        "penalty_recent_cooked_saved": (-round(penalty_cooked_saved, 4) if penalty_cooked_saved else 0.0),
+        "penalty_recent_skipped": (-round(penalty_skipped, 4) if penalty_skipped else 0.0),
+        "bonus_ingredient_pref": round(w.ingredient_pref * ingredient_pref, 4),
+        "bonus_cooccurrence": round(w.cooccurrence * cooccurrence, 4),
+        "penalty_cooldown": -penalty_cooldown if penalty_cooldown else 0.0,
+        "penalty_exposure_no_convert": -penalty_exposure if penalty_exposure else 0.0,
+        "bonus_converted": bonus_converted,
+        "exposure": exposure,
+        "converted": is_converted,
+        "pop_users": pop_users,
+        # 알레르기/식단에 걸리는 레시피 (추천 목록에서는 이미 제외됨, 단일 디버그 조회용)
+        "diet_blocked": bool(getattr(r, "diet_flags", 0) & ctx.exclude_mask),
+        "pop_bonus": round(w.popularity * pop_norm, 4),
+        # MMR 재정렬로 깎인 값 (정렬에만 쓰고 score에는 반영 안 함, 재정렬 안 하면 0)
+        "diversity_adjustment": 0.0,
+        # 유통기한 관련 debug 정보
+        "bonus_expiry": round(bonus_expiry, 4),
+        "penalty_expired_pantry": round(penalty_expired, 4),
+        "expiry_matched_count": len(matched_expiry_info),
+        "expiry_min_days_left": expiry_min_days,
+    }
 
+    # 추천 이유
+    reasons = []
+    if missing_count == 0:
+        reasons.append("냉장고 재료로 바로 가능")
+    else:
+        reasons.append(f"필수 재료 {have_count}/{required_count}개 보유")
+    if bonus_expiry > 0:
+        reasons.append("유통기한 임박 재료 활용")
+    if penalty_expired > 0:
+        reasons.append("유통기한 지난 재료 포함")
+    if cook_time is not None:
+        reasons.append(f"{cook_time}분 내 조리")
+
+    return {
+        "recipe_id": r.id,
+        "title": getattr(r, "title", ""),
+        "cook_time_min": cook_time,
+        "coverage": round(coverage, 3),
+        "missing_count": missing_count,
+        "missing_ingredients": missing_names,
+        "shopping_list": missing_names,
+        "reasons": reasons,
+        "saved": (r.id in ctx.saved_ids),
+        "score": round(score, 4),
+        "debug": debug,
+    }
+
+
+def _recipes_with_ingredients(exclude_mask=0, time_cutoff=None):
     # 레시피 + 재료 프리페치
-    recipes = Recipe.objects.all().prefetch_related(
+    # exclude_mask: 알레르기/식단 비트가 겹치는 레시피는 DB에서 먼저 제외 (재료 프리페치도 줄어듦)
+    # time_cutoff: 조리 시간 상한 (cook_time_min 인덱스 범위 조회)
+    qs = Recipe.objects.all()
+    if exclude_mask:
+        qs = qs.alias(blocked=F("diet_flags").bitand(exclude_mask)).filter(blocked=0)
+    if time_cutoff is not None:
+        qs = qs.filter(Q(cook_time_min__lte=time_cutoff) | Q(cook_time_min__isnull=True))
+    return qs.prefetch_related(
         Prefetch(
             "recipe_ingredients",
             queryset=RecipeIngredient.objects.select_related("ingredient"),
         )
     )
-    conv_days = 7
-    conv_cutoff = timezone.now() - timedelta(days=7)
-
-    # (A) 레시피별 추천 노출 횟수
-    exposure_counts = {}
-    histories = RecommendationHistory.objects.filter(
-        user=user,
-        created_at__gte=conv_cutoff,
-    ).order_by("-created_at")[:50]
-
-    for h in histories:
-        for rid in (h.result_recipe_ids or []):
-            exposure_counts[rid] = exposure_counts.get(rid, 0) + 1
-
-    # (B) 레시피별 전환(cook/save) 발생 여부
-    converted_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action__in=["cook", "save"],
-            created_at__gte=conv_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
-    recipes = Recipe.objects.all().prefetch_related(
-        Prefetch(
-            "recipe_ingredients",
-            queryset=RecipeIngredient.objects.select_related("ingredient"),
-        )
-    )
-    
-    saved_ids = set(
-        UserSavedRecipe.objects.filter(user=user)
-        .values_list("recipe_id", flat=True)
-    )
+
+
+def recommend_recipes_for_user(user, top=10, max_time=None, strict_time=None, diversity=None):
+    """
+    레시피 추천 로직 (MVP v1)
+
+    반영 요소:
+    - coverage: 보유 필수 재료 비율
+    - missing_ratio: 부족 재료 비율
+    - expiry_bonus: 유통기한 임박 재료 포함 여부
+    - time_fit: 유저 요리 가능 시간 적합도
+    - diversity: 최근 행동(cook/save/skip)
+    - cooldown: 최근 추천 노출 쿨타임
+    - diversity: MMR λ (None이면 settings.RECOMMENDATION_MMR_LAMBDA, 1.0이면 점수 순서 그대로)
+    """
+
+    top_n = max(1, int(top))
+
+    # =====================================
+    # [1] 루프 전에 공통 데이터 준비
+    # =====================================
+
+    ctx = ScoringContext(user, max_time=max_time, strict_time=strict_time)
 
     print("DEBUG_COUNTS:",
-      "cooked_saved=", len(recent_cooked_saved_ids),
-      "skipped=", len(recent_skipped_ids),
-      "converted=", len(converted_ids),
-      "recent_reco=", len(recent_recommended_ids),
-      "histories=", histories.count())
+      "affinity=", len(ctx.recipe_affinity),
+      "ingredient_pref=", len(ctx.ingredient_affinity),
+      "converted=", len(ctx.converted_ids),
+      "recent_reco=", len(ctx.recent_recommended_ids),
+      "exposed=", len(ctx.exposure_counts))
 
     # =====================================
     # [2] 레시피 루프
@@ -390,185 +499,33 @@ def recommend_recipes_for_user(user, top=10):
 
     results = []
 
-    for r in recipes:
+    for r in _recipes_with_ingredients(ctx.exclude_mask, ctx.time_cutoff):
 
-        if r.id in saved_ids:
+        if r.id in ctx.saved_ids:
             continue  # 저장된 레시피는 추천에서 제외
-        
-        # 필수 재료만
-        required_items = [
-            ri for ri in r.recipe_ingredients.all()
-            if not ri.is_optional
-        ]
-        required_count = len(required_items)
-
-        if required_count == 0:
-            continue
-
-        # 부분 매칭: ID 매칭 또는 정규화 이름 매칭 + 유통기한 추적
-        have_count = 0
-        missing_items = []
-        matched_expiry_info = []  # 매칭된 재료 중 유통기한 있는 것들
-
-        for ri in required_items:
-            ing_name = ri.ingredient.name_ko
-            matched_pantry_name = ingredient_matches_pantry(ing_name, pantry_names)
-
-            if ri.ingredient_id in pantry_ids or matched_pantry_name:
-                have_count += 1
-                # 유통기한 정보 추적 (매칭된 pantry 재료 기준)
-                if matched_pantry_name and matched_pantry_name in expiry_map:
-                    exp_date = expiry_map[matched_pantry_name]
-                    if exp_date:
-                        days_left = (exp_date - today).days
-                        matched_expiry_info.append({
-                            "name": ing_name,
-                            "pantry_name": matched_pantry_name,
-                            "expires_at": exp_date,
-                            "days_left": days_left,
-                        })
-            else:
-                missing_items.append(ri)
-
-        missing_count = required_count - have_count
-        coverage = have_count / required_count
-        missing_ratio = missing_count / required_count
-
-        # =============================================
-        # 유통기한 기반 보너스/패널티 계산 (세분화)
-        # =============================================
-        bonus_expiry = 0.0
-        penalty_expired = 0.0
-        expiry_min_days = None
-
-        for info in matched_expiry_info:
-            days_left = info["days_left"]
-
-            # 가장 임박한 날짜 추적
-            if expiry_min_days is None or days_left < expiry_min_days:
-                expiry_min_days = days_left
-
-            if days_left <= -1:
-                # 이미 지남 (expired)
-                penalty_expired += 0.20
-            elif days_left <= 2:
-                # 0~2일 남음: 긴급
-                bonus_expiry += 0.25
-            elif days_left <= 7:
-                # 3~7일 남음: 임박
-                bonus_expiry += 0.10
-            # 8일 이상: 보너스 없음
-
-        # cap 적용 (최대 보너스 +0.5, 최대 패널티 -0.5)
-        bonus_expiry = min(bonus_expiry, 0.5)
-        penalty_expired = min(penalty_expired, 0.5)
-
-        # 시간 적합도
-        cook_time = getattr(r, "cook_time_min", None)
-        if max_time and cook_time is not None and max_time > 0:
-            diff = abs(cook_time - max_time) / max_time
-            time_fit = max(0.0, 1.0 - min(diff, 1.0))
-        else:
-            time_fit = 0.5
-
-        # 기본 점수 (유통기한 보너스/패널티 반영)
-        score = (
-            0.55 * coverage
-            - 0.20 * missing_ratio
-            + bonus_expiry           # 유통기한 임박 보너스
-            - penalty_expired        # 유통기한 만료 패널티
-            + 0.10 * time_fit
-        )
-
-        # 다양성 / 피드백 (중복 제거됨)
-        if r.id in recent_cooked_saved_ids:
-            score -= 0.15
-        if r.id in recent_skipped_ids:
-            score -= 0.40
-        if r.id in recent_recommended_ids:
-            score -= 0.10
-
-        # 전환율 피드백 감점/보너스 (루프 안에!)
-        exp = exposure_counts.get(r.id, 0)
-        is_converted = (r.id in converted_ids)
-
-        if exp >= 2 and not is_converted:
-            score -= 0.20
-
-        if is_converted:
-            score += 0.05
-
-        # 부족 재료 이름 (이미 위에서 missing_items 계산됨)
-        missing_names = [ri.ingredient.name_ko for ri in missing_items]
-
-        pop_users = pop_map.get(r.id, 0)
-        # 너무 세게 먹이면 개인화가 죽음 → 상한을 둔다
-        # 예: 유저 20명 이상이면 더 올라가지 않게 캡
-        pop_norm = min(pop_users, 20) / 20.0  # 0~1
-        # 가산점은 작게(서비스스럽게)
-        score += 0.08 * pop_norm
-
-        debug = {
-            "base": round(
-                0.55 * coverage
-                - 0.20 * missing_ratio
-                + 0.10 * time_fit,
-                4
-            ),
-            "penalty_recent_cooked_saved": (-0.15 if r.id in recent_cooked_saved_ids else 0.0),
-            "penalty_recent_skipped": (-0.40 if r.id in recent_skipped_ids else 0.0),
-            "penalty_cooldown": (-0.10 if r.id in recent_recommended_ids else 0.0),
-            "penalty_exposure_no_convert": (
-                -0.20 if exposure_counts.get(r.id, 0) >= 2 and r.id not in converted_ids else 0.0
-            ),
-            "bonus_converted": (0.05 if r.id in converted_ids else 0.0),
-            "exposure": exposure_counts.get(r.id, 0),
-            "converted": (r.id in converted_ids),
-            "pop_users": pop_users,
-            "pop_bonus": round(0.08 * pop_norm, 4),
-            # 유통기한 관련 debug 정보
-            "bonus_expiry": round(bonus_expiry, 4),
-            "penalty_expired_pantry": round(penalty_expired, 4),
-            "expiry_matched_count": len(matched_expiry_info),
-            "expiry_min_days_left": expiry_min_days,
-        }
-
-        # 추천 이유
-        reasons = []
-        if missing_count == 0:
-            reasons.append("냉장고 재료로 바로 가능")
-        else:
-            reasons.append(f"필수 재료 {have_count}/{required_count}개 보유")
-        if bonus_expiry > 0:
-            reasons.append("유통기한 임박 재료 활용")
-        if penalty_expired > 0:
-            reasons.append("유통기한 지난 재료 포함")
-        if cook_time is not None:
-            reasons.append(f"{cook_time}분 내 조리")
 
-
-        results.append(
-            {
-                "recipe_id": r.id,
-                "title": getattr(r, "title", ""),
-                "cook_time_min": cook_time,
-                "coverage": round(coverage, 3),
-                "missing_count": missing_count,
-                "missing_ingredients": missing_names,
-                "shopping_list": missing_names,
-                "reasons": reasons,
-                "saved": (r.id in saved_ids),
-                "score": round(score, 4),
-                "debug": debug,
-            }
-        )
+        item = score_recipe(ctx, r)
+        if item is not None:
+            results.append(item)
 
     # =====================================
     # [3] 정렬 + fallback
     # =====================================
 
     results.sort(key=lambda x: x["score"], reverse=True)
-    picked = results[:top_n]
+
+    lam = settings.RECOMMENDATION_MMR_LAMBDA if diversity is None else diversity
+    if lam < 1.0 and len(results) > 1:
+        # 재료가 거의 같은 레시피(계란 요리 5개 등)가 몰리지 않게 상위 후보만 재정렬
+        pool = results[:MMR_POOL]
+        bitsets = ingredient_bitsets([x["recipe_id"] for x in pool])
+        picked = []
+        for item, adjustment, similarity in mmr_rerank(pool, bitsets, top_n, lam):
+            item["debug"]["diversity_adjustment"] = round(adjustment, 4) or 0.0
+            item["debug"]["max_similarity"] = round(similarity, 4)
+            picked.append(item)
+    else:
+        picked = results[:top_n]
 
     if not picked:
         fallback = [x for x in results if 0 < x["missing_count"] <= 2]
@@ -595,96 +552,21 @@ def recommend_recipes_for_user(user, top=10):
 def score_single_recipe_for_user(user, recipe_id, exclude_saved=False):
     """
     특정 recipe_id 하나에 대해 유저 기준 추천 점수/디버그를 계산.
-    recommend_recipes_for_user와 동일 로직이나 단일 레시피만 평가.
+    recommend_recipes_for_user와 같은 score_recipe를 단일 레시피에 적용.
     exclude_saved=False면 저장된 레시피도 계산 결과를 반환.
     """
-    today = date.today()
-
     try:
-        r = Recipe.objects.prefetch_related(
-            Prefetch(
-                "recipe_ingredients",
-                queryset=RecipeIngredient.objects.select_related("ingredient"),
-            )
-        ).get(id=recipe_id)
+        r = _recipes_with_ingredients().get(id=recipe_id)
     except Recipe.DoesNotExist:
         return None
 
-    saved_ids = set(
-        UserSavedRecipe.objects.filter(user=user)
-        .values_list("recipe_id", flat=True)
-    )
+    ctx = ScoringContext(user)
 
-    if exclude_saved and r.id in saved_ids:
+    if exclude_saved and r.id in ctx.saved_ids:
         return None
 
-    pantry_ids = get_user_pantry_ingredient_ids(user)
-    # 정규화된 pantry 이름 + 유통기한 맵
-    pantry_names, expiry_map = get_user_pantry_with_expiry(user)
-
-    profile = getattr(user, "profile", None)
-    max_time = getattr(profile, "max_cook_time_min", None) if profile else None
-
-    recent_cutoff = timezone.now() - timedelta(days=7)
-
-    recent_cooked_saved_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action__in=["save", "cook"],
-            created_at__gte=recent_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
-
-    recent_skipped_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action="skip",
-            created_at__gte=recent_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
-
-    recent_recommended_ids = set()
-    for h in RecommendationHistory.objects.filter(user=user).order_by("-created_at")[:10]:
-        for rid in (h.result_recipe_ids or []):
-            recent_recommended_ids.add(rid)
-
-    conv_cutoff = timezone.now() - timedelta(days=7)
-    exposure_counts = {}
-    histories = RecommendationHistory.objects.filter(
-        user=user,
-        created_at__gte=conv_cutoff,
-    ).order_by("-created_at")[:50]
-    for h in histories:
-        for rid in (h.result_recipe_ids or []):
-            exposure_counts[rid] = exposure_counts.get(rid, 0) + 1
-
-    converted_ids = set(
-        RecipeAction.objects.filter(
-            user=user,
-            action__in=["cook", "save"],
-            created_at__gte=conv_cutoff,
-        ).values_list("recipe_id", flat=True)
-    )
-
-    pop_cutoff = timezone.now() - timedelta(days=7)
-    pop_map = dict(
-        RecipeAction.objects.filter(
-            action__in=["cook", "save"],
-            created_at__gte=pop_cutoff,
-        )
-        .values("recipe_id")
-        .annotate(u=Count("user_id", distinct=True))
-        .values_list("recipe_id", "u")
-    )
-
-    # 필수 재료 계산
-    required_items = [
-        ri for ri in r.recipe_ingredients.all()
-        if not ri.is_optional
-    ]
-    required_count = len(required_items)
-
-    if required_count == 0:
+    item = score_recipe(ctx, r)
+    if item is None:
         return {
             "recipe_id": r.id,
             "title": r.title,
@@ -694,152 +576,40 @@ def score_single_recipe_for_user(user, recipe_id, exclude_saved=False):
             "missing_ingredients": [],
             "shopping_list": [],
             "reasons": ["필수 재료 정보 없음"],
-            "saved": (r.id in saved_ids),
+            "saved": (r.id in ctx.saved_ids),
             "score": 0.0,
             "debug": {},
         }
+    return item
 
-    # 부분 매칭: ID 매칭 또는 정규화 이름 매칭 + 유통기한 추적
-    have_count = 0
-    missing_items = []
-    matched_expiry_info = []
-
-    for ri in required_items:
-        ing_name = ri.ingredient.name_ko
-        matched_pantry_name = ingredient_matches_pantry(ing_name, pantry_names)
-
-        if ri.ingredient_id in pantry_ids or matched_pantry_name:
-            have_count += 1
-            # 유통기한 정보 추적
-            if matched_pantry_name and matched_pantry_name in expiry_map:
-                exp_date = expiry_map[matched_pantry_name]
-                if exp_date:
-                    days_left = (exp_date - today).days
-                    matched_expiry_info.append({
-                        "name": ing_name,
-                        "pantry_name": matched_pantry_name,
-                        "expires_at": exp_date,
-                        "days_left": days_left,
-                    })
-        else:
-            missing_items.append(ri)
-
-    missing_count = required_count - have_count
-    coverage = have_count / required_count
-    missing_ratio = missing_count / required_count
-
-    # 유통기한 기반 보너스/패널티 계산
-    bonus_expiry = 0.0
-    penalty_expired = 0.0
-    expiry_min_days = None
 
-    for info in matched_expiry_info:
-        days_left = info["days_left"]
-        if expiry_min_days is None or days_left < expiry_min_days:
-            expiry_min_days = days_left
-
-        if days_left <= -1:
-            penalty_expired += 0.20
-        elif days_left <= 2:
-            bonus_expiry += 0.25
-        elif days_left <= 7:
-            bonus_expiry += 0.10
-
-    bonus_expiry = min(bonus_expiry, 0.5)
-    penalty_expired = min(penalty_expired, 0.5)
-
-    cook_time = r.cook_time_min
-    if max_time and cook_time is not None and max_time > 0:
-        diff = abs(cook_time - max_time) / max_time
-        time_fit = max(0.0, 1.0 - min(diff, 1.0))
-    else:
-        time_fit = 0.5
-
-    score = (
-        0.55 * coverage
-        - 0.20 * missing_ratio
-        + bonus_expiry
-        - penalty_expired
-        + 0.10 * time_fit
-    )
-
-    if r.id in recent_cooked_saved_ids:
-        score -= 0.15
-    if r.id in recent_skipped_ids:
-        score -= 0.40
-    if r.id in recent_recommended_ids:
-        score -= 0.10
-
-    exp = exposure_counts.get(r.id, 0)
-    is_converted = (r.id in converted_ids)
-    if exp >= 2 and not is_converted:
-        score -= 0.20
-    if is_converted:
-        score += 0.05
+# =============================================
+# 토스 인앱 로그인 관련 함수
+# =============================================
+from django.conf import settings
 
-    pop_users = pop_map.get(r.id, 0)
-    pop_norm = min(pop_users, 20) / 20.0
-    score += 0.08 * pop_norm
+from .external.http import get_async_client, get_client
 
-    missing_names = [ri.ingredient.name_ko for ri in missing_items]
 
-    debug = {
-        "base": round(
-            0.55 * coverage
-            - 0.20 * missing_ratio
-            + 0.10 * time_fit,
-            4
-        ),
-        "penalty_recent_cooked_saved": (-0.15 if r.id in recent_cooked_saved_ids else 0.0),
-        "penalty_recent_skipped": (-0.40 if r.id in recent_skipped_ids else 0.0),
-        "penalty_cooldown": (-0.10 if r.id in recent_recommended_ids else 0.0),
-        "penalty_exposure_no_convert": (
-            -0.20 if exp >= 2 and not is_converted else 0.0
-        ),
-        "bonus_converted": (0.05 if is_converted else 0.0),
-        "exposure": exp,
-        "converted": is_converted,
-        "pop_users": pop_users,
-        "pop_bonus": round(0.08 * pop_norm, 4),
-        # 유통기한 관련 debug 정보
-        "bonus_expiry": round(bonus_expiry, 4),
-        "penalty_expired_pantry": round(penalty_expired, 4),
-        "expiry_matched_count": len(matched_expiry_info),
-        "expiry_min_days_left": expiry_min_days,
+def _toss_token_request(authorization_code: str, referrer: str):
+    url = f"{settings.TOSS_API_BASE_URL}/api-partner/v1/apps-in-toss/user/oauth2/generate-token"
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {settings.TOSS_PARTNER_KEY}",
     }
-
-    reasons = []
-    if missing_count == 0:
-        reasons.append("냉장고 재료로 바로 가능")
-    else:
-        reasons.append(f"필수 재료 {have_count}/{required_count}개 보유")
-    if bonus_expiry > 0:
-        reasons.append("유통기한 임박 재료 활용")
-    if penalty_expired > 0:
-        reasons.append("유통기한 지난 재료 포함")
-    if cook_time is not None:
-        reasons.append(f"{cook_time}분 내 조리")
-
-    return {
-        "recipe_id": r.id,
-        "title": r.title,
-        "cook_time_min": cook_time,
-        "coverage": round(coverage, 3),
-        "missing_count": missing_count,
-        "missing_ingredients": missing_names,
-        "shopping_list": missing_names,
-        "reasons": reasons,
-        "saved": (r.id in saved_ids),
-        "score": round(score, 4),
-        "debug": debug,
+    payload = {
+        "authorizationCode": authorization_code,
+        "referrer": referrer,
     }
+    return url, payload, headers
 
 
-# =============================================
-# 토스 인앱 로그인 관련 함수
-# =============================================
-import requests
-from django.conf import settings
+def _toss_user_info_request(access_token: str):
+    url = f"{settings.TOSS_API_BASE_URL}/api-partner/v1/apps-in-toss/user/oauth2/login-me"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+    }
+    return url, headers
 
 
 def toss_generate_token(authorization_code: str, referrer: str) -> dict:
@@ -850,17 +620,10 @@ def toss_generate_token(authorization_code: str, referrer: str) -> dict:
     Returns: { "accessToken": "...", "refreshToken": "...", "expiresIn": 3600 }
     Raises: Exception on API error
     """
-    url = f"{settings.TOSS_API_BASE_URL}/api-partner/v1/apps-in-toss/user/oauth2/generate-token"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {settings.TOSS_PARTNER_KEY}",
-    }
-    payload = {
-        "authorizationCode": authorization_code,
-        "referrer": referrer,
-    }
+    url, payload, headers = _toss_token_request(authorization_code, referrer)
 
-    resp = requests.post(url, json=payload, headers=headers, timeout=10)
+    # 인가 코드는 한 번만 쓸 수 있어서 POST는 재시도하지 않음 (클라이언트 기본값)
+    resp = get_client("toss").post(url, json=payload, headers=headers, endpoint="generate-token")
 
     if resp.status_code != 200:
         raise Exception(f"Toss generate-token failed: {resp.status_code} {resp.text}")
@@ -876,12 +639,33 @@ def toss_get_user_info(access_token: str) -> dict:
     Returns: { "userKey": "...", ... }
     Raises: Exception on API error
     """
-    url = f"{settings.TOSS_API_BASE_URL}/api-partner/v1/apps-in-toss/user/oauth2/login-me"
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-    }
+    url, headers = _toss_user_info_request(access_token)
 
-    resp = requests.get(url, headers=headers, timeout=10)
+    resp = get_client("toss").get(url, headers=headers, endpoint="login-me")
+
+    if resp.status_code != 200:
+        raise Exception(f"Toss login-me failed: {resp.status_code} {resp.text}")
+
+    return resp.json()
+
+
+async def atoss_generate_token(authorization_code: str, referrer: str) -> dict:
+    """toss_generate_token의 async 버전 (async 로그인 뷰용)"""
+    url, payload, headers = _toss_token_request(authorization_code, referrer)
+
+    resp = await get_async_client("toss").post(url, json=payload, headers=headers, endpoint="generate-token")
+
+    if resp.status_code != 200:
+        raise Exception(f"Toss generate-token failed: {resp.status_code} {resp.text}")
+
+    return resp.json()
+
+
+async def atoss_get_user_info(access_token: str) -> dict:
+    """toss_get_user_info의 async 버전"""
+    url, headers = _toss_user_info_request(access_token)
+
+    resp = await get_async_client("toss").get(url, headers=headers, endpoint="login-me")
 
     if resp.status_code != 200:
         raise Exception(f"Toss login-me failed: {resp.status_code} {resp.text}")
@@ -899,3 +683,13 @@ def get_or_create_user_by_toss_id(toss_user_id: str) -> User:
     )
     UserProfile.objects.get_or_create(user=user)
     return user
+
+
+async def aget_or_create_user_by_toss_id(toss_user_id: str) -> User:
+    """get_or_create_user_by_toss_id의 async 버전 (async ORM)"""
+    user, created = await User.objects.aget_or_create(
+        toss_user_id=str(toss_user_id),
+        defaults={"nickname": f"toss_{toss_user_id[:8]}"},
+    )
+    await UserProfile.objects.aget_or_create(user=user)
+    return user
@@ -5,28 +5,55 @@ from rest_framework import status
 from rest_framework.generics import RetrieveAPIView, ListCreateAPIView, DestroyAPIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
-from .models import  User, UserProfile, UserPantry, Ingredient, RecommendationHistory, RecipeAction, Recipe,  UserSavedRecipe, RecipeIngredient, RecipeStep
+from .models import  User, UserProfile, UserPantry, ExpiryDigest, Ingredient, RecommendationHistory, RecipeAction, RecipeExposure, Recipe,  UserSavedRecipe, RecipeIngredient, RecipeStep
 from django.db import transaction
+from django.db.models import Count, Q
 from .serializers import UserProfileSerializer, UserPantrySerializer, PantryCreateSerializer, PantryUpdateSerializer, RecipeRecommendationSerializer, RecipeActionCreateSerializer, RecommendationHistoryDetailSerializer, SavedRecipeListSerializer, UserRecipeCreateSerializer, RecipeDetailSerializer, UserRecipeListSerializer, RecipeSearchSerializer
 import json
 from .utils import (
-    get_or_create_test_user,
+    invalidate_recommendation_cache,
+    pantry_fingerprint,
     recommend_recipes_for_user,
+    recommendation_cache_key,
     get_demo_user,
     score_single_recipe_for_user,
-    get_current_user,
-    toss_generate_token,
-    toss_get_user_info,
-    get_or_create_user_by_toss_id,
+    atoss_generate_token,
+    atoss_get_user_info,
+    aget_or_create_user_by_toss_id,
 )
 from app.services.recipe_source import get_foodsafety_recipes
 from app.services.seed_foodsafety import seed_from_foodsafety_rows
+from .authentication import (
+    ainvalidate_session_identity,
+    get_cached_user,
+    invalidate_session_identity,
+    invalidate_user_identity,
+)
+from .external.http import UpstreamError, http_metrics
+from .services.actions import MAX_BATCH_ACTIONS, record_actions
+from .services.catalog import bump_catalog_version, existing_recipe_ids
+from .services.conversion import get_rollup_through, windowed_rates
+from .services.dietary import recompute_recipe_flags
+from .services.digest import user_digest
+from .services.impressions import record_impression
+from .services.ingredient_graph import get_or_create_ingredient
+from .services.ingredient_parser import parse_ingredient_item
+from .services.neighbors import get_neighbor_index
+from .services.planner import DEFAULT_DAYS, MAX_DAYS, MAX_MEALS_PER_DAY, plan_meals
+from .services.related import TOP_K, get_related
+from .services.unlock import unlock_analysis
 from .services.recipe_source import get_foodsafety_recipes
 from .services.seed_foodsafety import seed_from_foodsafety_rows
+from .services.scoring import scoring_profile_for
 from .services.recommendation_service import RecommendationService
 from django.utils.timezone import now
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.http import JsonResponse
 from django.core.cache import cache
 import hashlib
+import uuid
 import json
 
 class PantryListView(APIView):
@@ -38,18 +65,18 @@ class PantryListView(APIView):
 
 class PantryView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         qs = UserPantry.objects.filter(user=user).select_related("ingredient")
         return Response(UserPantrySerializer(qs, many=True).data)
 
     def post(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         serializer = PantryCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        # 재료명 → Ingredient 찾아서 연결 (없으면 생성)
-        ingredient, _ = Ingredient.objects.get_or_create(name_ko=data["ingredient_name"])
+        # 재료명 → Ingredient 찾아서 연결 (없으면 생성, 표준 재료까지 연결)
+        ingredient = get_or_create_ingredient(data["ingredient_name"])
 
         item, _ = UserPantry.objects.update_or_create(
             user=user,
@@ -63,13 +90,13 @@ class PantryView(APIView):
 
 class PantryItemDeleteView(APIView):
     def delete(self, request, item_id: int):
-        user = get_or_create_test_user()
+        user = request.user
         UserPantry.objects.filter(user=user, id=item_id).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class PantryItemUpdateView(APIView):
     def patch(self, request, item_id: int):
-        user = get_or_create_test_user()
+        user = request.user
         item = UserPantry.objects.get(user=user, id=item_id)
 
         serializer = PantryUpdateSerializer(data=request.data)
@@ -86,95 +113,149 @@ class PantryItemUpdateView(APIView):
 
 class ProfileView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         profile = user.profile
         return Response(UserProfileSerializer(profile).data)
 
     def put(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         profile = user.profile
         serializer = UserProfileSerializer(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_user_identity(user.id)
+        # 알레르기/식단이 바뀌면 추천 결과도 바뀜
+        invalidate_recommendation_cache(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 class RecipeRecommendationView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
 
         try:
             top = int(request.query_params.get("top", 5))
         except ValueError:
             top = 5
 
-        # ===== 1) 냉장고 상태 기반 캐시 키 생성 =====
-        pantry_rows = list(
-            UserPantry.objects.filter(user=user)
-            .values("ingredient_id", "quantity_text", "expires_at")
-            .order_by("ingredient_id")
+        # 시간 필터 (선택): ?max_time=20 → 이번 요청만 조리 시간 예산 변경
+        #                   ?strict_time=1/0 → 예산 × time_limit_factor 초과 레시피 제외 여부
+        try:
+            max_time = int(request.query_params.get("max_time", 0)) or None
+        except ValueError:
+            max_time = None
+        if max_time is not None and max_time <= 0:
+            max_time = None
+        strict_time = {"1": True, "true": True, "0": False, "false": False}.get(
+            request.query_params.get("strict_time", "").lower()
         )
+        # 다양성 재정렬 (선택): ?diversity=0.7 → MMR λ (0~1, 1이면 점수 순서 그대로)
+        try:
+            diversity = request.query_params.get("diversity")
+            diversity = max(0.0, min(float(diversity), 1.0)) if diversity else None
+        except ValueError:
+            diversity = None
 
-        fingerprint = hashlib.md5(
-            json.dumps(pantry_rows, default=str).encode()
-        ).hexdigest()
-
-        cache_key = f"reco:v1:user:{user.id}:top:{top}:fp:{fingerprint}"
+        # ===== 1) 냉장고 상태 기반 캐시 키 생성 =====
+        # 점수 프로필(A/B)과 요청 옵션별로 캐시 분리
+        variant = f"p{scoring_profile_for(user.id).id}t{max_time or ''}s{strict_time}d{diversity}"
+        cache_key = recommendation_cache_key(user.id, top, pantry_fingerprint(user.id), variant=variant)
 
         # ===== 2) 캐시 HIT =====
         cached = cache.get(cache_key)
         if cached is not None:
-            return Response(cached, status=200)
+            return Response(self._with_impression(user, cached), status=200)
 
         # ===== 3) 캐시 MISS → 서비스 호출 =====
-        data, status_code = RecommendationService.get_recommendations(user, top)
+        data, status_code = RecommendationService.get_recommendations(
+            user, top, max_time=max_time, strict_time=strict_time, diversity=diversity
+        )
 
         payload = RecipeRecommendationSerializer(data, many=True).data
 
         # ===== 4) 캐시 저장 =====
         cache.set(cache_key, payload, timeout=120)  # 2분
 
-        return Response(payload, status=status_code)
+        return Response(self._with_impression(user, payload), status=status_code)
+
+    @staticmethod
+    def _with_impression(user, payload):
+        """
+        노출 기록(버퍼) + 응답 항목마다 impression_id 추가.
+        캐시 HIT도 실제로 보여준 것이므로 매번 새 impression
+        """
+        impression_id = record_impression(user.id, [item["recipe_id"] for item in payload])
+        return [{**item, "impression_id": impression_id} for item in payload]
     
 class RecipeActionView(APIView):
     def post(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         s = RecipeActionCreateSerializer(data=request.data)
         s.is_valid(raise_exception=True)
 
         recipe_id = s.validated_data["recipe_id"]
         action = s.validated_data["action"]
+        impression_id = s.validated_data.get("impression_id")
 
-        recipe = Recipe.objects.get(id=recipe_id)
-        RecipeAction.objects.create(user=user, recipe=recipe, action=action)
-
-        # 추천 캐시 무효화 (cook/skip 반영이 즉시 보이도록)
-        self._invalidate_recommendation_cache(user)
+        # 레시피 존재 확인은 메모리 id 집합으로, 적재는 버퍼에서 모아서 bulk
+        # (추천 캐시 무효화, impression_id 귀속도 flush 때)
+        if recipe_id not in existing_recipe_ids([recipe_id]):
+            return Response({"detail": "recipe not found"}, status=404)
+        record_actions(user.id, [(recipe_id, action, impression_id)])
 
         return Response({"ok": True}, status=201)
 
-    def _invalidate_recommendation_cache(self, user):
-        """해당 사용자의 추천 캐시 삭제"""
-        for top in [3, 5, 10, 20]:
-            pantry_rows = list(
-                UserPantry.objects.filter(user=user)
-                .values("ingredient_id", "quantity_text", "expires_at")
-                .order_by("ingredient_id")
-            )
-            fingerprint = hashlib.md5(
-                json.dumps(pantry_rows, default=str).encode()
-            ).hexdigest()
-            cache_key = f"reco:v1:user:{user.id}:top:{top}:fp:{fingerprint}"
-            cache.delete(cache_key)
+
+class RecipeActionBatchView(APIView):
+    """
+    액션 여러 개 한 번에 기록 (미니앱에서 모아서 전송)
+    POST /api/recipes/actions/batch/
+    body: { "actions": [ { "recipe_id": 1, "action": "skip", "impression_id": "..."(선택) }, ... ] }
+    응답: { "ok": true, "accepted": N, "rejected": [ { "index": i, "error": ... } ] }
+    """
+
+    def post(self, request):
+        user = request.user
+        items = request.data.get("actions")
+        if not isinstance(items, list) or not items:
+            return Response({"detail": "actions (list) required"}, status=400)
+        if len(items) > MAX_BATCH_ACTIONS:
+            return Response({"detail": f"too many actions (max {MAX_BATCH_ACTIONS})"}, status=400)
+
+        valid, rejected = [], []
+        for idx, item in enumerate(items):
+            s = RecipeActionCreateSerializer(data=item if isinstance(item, dict) else {})
+            if s.is_valid():
+                valid.append((idx, s.validated_data["recipe_id"], s.validated_data["action"],
+                              s.validated_data.get("impression_id")))
+            else:
+                rejected.append({"index": idx, "error": s.errors})
+
+        known = existing_recipe_ids(recipe_id for _, recipe_id, _, _ in valid)
+        accepted = []
+        for idx, recipe_id, action, impression_id in valid:
+            if recipe_id in known:
+                accepted.append((recipe_id, action, impression_id))
+            else:
+                rejected.append({"index": idx, "error": "recipe not found"})
+
+        record_actions(user.id, accepted)
+
+        return Response({
+            "ok": True,
+            "accepted": len(accepted),
+            "rejected": sorted(rejected, key=lambda r: r["index"]),
+        }, status=202)
+
 
 class RecommendationHistoryView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         qs = RecommendationHistory.objects.filter(user=user).order_by("-created_at")[:20]
         return Response(RecommendationHistoryDetailSerializer(qs, many=True).data)
 
 class RecommendationConversionView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
 
         days = request.query_params.get("days", "7")
         try:
@@ -184,38 +265,14 @@ class RecommendationConversionView(APIView):
 
         cutoff = date.today() - timedelta(days=days_n)
 
-        # 최근 추천 로그
-        histories = RecommendationHistory.objects.filter(
-            user=user, created_at__date__gte=cutoff
-        )
-
-        recommended_ids = set()
-        for h in histories:
-            for rid in (h.result_recipe_ids or []):
-                recommended_ids.add(rid)
-
-        if not recommended_ids:
-            return Response(
-                {
-                    "window_days": days_n,
-                    "recommended_count": 0,
-                    "converted_count": 0,
-                    "conversion_rate": 0.0,
-                }
-            )
-
-        # 추천된 레시피 중 실제 행동(cook/save) 발생
-        converted_ids = set(
-            RecipeAction.objects.filter(
-                user=user,
-                recipe_id__in=recommended_ids,
-                action__in=["cook", "save"],
-                created_at__date__gte=cutoff,
-            ).values_list("recipe_id", flat=True)
+        # 기간 내 추천 노출된 레시피 / 그중 impression_id로 cook/save가 귀속된 레시피
+        # (RecipeExposure: user+day 인덱스, 전환 수는 액션 적재 때 미리 올려둠)
+        agg = RecipeExposure.objects.filter(user=user, day__gte=cutoff).aggregate(
+            recommended=Count("recipe_id", distinct=True),
+            converted=Count("recipe_id", distinct=True, filter=Q(converted__gt=0)),
         )
-
-        recommended_count = len(recommended_ids)
-        converted_count = len(converted_ids)
+        recommended_count = agg["recommended"]
+        converted_count = agg["converted"]
 
         conversion_rate = (
             converted_count / recommended_count
@@ -235,67 +292,46 @@ class RecommendationConversionView(APIView):
 # 저장    
 class RecipeSaveView(APIView):
     def post(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         recipe_id = request.data.get("recipe_id")
 
         if not recipe_id:
             return Response({"detail": "recipe_id required"}, status=400)
 
+        # 추천 화면에서 저장했으면 그 추천 응답의 전환으로 기록 (저장하기 전에 검증)
+        impression_id = request.data.get("impression_id") or None
+        if impression_id is not None:
+            try:
+                impression_id = uuid.UUID(str(impression_id))
+            except ValueError:
+                return Response({"detail": "invalid impression_id"}, status=400)
+
         recipe = Recipe.objects.get(id=recipe_id)
         UserSavedRecipe.objects.get_or_create(user=user, recipe=recipe)
+        record_actions(user.id, [(recipe.id, "save", impression_id)])
 
         # 추천 캐시 무효화 (저장된 레시피가 추천에서 즉시 제외되도록)
-        self._invalidate_recommendation_cache(user)
+        invalidate_recommendation_cache(user)
 
         return Response({"status": "saved"}, status=201)
 
-    def _invalidate_recommendation_cache(self, user):
-        """해당 사용자의 추천 캐시 삭제"""
-        cache_pattern = f"reco:v1:user:{user.id}:*"
-        # Django 기본 캐시는 패턴 삭제 미지원이므로 delete_many 사용
-        # 모든 top 값에 대해 캐시 삭제
-        for top in [3, 5, 10, 20]:
-            pantry_rows = list(
-                UserPantry.objects.filter(user=user)
-                .values("ingredient_id", "quantity_text", "expires_at")
-                .order_by("ingredient_id")
-            )
-            fingerprint = hashlib.md5(
-                json.dumps(pantry_rows, default=str).encode()
-            ).hexdigest()
-            cache_key = f"reco:v1:user:{user.id}:top:{top}:fp:{fingerprint}"
-            cache.delete(cache_key)
-
 # 저장해제
 class RecipeUnsaveView(APIView):
     def post(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         recipe_id = request.data.get("recipe_id")
 
         UserSavedRecipe.objects.filter(user=user, recipe_id=recipe_id).delete()
 
         # 추천 캐시 무효화 (저장 해제된 레시피가 추천에 다시 나타나도록)
-        self._invalidate_recommendation_cache(user)
+        invalidate_recommendation_cache(user)
 
         return Response({"status": "unsaved"}, status=200)
 
-    def _invalidate_recommendation_cache(self, user):
-        """해당 사용자의 추천 캐시 삭제"""
-        for top in [3, 5, 10, 20]:
-            pantry_rows = list(
-                UserPantry.objects.filter(user=user)
-                .values("ingredient_id", "quantity_text", "expires_at")
-                .order_by("ingredient_id")
-            )
-            fingerprint = hashlib.md5(
-                json.dumps(pantry_rows, default=str).encode()
-            ).hexdigest()
-            cache_key = f"reco:v1:user:{user.id}:top:{top}:fp:{fingerprint}"
-            cache.delete(cache_key)
 
 class SavedRecipesView(APIView):
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
 
         qs = (
             UserSavedRecipe.objects
@@ -352,9 +388,33 @@ class AdminStatusView(APIView):
                 .first(),
             "users": User.objects.count(),
             "pantry_items": UserPantry.objects.count(),
+            "upstream": http_metrics(),
             "server_time": now()
         })
     
+class AdminConversionView(APIView):
+    """
+    관리자: 추천 전환율 (일간 집계 테이블 기반, rollup_conversions 명령어로 갱신)
+    GET /api/admin/conversion/            → 전체 유저 7/30/90일
+    GET /api/admin/conversion/?user_id=3  → 특정 유저
+    """
+
+    def get(self, request):
+        user = None
+        user_id = request.query_params.get("user_id")
+        if user_id:
+            try:
+                user = User.objects.get(id=int(user_id))
+            except (ValueError, User.DoesNotExist):
+                return Response({"error": "user not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "user_id": user.id if user else None,
+            "windows": windowed_rates(user=user),
+            "rolled_up_through": get_rollup_through(),
+        })
+
+
 class UserRecipeListCreateView(APIView):
     """
     GET: 내 레시피 목록
@@ -363,7 +423,7 @@ class UserRecipeListCreateView(APIView):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get(self, request):
-        user = get_current_user(request)
+        user = request.user
         qs = Recipe.objects.filter(source="USER", user=user)
 
         # 검색 파라미터 처리
@@ -377,7 +437,7 @@ class UserRecipeListCreateView(APIView):
 
     @transaction.atomic
     def post(self, request):
-        user = get_current_user(request)
+        user = request.user
 
         # FormData에서 필드 추출
         title = request.data.get("title", "").strip()
@@ -431,16 +491,19 @@ class UserRecipeListCreateView(APIView):
             thumbnail=thumbnail_file,  # ImageField
         )
 
-        # 재료 저장
-        for name in ingredients:
-            if not name:
+        # 재료 저장 ("계란 2개" → 재료명/분량 분리)
+        for raw in ingredients:
+            parsed = parse_ingredient_item(raw)
+            if parsed is None:
                 continue
-            ing, _ = Ingredient.objects.get_or_create(name_ko=name)
+            ing = get_or_create_ingredient(parsed.name)
             RecipeIngredient.objects.get_or_create(
                 recipe=recipe,
                 ingredient=ing,
-                defaults={"amount_text": "", "is_optional": False},
+                defaults={"amount_text": parsed.amount_text, "is_optional": parsed.is_optional},
             )
+        recompute_recipe_flags([recipe.id])
+        bump_catalog_version()  # 장보기 분석의 레시피 재료 스냅샷
 
         # 조리 단계 저장
         for idx, step in enumerate(steps_data):
@@ -468,7 +531,7 @@ class UserRecipeDestroyView(DestroyAPIView):
     lookup_field = 'pk'
 
     def get_object(self):
-        user = get_or_create_test_user()
+        user = self.request.user
         pk = self.kwargs['pk']
         obj = get_object_or_404(
             self.get_queryset(), pk=pk, user=user, source="USER"
@@ -480,11 +543,129 @@ class RecipeDetailView(RetrieveAPIView):
     serializer_class = RecipeDetailSerializer
 
 
+def _neighbor_response(request, pk, pairs, limit):
+    """
+    이웃 레시피 [(recipe_id, score), ...] (점수 순) → 응답.
+    제목/공개 여부만 한 번 조회, 볼 수 없는 레시피(남의 비공개)는 빼고 limit개
+    """
+    if not pairs:
+        return Response({"recipe_id": pk, "items": []})
+
+    recipes = {
+        r.id: r
+        for r in Recipe.objects.filter(
+            Q(is_public=True) | Q(user=request.user),
+            id__in=[nid for nid, _ in pairs],
+        ).only("id", "title", "cook_time_min", "image_url")
+    }
+    items = [
+        {
+            "recipe_id": nid,
+            "title": recipes[nid].title,
+            "cook_time_min": recipes[nid].cook_time_min,
+            "image_url": recipes[nid].image_url,
+            "score": round(score, 4),
+        }
+        for nid, score in pairs
+        if nid in recipes
+    ][:limit]
+    return Response({"recipe_id": pk, "items": items})
+
+
+class RecipeSimilarView(APIView):
+    """
+    같이 만든 레시피 (cook/save 공동 발생 기반, build_cooccurrence 명령어로 갱신)
+    GET /api/recipes/<id>/similar/?limit=10
+    """
+
+    def get(self, request, pk):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), 50))
+        except ValueError:
+            limit = 10
+
+        # 이웃 목록은 mmap 인덱스에서
+        return _neighbor_response(request, pk, get_neighbor_index().neighbors(pk, limit=limit * 2), limit)
+
+
+class RecipeRelatedView(APIView):
+    """
+    재료가 비슷한 레시피 (TF-IDF 재료 벡터, build_related 명령어로 미리 계산)
+    GET /api/recipes/<id>/related/?limit=6
+    """
+
+    def get(self, request, pk):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 6)), TOP_K))
+        except ValueError:
+            limit = 6
+
+        return _neighbor_response(request, pk, get_related(pk), limit)
+
+
+class ShoppingUnlockView(APIView):
+    """
+    장보기 추천: 없는 재료 하나를 사면 가능해지는 레시피 수 순위
+    GET /api/shopping/unlock/?limit=10
+    응답: { "items": [ { "ingredient", "canonical_id", "unlocks", "near", "weight", "recipes": [...] } ] }
+    """
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), 50))
+        except ValueError:
+            limit = 10
+        return Response({"items": unlock_analysis(request.user, limit=limit)})
+
+
+class ExpiryDigestView(APIView):
+    """
+    유통기한 임박 재료 + 그 재료로 만들 레시피 (expiry_digest 명령어가 미리 계산)
+    GET /api/digest/expiry/
+    오늘 계산된 다이제스트가 없거나 그 뒤로 냉장고가 바뀌었으면 이 유저만 즉시 계산 (저장하지 않음)
+    """
+
+    def get(self, request):
+        today = date.today()
+        digest = ExpiryDigest.objects.filter(user=request.user, day=today).first()
+        if digest is not None and digest.pantry_fingerprint == pantry_fingerprint(request.user.id):
+            return Response({
+                "day": digest.day.isoformat(),
+                "items": digest.items,
+                "recipes": digest.recipes,
+                "precomputed": True,
+            })
+
+        result = user_digest(request.user, today=today)
+        items, recipes = result if result is not None else ([], [])
+        return Response({"day": today.isoformat(), "items": items, "recipes": recipes, "precomputed": False})
+
+
+class MealPlanView(APIView):
+    """
+    유통기한 임박 재료를 먼저 쓰는 식단
+    GET /api/plans/meals/?days=7&meals=1
+    응답: { "plan": [ { "day", "date", "recipe_id", "title", "uses_expiring", ... } ],
+            "expiring_used": [...], "expiring_unused": [...], "search": {...} }
+    """
+
+    def get(self, request):
+        try:
+            days = max(1, min(int(request.query_params.get("days", DEFAULT_DAYS)), MAX_DAYS))
+        except ValueError:
+            days = DEFAULT_DAYS
+        try:
+            meals = max(1, min(int(request.query_params.get("meals", 1)), MAX_MEALS_PER_DAY))
+        except ValueError:
+            meals = 1
+        return Response(plan_meals(request.user, days=days, meals_per_day=meals))
+
+
 class RecipeSearchView(APIView):
     """레시피 제목 검색 (공개 레시피 + 내 레시피)"""
 
     def get(self, request):
-        user = get_or_create_test_user()
+        user = request.user
         q = request.query_params.get("q", "").strip()
 
         if not q:
@@ -535,9 +716,10 @@ class AdminRecipeDebugView(APIView):
         return Response(result)
 
 
-class TossLoginView(APIView):
+@method_decorator(csrf_exempt, name="dispatch")
+class TossLoginView(View):
     """
-    토스 인앱 로그인 처리
+    토스 인앱 로그인 처리 (async 뷰)
     POST /api/auth/toss/login/
 
     입력: { "authorizationCode": "...", "referrer": "..." }
@@ -547,59 +729,77 @@ class TossLoginView(APIView):
       3. User get_or_create(toss_user_id=userKey)
       4. 세션에 user_id 저장
     응답: { "ok": true, "toss_user_id": "..." }
+
+    토스 API 두 번을 기다리는 동안 워커를 잡고 있지 않도록 async로 처리.
+    (ASGI로 띄우면 로그인이 몰려도 다른 API 요청이 밀리지 않음)
     """
 
-    def post(self, request):
-        authorization_code = request.data.get("authorizationCode")
-        referrer = request.data.get("referrer")
+    async def post(self, request):
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        authorization_code = data.get("authorizationCode")
+        referrer = data.get("referrer")
 
         if not authorization_code:
-            return Response(
+            return JsonResponse(
                 {"ok": False, "error": "authorizationCode is required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if not referrer:
-            return Response(
+            return JsonResponse(
                 {"ok": False, "error": "referrer is required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         try:
             # 1) 토스 OAuth 토큰 발급
-            token_data = toss_generate_token(authorization_code, referrer)
+            token_data = await atoss_generate_token(authorization_code, referrer)
             access_token = token_data.get("accessToken")
 
             if not access_token:
-                return Response(
+                return JsonResponse(
                     {"ok": False, "error": "Failed to get accessToken from Toss"},
                     status=status.HTTP_502_BAD_GATEWAY,
                 )
 
             # 2) 토스 유저 정보 조회
-            user_info = toss_get_user_info(access_token)
+            user_info = await atoss_get_user_info(access_token)
             user_key = user_info.get("userKey")
 
             if not user_key:
-                return Response(
+                return JsonResponse(
                     {"ok": False, "error": "Failed to get userKey from Toss"},
                     status=status.HTTP_502_BAD_GATEWAY,
                 )
 
             # 3) 우리 DB에 유저 생성/조회
-            user = get_or_create_user_by_toss_id(str(user_key))
+            user = await aget_or_create_user_by_toss_id(str(user_key))
 
             # 4) 세션에 user_id 저장
-            request.session["user_id"] = user.id
-            request.session.save()
+            # (캐시 무효화 전에 먼저 저장 → 세션 키가 생기고, 동시 요청이 예전 유저를 다시 캐시하지 않음)
+            await request.session.aset("user_id", user.id)
+            await request.session.asave()
+            await ainvalidate_session_identity(request)
 
-            return Response({
+            return JsonResponse({
                 "ok": True,
                 "toss_user_id": user.toss_user_id,
                 "user_id": user.id,
             }, status=status.HTTP_200_OK)
 
+        except UpstreamError as e:
+            # 토스 API 장애/타임아웃 (서킷 열림 포함)
+            return JsonResponse(
+                {"ok": False, "error": str(e)},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except Exception as e:
-            return Response(
+            return JsonResponse(
                 {"ok": False, "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
@@ -612,6 +812,7 @@ class AuthLogoutView(APIView):
     """
 
     def post(self, request):
+        invalidate_session_identity(request)
         request.session.flush()
         return Response({"ok": True})
 
@@ -651,8 +852,10 @@ class DemoLoginView(APIView):
         )
         UserProfile.objects.get_or_create(user=user)
 
-        # 세션에 저장
+        # 세션에 저장 (캐시 무효화 전에 먼저 저장)
         request.session["user_id"] = user.id
+        request.session.save()
+        invalidate_session_identity(request)
 
         return Response({
             "ok": True,
@@ -681,8 +884,8 @@ class AuthStatusView(APIView):
                 "is_admin": False,
             })
 
-        try:
-            user = User.objects.get(id=user_id)
+        user = get_cached_user(user_id)
+        if user is not None:
             return Response({
                 "logged_in": True,
                 "toss_user_id": user.toss_user_id,
@@ -690,12 +893,14 @@ class AuthStatusView(APIView):
                 "nickname": user.nickname,
                 "is_admin": user.toss_user_id in ADMIN_USER_IDS,
             })
-        except User.DoesNotExist:
-            request.session.flush()
-            return Response({
-                "logged_in": False,
-                "toss_user_id": None,
-                "user_id": None,
-                "nickname": None,
-                "is_admin": False,
-            })
\ No newline at end of file
+
+        # 세션에 있지만 DB에 없는 유저
+        invalidate_session_identity(request)
+        request.session.flush()
+        return Response({
+            "logged_in": False,
+            "toss_user_id": None,
+            "user_id": None,
+            "nickname": None,
+            "is_admin": False,
+        })
\ No newline at end of file
@@ -67,6 +67,20 @@ SESSION_COOKIE_SAMESITE = "Lax"
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = False  # 개발환경. 프로덕션에서 True로 변경
 
+# 세션 저장 방식 (SESSION_MODE 환경변수)
+#   cached_db (기본): 캐시에서 읽고 DB에 write-through → 읽기마다 django_session 조회 안 함
+#   signed_cookies: 서버 저장소 없음 (세션 데이터가 user_id 정도라 쿠키로 충분)
+#   cache: 캐시만 사용 (프로세스 간 공유되는 캐시(Redis 등)일 때만)
+#   db: 기존 방식
+SESSION_ENGINES = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "cache": "django.contrib.sessions.backends.cache",
+    "db": "django.contrib.sessions.backends.db",
+}
+SESSION_MODE = os.environ.get("SESSION_MODE", "cached_db")
+SESSION_ENGINE = SESSION_ENGINES.get(SESSION_MODE, SESSION_ENGINES["cached_db"])
+
 # CSRF 설정 (프론트와 쿠키 공유)
 CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:5173",
@@ -146,11 +160,68 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 
 FOODS_API_KEY = os.environ.get("FOODS_API_KEY", "")
+# 식약처 Open API 베이스 URL (로컬 가짜 서버로 바꿔서 테스트 가능)
+FOODS_API_BASE_URL = os.environ.get("FOODS_API_BASE_URL", "https://openapi.foodsafetykorea.go.kr/api")
+# 외부 레시피 적재 시 트랜잭션 하나에 넣을 행 수
+FOODSAFETY_SEED_BATCH_SIZE = int(os.environ.get("FOODSAFETY_SEED_BATCH_SIZE", "200"))
 
 # 토스 앱인토스 API 설정
 TOSS_PARTNER_KEY = os.environ.get("TOSS_PARTNER_KEY", "")  # 앱인토스 콘솔에서 발급
 TOSS_APP_ID = os.environ.get("TOSS_APP_ID", "")  # 앱인토스 콘솔에서 확인
-TOSS_API_BASE_URL = "https://api-partner.toss.im"  # 토스 파트너 API 베이스 URL
+TOSS_API_BASE_URL = os.environ.get("TOSS_API_BASE_URL", "https://api-partner.toss.im")  # 토스 파트너 API 베이스 URL
+
+# 외부 API 공용 HTTP 클라이언트 설정 (app/external/http.py)
+# timeouts: 엔드포인트별 (connect, read) 초
+EXTERNAL_HTTP = {
+    "foodsafety": {
+        "pool_size": 16,
+        "max_concurrency": 8,
+        "retries": 3,
+        "backoff": 0.5,
+        "timeouts": {"COOKRCP01": (3.05, 15)},
+        "failure_threshold": 5,
+        "reset_timeout": 30.0,
+    },
+    "toss": {
+        "pool_size": 32,
+        "max_concurrency": 32,
+        "retries": 2,
+        "backoff": 0.2,
+        "timeouts": {"generate-token": (2, 5), "login-me": (2, 5)},
+        "failure_threshold": 5,
+        "reset_timeout": 15.0,
+    },
+}
+
+# DRF: 요청당 한 번 세션 → User(+profile) 결정 (app/authentication.py)
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": ["app.authentication.SessionUserAuthentication"],
+    "UNAUTHENTICATED_USER": None,
+}
+# 세션 → 유저 매핑/유저 객체 캐시 시간(초)
+IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", "60"))
+
+# 이벤트(추천 액션 등) write-behind 버퍼 (app/services/write_behind.py)
+EVENT_BUFFER_ENABLED = os.environ.get("EVENT_BUFFER_ENABLED", "1") == "1"
+EVENT_FLUSH_SIZE = int(os.environ.get("EVENT_FLUSH_SIZE", "200"))
+EVENT_FLUSH_INTERVAL_SEC = float(os.environ.get("EVENT_FLUSH_INTERVAL_SEC", "2"))
+EVENT_SPOOL_DIR = os.environ.get("EVENT_SPOOL_DIR", str(BASE_DIR / "var" / "spool"))
+# 이벤트 행 보관 기간(일) / 지난 행 아카이브 위치 (compact_events 명령어)
+EVENT_RETENTION_DAYS = int(os.environ.get("EVENT_RETENTION_DAYS", "90"))
+EVENT_ARCHIVE_DIR = os.environ.get("EVENT_ARCHIVE_DIR", str(BASE_DIR / "var" / "archive"))
+
+# 추천 점수 가중치 프로필 (app/services/scoring.py)
+# 프로필 = 기본 가중치(ScoringWeights)에서 바꿀 값만, SCORING_SPLIT = 프로필별 유저 비율(%)
+# 운영 중 조정은 scoring_profile 명령어 (AppSetting에 저장, 재배포 없이 반영)
+SCORING_PROFILES = {"default": {}}
+SCORING_SPLIT = {"default": 100}
+
+# 추천 다양성 재정렬(MMR) 기본 λ: 1.0이면 끔, 낮을수록 재료가 겹치는 레시피를 더 밀어냄
+# 요청마다 ?diversity=0.7 로 바꿀 수 있음 (app/services/diversity.py)
+RECOMMENDATION_MMR_LAMBDA = float(os.environ.get("RECOMMENDATION_MMR_LAMBDA", "1.0"))
+
+# 레시피 이웃 인덱스 파일 (build_cooccurrence 명령어, app/services/neighbors.py)
+NEIGHBOR_INDEX_PATH = os.environ.get("NEIGHBOR_INDEX_PATH", str(BASE_DIR / "var" / "neighbors.bin"))
 
 # 개발용(메모리 캐시). 배포 때 Redis로 바꾸면 됨.
 CACHES = {
@@ -30,9 +30,16 @@ export const getRecommendations = (top = 5) =>
 export const getRecipeById = (recipeId) =>
   api.get(`/api/recipes/${recipeId}/`).then((r) => r.data);
 
+// 재료가 비슷한 레시피
+export const getRelatedRecipes = (recipeId, limit = 6) =>
+  api.get(`/api/recipes/${recipeId}/related/?limit=${limit}`).then((r) => r.data);
+
 // 저장/해제
-export const saveRecipe = (recipeId) =>
-  api.post("/api/recipes/save/", { recipe_id: recipeId }).then((r) => r.data);
+// impressionId: 추천 응답의 impression_id (추천 화면에서 저장할 때만, 전환 집계용)
+export const saveRecipe = (recipeId, impressionId = null) =>
+  api
+    .post("/api/recipes/save/", { recipe_id: recipeId, impression_id: impressionId })
+    .then((r) => r.data);
 
 export const unsaveRecipe = (recipeId) =>
   api.post("/api/recipes/unsave/", { recipe_id: recipeId }).then((r) => r.data);
@@ -42,9 +49,15 @@ export const getSavedRecipes = () =>
   api.get("/api/recipes/saved/").then((r) => r.data);
 
 // 레시피 액션 (cook/save/skip) - 추천 로직 학습용 로그
-export const recipeAction = (recipeId, action) =>
+export const recipeAction = (recipeId, action, impressionId = null) =>
+  api
+    .post("/api/recipes/action/", { recipe_id: recipeId, action, impression_id: impressionId })
+    .then((r) => r.data);
+
+// 레시피 액션 여러 개 한 번에: actions = [{ recipe_id, action, impression_id? }, ...] (최대 100개)
+export const recipeActionsBatch = (actions) =>
   api
-    .post("/api/recipes/action/", { recipe_id: recipeId, action })
+    .post("/api/recipes/actions/batch/", { actions })
     .then((r) => r.data);
 
 // 팬트리
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
-import { useParams, useNavigate } from "react-router-dom";
-import { getRecipeById, saveRecipe, unsaveRecipe, recipeAction } from "../api";
+import { Link, useParams, useNavigate } from "react-router-dom";
+import { getRecipeById, getRelatedRecipes, saveRecipe, unsaveRecipe, recipeAction } from "../api";
 
 const PLACEHOLDER_IMAGE = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='400' height='300' viewBox='0 0 400 300'%3E%3Crect fill='%23E5E8EB' width='400' height='300'/%3E%3Ctext x='50%25' y='45%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='48' fill='%23B0B8C1'%3E🍽️%3C/text%3E%3Ctext x='50%25' y='60%25' dominant-baseline='middle' text-anchor='middle' font-family='sans-serif' font-size='14' fill='%236B7684'%3E이미지 없음%3C/text%3E%3C/svg%3E";
 
@@ -10,6 +10,7 @@ export default function RecipeDetailPage() {
     const [recipe, setRecipe] = useState(null);
     const [loading, setLoading] = useState(false);
     const [isSaved, setIsSaved] = useState(false);
+    const [related, setRelated] = useState([]);
 
     const loadRecipe = async () => {
         setLoading(true);
@@ -24,6 +25,10 @@ export default function RecipeDetailPage() {
 
     useEffect(() => {
         loadRecipe();
+        // 관련 레시피는 실패해도 상세 화면에 영향 없게
+        getRelatedRecipes(id)
+            .then((data) => setRelated(data.items || []))
+            .catch(() => setRelated([]));
     }, [id]);
 
     const handleSaveToggle = async () => {
@@ -104,6 +109,31 @@ export default function RecipeDetailPage() {
                 )}
             </div>
 
+            {related.length > 0 && (
+                <div className="card mt16">
+                    <h3>비슷한 재료로 만드는 레시피</h3>
+                    <div className="mt8">
+                        {related.map((r) => (
+                            <Link key={r.recipe_id} to={`/recipes/${r.recipe_id}`} className="recipe-card-link">
+                                <div className="row mb12">
+                                    <img
+                                        src={r.image_url || PLACEHOLDER_IMAGE}
+                                        alt={r.title}
+                                        className="recipe-thumb"
+                                    />
+                                    <div>
+                                        <div className="title">{r.title}</div>
+                                        {r.cook_time_min != null && (
+                                            <div className="muted">{r.cook_time_min}분</div>
+                                        )}
+                                    </div>
+                                </div>
+                            </Link>
+                        ))}
+                    </div>
+                </div>
+            )}
+
             <div className="cta-bar">
                 <button className={`btn ${isSaved ? '' : 'primary'}`} onClick={handleSaveToggle}>
                     {isSaved ? '저장해제' : '저장'}
@@ -88,7 +88,8 @@ export default function RecommendScreen({ pantryRev }) {
     const handleSave = async (e, recipeId, recipeTitle) => {
         e.preventDefault();
         e.stopPropagation();
-        await saveRecipe(recipeId);
+        const item = items.find((r) => r.recipe_id === recipeId);
+        await saveRecipe(recipeId, item?.impression_id);
         showFeedback("save", recipeTitle, { hidden: true });
         await load();
     };
@@ -98,7 +99,7 @@ export default function RecommendScreen({ pantryRev }) {
         const beforeItem = items.find((r) => r.recipe_id === recipeId);
         const beforeScore = beforeItem?.score ?? null;
 
-        await recipeAction(recipeId, action);
+        await recipeAction(recipeId, action, beforeItem?.impression_id);
         const newData = await load();
 
         // 액션 후 점수 비교